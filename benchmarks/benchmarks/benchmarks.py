@@ -2,6 +2,7 @@
 # See "Writing benchmarks" in the asv docs for more information.
 import numpy as np
 from yt import YTArray, YTQuantity
+from yt.units.unit_registry import UnitRegistry
 
 def time_quantity_init_scalar1():
     3.0 * YTQuantity(1, "m/s")
@@ -29,3 +30,45 @@ def time_quantity_array_conversion():
 
 def time_quantity_ufunc_sin():
     np.sin(YTArray(np.arange(10000), "degree"))
+
+
+def time_quantity_ufunc_multiply_small():
+    a = YTArray(np.arange(10.0), "g/cm**3")
+    b = YTArray(np.arange(10.0), "cm**3")
+    for i in range(100):
+        a * b
+
+
+def time_quantity_ufunc_divide_small():
+    a = YTArray(np.arange(10.0), "erg")
+    b = YTArray(np.arange(1.0, 11.0), "g")
+    for i in range(100):
+        a / b
+
+
+def time_quantity_ufunc_power_small():
+    a = YTArray(np.arange(10.0), "km/s")
+    for i in range(100):
+        a**2
+
+
+def time_quantity_ufunc_add_mixed_units():
+    a = YTArray(np.arange(10.0), "km")
+    b = YTArray(np.arange(10.0), "m")
+    for i in range(100):
+        a + b
+
+
+def time_quantity_derived_expression():
+    rho = YTArray(np.random.random(1000), "g/cm**3")
+    v = YTArray(np.random.random(1000), "km/s")
+    dx = YTArray(np.random.random(1000), "cm")
+    for i in range(20):
+        0.5 * rho * v**2 * dx**3 / rho.in_units("kg/m**3")
+
+
+def time_unit_parse_cached():
+    # Units are only shared within a registry
+    registry = UnitRegistry()
+    for i in range(100):
+        YTArray(1.0, "g/cm**3", registry=registry)
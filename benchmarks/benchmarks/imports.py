@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+class ImportSuite:
+    # Each benchmark starts a fresh interpreter, so that modules cached by
+    # earlier imports do not hide the cost.
+    timeout = 120
+
+    def time_python_startup(self):
+        subprocess.check_call([sys.executable, "-c", "pass"])
+
+    def time_import_yt(self):
+        subprocess.check_call([sys.executable, "-c", "import yt"])
+
+    def time_import_yt_load(self):
+        subprocess.check_call([sys.executable, "-c",
+                               "import yt; yt.load; yt.DatasetSeries"])
+
+    def time_import_yt_plotting(self):
+        subprocess.check_call([sys.executable, "-c",
+                               "import yt; yt.SlicePlot"])
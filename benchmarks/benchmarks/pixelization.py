@@ -0,0 +1,46 @@
+import numpy as np
+from yt.testing import fake_random_ds
+from yt.utilities.lib.pixelization_routines import \
+    pixelize_cartesian, pixelize_off_axis_cartesian
+
+
+class PixelizeCartesianSuite:
+    params = [[512, 2048, 8192], [1, 4]]
+    param_names = ["buff_size", "num_threads"]
+
+    def setup(self, buff_size, num_threads):
+        # A uniform 512**2 projection with a refined patch in the middle
+        n = 512
+        x, y = np.mgrid[0:n, 0:n]
+        px = (x.ravel() + 0.5) / n
+        py = (y.ravel() + 0.5) / n
+        pd = np.full(px.size, 0.5 / n)
+        self.px = np.concatenate([px, 0.375 + (x.ravel() + 0.5) / (4 * n)])
+        self.py = np.concatenate([py, 0.375 + (y.ravel() + 0.5) / (4 * n)])
+        self.pdx = np.concatenate([pd, pd / 4])
+        self.pdy = self.pdx.copy()
+        self.data = np.random.random(self.px.size)
+
+    def time_pixelize_cartesian(self, buff_size, num_threads):
+        pixelize_cartesian(self.px, self.py, self.pdx, self.pdy, self.data,
+                           buff_size, buff_size, (0.0, 1.0, 0.0, 1.0), 1,
+                           (1.0, 1.0), 1, num_threads = num_threads)
+
+
+class PixelizeOffAxisCartesianSuite:
+    params = [[512, 2048, 8192], [1, 4]]
+    param_names = ["buff_size", "num_threads"]
+
+    def setup(self, buff_size, num_threads):
+        ds = fake_random_ds(64)
+        self.cut = ds.cutting([0.2, 0.3, 0.5], ds.domain_center)
+        self.cut["density"]
+        self.indices = np.argsort(self.cut["dx"])[::-1]
+
+    def time_pixelize_off_axis_cartesian(self, buff_size, num_threads):
+        cut = self.cut
+        pixelize_off_axis_cartesian(
+            cut["x"], cut["y"], cut["z"], cut["px"], cut["py"],
+            cut["pdx"], cut["pdy"], cut["pdz"], cut.center, cut._inv_mat,
+            self.indices, cut["density"], buff_size, buff_size,
+            (-0.5, 0.5, -0.5, 0.5), num_threads)
@@ -24,6 +24,21 @@ class SmallEnzoSuite:
         dd = self.ds.all_data()
         dd["gas", "velocity_magnitude"]
 
+    def time_gas_derived_many(self):
+        # A cold read of many derived fields sharing their dependencies.
+        sp = self.ds.sphere("max", (10.0, "kpc"))
+        sp.get_data([("gas", "radial_velocity"),
+                     ("gas", "tangential_velocity"),
+                     ("gas", "velocity_magnitude"),
+                     ("gas", "kinetic_energy"),
+                     ("gas", "cell_mass"),
+                     ("gas", "specific_angular_momentum_x"),
+                     ("gas", "specific_angular_momentum_y"),
+                     ("gas", "specific_angular_momentum_z"),
+                     ("index", "spherical_radius"),
+                     ("index", "spherical_theta"),
+                     ("index", "spherical_phi")])
+
     def time_project_unweight(self):
         proj = self.ds.proj("density", 0)
 
@@ -44,3 +59,26 @@ class SmallEnzoSuite:
         dd = self.ds.all_data()
         dd.quantities.extrema("density")
         dd.quantities.extrema(["velocity_x", "velocity_y", "velocity_z"])
+
+class SmallEnzoSelectionSuite:
+    dsname = "IsolatedGalaxy/galaxy0030/galaxy0030"
+    params = [False, True]
+    param_names = ["fast_index"]
+
+    def setup(self, fast_index):
+        yt.config.ytcfg["yt", "fast_index"] = str(fast_index)
+        self.ds = yt.load(self.dsname)
+        self.ds.index
+        self.center = self.ds.domain_center
+
+    def teardown(self, fast_index):
+        yt.config.ytcfg["yt", "fast_index"] = "False"
+
+    def time_small_sphere_count(self, fast_index):
+        sp = self.ds.sphere(self.center, (1.0, "kpc"))
+        sp["index", "ones"].size
+
+    def time_small_region_fcoords(self, fast_index):
+        dx = self.ds.quan(2.0, "kpc")
+        reg = self.ds.region(self.center, self.center - dx, self.center + dx)
+        reg.fcoords
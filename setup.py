@@ -122,6 +122,11 @@ cython_extensions = [
               include_dirs=["yt/utilities/lib/"],
               libraries=std_libs,
               depends=["yt/utilities/lib/fixed_interpolator.h"]),
+    Extension("yt.utilities.lib.misc_utilities",
+              ["yt/utilities/lib/misc_utilities.pyx"],
+              libraries=std_libs,
+              extra_compile_args=omp_args,
+              extra_link_args=omp_args),
     Extension("yt.utilities.lib.mesh_triangulation",
               ["yt/utilities/lib/mesh_triangulation.pyx"],
               depends=["yt/utilities/lib/mesh_triangulation.h"]),
@@ -129,6 +134,8 @@ cython_extensions = [
               ["yt/utilities/lib/pixelization_routines.pyx",
                "yt/utilities/lib/pixelization_constants.c"],
               include_dirs=["yt/utilities/lib/"],
+              extra_compile_args=omp_args,
+              extra_link_args=omp_args,
               libraries=std_libs,
               depends=["yt/utilities/lib/pixelization_constants.h"]),
     Extension("yt.utilities.lib.primitives",
@@ -175,7 +182,7 @@ cython_extensions = [
 
 lib_exts = [
     "particle_mesh_operations", "depth_first_octree", "fortran_reader",
-    "interpolators", "misc_utilities", "basic_octree", "image_utilities",
+    "interpolators", "basic_octree", "image_utilities",
     "points_in_volume", "quad_tree", "ray_integrators", "mesh_utilities",
     "amr_kdtools", "lenses",
 ]
@@ -146,32 +146,12 @@ GadgetStaticOutput = deprecated_class(GadgetDataset)
 TipsyDataset = frontends.tipsy.TipsyDataset
 TipsyStaticOutput = deprecated_class(TipsyDataset)
 
-# Now individual component imports from the visualization API
-from yt.visualization.api import \
-    FixedResolutionBuffer, ObliqueFixedResolutionBuffer, \
-    write_bitmap, write_image, \
-    apply_colormap, scale_image, write_projection, \
-    SlicePlot, AxisAlignedSlicePlot, OffAxisSlicePlot, \
-    ProjectionPlot, OffAxisProjectionPlot, \
-    show_colormaps, add_cmap, make_colormap, \
-    ProfilePlot, PhasePlot, ParticlePhasePlot, \
-    ParticleProjectionPlot, ParticleImageBuffer, ParticlePlot
-
-from yt.visualization.volume_rendering.api import \
-    volume_render, create_scene, ColorTransferFunction, TransferFunction, \
-    off_axis_projection, interactive_render
-import yt.visualization.volume_rendering.api as volume_rendering
-#    TransferFunctionHelper, MultiVariateTransferFunction
-#    off_axis_projection
-
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
     parallel_objects, enable_parallelism, communication_system
 
 from yt.convenience import \
     load, simulation
 
-from yt.testing import run_nose
-
 # Import some helpful math utilities
 from yt.utilities.math_utils import \
     ortho_find, quartiles, periodic_position
@@ -179,5 +159,64 @@ from yt.utilities.math_utils import \
 from yt.units.unit_systems import UnitSystem
 from yt.units.unit_object import unit_system_registry
 
-from yt.analysis_modules.list_modules import \
-    amods
+# The plotting, volume rendering, testing and analysis module namespaces pull
+# in matplotlib, nose and a long list of analysis modules, so their names are
+# only imported the first time they are accessed.  Each entry maps a name to
+# the module it comes from and the attribute to take from it, or None to
+# export the module itself.
+_lazy_imports = {
+    "visualization": ("yt.visualization", None),
+    "analysis_modules": ("yt.analysis_modules", None),
+    "testing": ("yt.testing", None),
+    "volume_rendering": ("yt.visualization.volume_rendering.api", None),
+    "run_nose": ("yt.testing", "run_nose"),
+    "amods": ("yt.analysis_modules.list_modules", "amods"),
+}
+for _name in ("FixedResolutionBuffer", "ObliqueFixedResolutionBuffer",
+              "write_bitmap", "write_image", "apply_colormap", "scale_image",
+              "write_projection", "SlicePlot", "AxisAlignedSlicePlot",
+              "OffAxisSlicePlot", "ProjectionPlot", "OffAxisProjectionPlot",
+              "show_colormaps", "add_cmap", "make_colormap", "ProfilePlot",
+              "PhasePlot", "ParticlePhasePlot", "ParticleProjectionPlot",
+              "ParticleImageBuffer", "ParticlePlot"):
+    _lazy_imports[_name] = ("yt.visualization.api", _name)
+for _name in ("volume_render", "create_scene", "ColorTransferFunction",
+              "TransferFunction", "off_axis_projection",
+              "interactive_render"):
+    _lazy_imports[_name] = ("yt.visualization.volume_rendering.api", _name)
+del _name
+
+def _lazy_import(module, name):
+    import importlib
+    source, attr = _lazy_imports[name]
+    value = importlib.import_module(source)
+    if attr is not None:
+        value = getattr(value, attr)
+    setattr(module, name, value)
+    return value
+
+import sys as _sys
+import types as _types
+
+class _LazyModule(_types.ModuleType):
+    def __getattr__(self, name):
+        if name not in _lazy_imports:
+            raise AttributeError("module '%s' has no attribute '%s'" %
+                                 (self.__name__, name))
+        return _lazy_import(self, name)
+
+    def __dir__(self):
+        return sorted(set(self.__dict__).union(_lazy_imports))
+
+__all__ = sorted(set(n for n in globals() if not n.startswith("_"))
+                 .union(_lazy_imports))
+try:
+    _sys.modules[__name__].__class__ = _LazyModule
+except TypeError:
+    # Module classes can only be swapped in Python 3.5 and later; elsewhere
+    # we replace the module object, keeping the original one alive.
+    _module = _LazyModule(__name__, __doc__)
+    _module.__dict__.update(globals())
+    _module._original_module = _sys.modules[__name__]
+    _sys.modules[__name__] = _module
+    del _module
@@ -63,6 +63,25 @@ ytcfg_defaults = dict(
     thread_field_detection = 'False',
     ignore_invalid_unit_operation_errors = 'False',
     chunk_size = '1000',
+    io_threads = '1',
+    max_open_files = '64',
+    file_pool_validation_interval = '1.0',
+    field_data_cache_mb = '0',
+    prefetch_chunks = '0',
+    index_cache = 'False',
+    index_cache_dir = '',
+    index_threads = '1',
+    fast_index = 'False',
+    selection_cache_mb = '0',
+    memmap_particle_io = 'False',
+    chunk_target_mb = '64',
+    chunk_target_seconds = '1.0',
+    field_detection_cache = 'False',
+    field_detection_cache_dir = '~/.yt/field_detection',
+    pixelize_threads = '1',
+    projection_cache = 'False',
+    projection_cache_dir = '~/.yt/projections',
+    projection_cache_size_mb = '1024',
     xray_data_dir = '/does/not/exist',
     default_colormap = 'arbre',
     ray_tracing_engine = 'embree',
@@ -31,7 +31,8 @@ from .profiles import \
     Profile1D, \
     Profile2D, \
     Profile3D, \
-    ParticleProfile
+    ParticleProfile, \
+    TimeSeriesProfile
 
 from .time_series import \
     DatasetSeries, \
@@ -16,6 +16,8 @@ Data containers that require processing before they can be utilized.
 
 import numpy as np
 from functools import wraps
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 import fileinput
 import io
 from re import finditer
@@ -34,6 +36,7 @@ from yt.funcs import \
     ensure_list, \
     mylog, \
     get_memory_usage, \
+    get_num_threads, \
     iterable, \
     only_on_root
 from yt.utilities.exceptions import \
@@ -43,7 +46,8 @@ from yt.utilities.exceptions import \
 from yt.fields.field_exceptions import \
     NeedsGridType
 from yt.utilities.lib.quad_tree import \
-    QuadTree
+    QuadTree, \
+    merge_quadtrees
 from yt.utilities.lib.interpolators import \
     ghost_zone_interpolate
 from yt.utilities.lib.misc_utilities import \
@@ -52,6 +56,8 @@ from yt.utilities.lib.marching_cubes import \
     march_cubes_grid, march_cubes_grid_flux
 from yt.utilities.minimal_representation import \
     MinimalProjectionData
+from yt.utilities.projection_cache import \
+    ProjectionCache
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
     parallel_objects, parallel_root_only, communication_system
 from yt.units.unit_object import Unit
@@ -100,6 +106,7 @@ class YTStreamline(YTSelectionContainer1D):
 
     """
     _type_name = "streamline"
+    _evictable_fields = False
     _con_args = ('positions')
     sort_by = 't'
     def __init__(self, positions, length = 1.0, fields=None, ds=None, **kwargs):
@@ -156,6 +163,10 @@ class YTStreamline(YTSelectionContainer1D):
         return mask
 
 
+def _add_chunk_to_trees(trees, values):
+    for tree, args in zip(trees, values):
+        tree.add_chunk_to_tree(*args)
+
 class YTQuadTreeProj(YTSelectionContainer2D):
     """
     This is a data object corresponding to a line integral through the
@@ -181,7 +192,10 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         multiple are specified (in a list) they will all be projected in
         the first pass.
     axis : int
-        The axis along which to slice.  Can be 0, 1, or 2 for x, y, z.
+        The axis along which to slice.  Can be 0, 1, or 2 for x, y, z.  If
+        a tuple or list of axes, such as ("x", "y", "z"), every chunk of
+        data is read once and a tuple of projections, one along each axis,
+        is returned.
     weight_field : string
         If supplied, the field being projected will be multiplied by this
         weight value before being integrated, and at the conclusion of the
@@ -206,6 +220,13 @@ class YTQuadTreeProj(YTSelectionContainer2D):
     field_parameters : dict of items
         Values to be passed as field parameters that can be
         accessed by generated fields.
+    num_threads : int, optional
+        The number of threads projecting the data.  Each thread adds its
+        share of the io chunks to its own quadtree while the data of the
+        next chunks are read, and the trees are merged pairwise at the end.
+        If None, the number given by the numthreads configuration option
+        or the OMP_NUM_THREADS environment variable, or else the number of
+        cores, is used.  Default: 1.
 
     Examples
     --------
@@ -213,16 +234,50 @@ class YTQuadTreeProj(YTSelectionContainer2D):
     >>> ds = load("RedshiftOutput0005")
     >>> prj = ds.proj("density", 0)
     >>> print proj["density"]
+    >>> prj_x, prj_y, prj_z = ds.proj("density", ("x", "y", "z"))
     """
     _key_fields = YTSelectionContainer2D._key_fields + ['weight_field']
     _type_name = "proj"
+    _evictable_fields = False
     _con_args = ('axis', 'field', 'weight_field')
     _container_fields = ('px', 'py', 'pdx', 'pdy', 'weight_field')
+    _init_args = ('weight_field', 'center', 'ds', 'data_source', 'style',
+                  'method', 'field_parameters', 'max_level', 'num_threads')
+    # Whether the projection was restored from the projection cache (see
+    # yt.utilities.projection_cache).
+    _projection_cache_hit = False
+
+    def __new__(cls, field, axis, *args, **kwargs):
+        if isinstance(axis, (tuple, list)):
+            return cls._from_axes(field, axis, *args, **kwargs)
+        return super(YTQuadTreeProj, cls).__new__(cls)
+
+    @classmethod
+    def _from_axes(cls, field, axes, *args, **kwargs):
+        kwargs.update(zip(cls._init_args, args))
+        if kwargs.get("data_source") is None:
+            kwargs["data_source"] = kwargs["ds"].all_data()
+        # The projections are made empty, then filled together so that they
+        # share a single read of the data source.
+        projs = tuple(cls(None, axis, **kwargs) for axis in axes)
+        fields = projs[0]._determine_fields(ensure_list(field or []))
+        if len(fields) > 0:
+            projs_left = [p for p in projs if not p.deserialize(fields)]
+            if len(projs_left) > 0:
+                cls._project_chunks(projs_left, fields)
+            for proj in projs_left:
+                proj.serialize()
+        return projs
+
     def __init__(self, field, axis, weight_field = None,
                  center = None, ds = None, data_source = None,
                  style = None, method = "integrate",
-                 field_parameters = None, max_level = None):
+                 field_parameters = None, max_level = None,
+                 num_threads = 1):
         YTSelectionContainer2D.__init__(self, axis, ds, field_parameters)
+        if num_threads is None:
+            num_threads = int(get_num_threads()) or cpu_count()
+        self.num_threads = max(num_threads, 1)
         # Style is deprecated, but if it is set, then it trumps method
         # keyword.  TODO: Remove this keyword and this check at some point in
         # the future.
@@ -278,6 +333,14 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         self._mrep.upload()
 
     def deserialize(self, fields):
+        cache = ProjectionCache.from_config()
+        if cache is not None and len(fields) > 0:
+            field_data = cache.load(self, fields)
+            if field_data is not None:
+                for field, data in field_data.items():
+                    self[field] = data
+                self._projection_cache_hit = True
+                return True
         if not ytcfg.getboolean("yt", "serialize"):
             return False
         for field in fields:
@@ -297,6 +360,10 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         return deserialized_successfully
 
     def serialize(self):
+        cache = ProjectionCache.from_config()
+        if cache is not None and len(self.field) > 0 and \
+           self.comm.rank == 0:
+            cache.store(self, self.field)
         if not ytcfg.getboolean("yt", "serialize"):
             return
         self._mrep.store(self.ds.parameter_filename + '.yt')
@@ -318,31 +385,76 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         fields = self._determine_fields(ensure_list(fields))
         # We need a new tree for every single set of fields we add
         if len(fields) == 0: return
-        tree = self._get_tree(len(fields))
+        self._project_chunks([self], fields)
+
+    @staticmethod
+    def _project_chunks(projs, fields):
+        # The projections in projs share their data source, method and
+        # number of threads; every io chunk is read once and added to the
+        # trees of all of them.
+        proj = projs[0]
+        merge_style, op = proj._get_merge_style()
+        # With several threads, chunk i goes into tree i % num_threads of
+        # each projection.  The chunks are still read and their fields
+        # generated here, one at a time, while the threads add the previous
+        # chunks to their trees.
+        trees = [[p._get_tree(len(fields)) for i in range(proj.num_threads)]
+                 for p in projs]
         # This only needs to be done if we are in parallel; otherwise, we can
         # safely build the mesh as we go.
         if communication_system.communicators[-1].size > 1:
-            for chunk in self.data_source.chunks([], "io", local_only = False):
-                self._initialize_chunk(chunk, tree)
+            for chunk in proj.data_source.chunks([], "io", local_only = False):
+                for p, ptrees in zip(projs, trees):
+                    p._initialize_chunk(chunk, ptrees[0])
+        pool = None
+        pending = [None] * proj.num_threads
+        if proj.num_threads > 1:
+            pool = ThreadPool(proj.num_threads)
         _units_initialized = False
-        with self.data_source._field_parameter_state(self.field_parameters):
-            for chunk in parallel_objects(self.data_source.chunks(
-                                          [], "io", local_only = True)):
+        try:
+            for i, chunk in enumerate(parallel_objects(
+                    proj.data_source.chunks([], "io", local_only = True))):
                 mylog.debug("Adding chunk (%s) to tree (%0.3e GB RAM)",
                             chunk.ires.size, get_memory_usage()/1024.)
-                if _units_initialized is False:
-                    self._initialize_projected_units(fields, chunk)
-                    _units_initialized = True
-                self._handle_chunk(chunk, fields, tree)
-        # Note that this will briefly double RAM usage
+                k = i % proj.num_threads
+                values = []
+                for p in projs:
+                    with proj.data_source._field_parameter_state(
+                            p.field_parameters):
+                        if _units_initialized is False:
+                            p._initialize_projected_units(fields, chunk)
+                        values.append(p._get_chunk_values(chunk, fields))
+                _units_initialized = True
+                ktrees = [ptrees[k] for ptrees in trees]
+                if pool is None:
+                    _add_chunk_to_trees(ktrees, values)
+                    continue
+                # Wait for these trees to be done with their previous chunk,
+                # which also bounds the number of chunks held in memory.
+                if pending[k] is not None:
+                    pending[k].get()
+                pending[k] = pool.apply_async(_add_chunk_to_trees,
+                                              (ktrees, values))
+            for result in pending:
+                if result is not None:
+                    result.get()
+            for p, ptrees in zip(projs, trees):
+                tree = p._merge_trees(ptrees, merge_style, pool)
+                p._finalize_tree(fields, tree, merge_style, op)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    def _get_merge_style(self):
         if self.method == "mip":
-            merge_style = -1
-            op = "max"
+            return -1, "max"
         elif self.method == "integrate":
-            merge_style = 1
-            op = "sum"
-        else:
-            raise NotImplementedError
+            return 1, "sum"
+        raise NotImplementedError
+
+    def _finalize_tree(self, fields, tree, merge_style, op):
+        # Note that this will briefly double RAM usage
         # TODO: Add the combine operation
         xax = self.ds.coordinates.x_axis[self.axis]
         yax = self.ds.coordinates.y_axis[self.axis]
@@ -420,7 +532,23 @@ class YTQuadTreeProj(YTSelectionContainer2D):
             else:
                 self._projected_units[field] = field_unit
 
+    def _merge_trees(self, trees, merge_style, pool = None):
+        # Merge the trees pairwise, each round halving their number, with
+        # the merges of a round running at once on the pool.
+        while len(trees) > 1:
+            pairs = list(zip(trees[::2], trees[1::2]))
+            merge = lambda pair: merge_quadtrees(pair[0], pair[1], merge_style)
+            if pool is None:
+                list(map(merge, pairs))
+            else:
+                pool.map(merge, pairs)
+            trees = trees[::2]
+        return trees[0]
+
     def _handle_chunk(self, chunk, fields, tree):
+        tree.add_chunk_to_tree(*self._get_chunk_values(chunk, fields))
+
+    def _get_chunk_values(self, chunk, fields):
         if self.method == "mip" or self._sum_only:
             dl = self.ds.quan(1.0, "")
         else:
@@ -440,7 +568,9 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         if self.weight_field is not None:
             w = chunk[self.weight_field]
             np.multiply(v, w[:,None], v)
-            np.multiply(w, dl, w)
+            # Not in place: the weight may be read again from this chunk by
+            # projections along other axes.
+            w = np.multiply(w, dl)
         else:
             w = np.ones(chunk.ires.size, dtype="float64")
         icoords = chunk.icoords
@@ -449,7 +579,7 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         i1 = icoords[:,xax]
         i2 = icoords[:,yax]
         ilevel = chunk.ires * self.ds.ires_factor
-        tree.add_chunk_to_tree(i1, i2, ilevel, v, w)
+        return i1, i2, ilevel, v, w
 
     def to_pw(self, fields=None, center='c', width=None, origin='center-window'):
         r"""Create a :class:`~yt.visualization.plot_window.PWViewerMPL` from this
@@ -508,6 +638,7 @@ class YTCoveringGrid(YTSelectionContainer3D):
     """
     _spatial = True
     _type_name = "covering_grid"
+    _evictable_fields = False
     _con_args = ('level', 'left_edge', 'ActiveDimensions')
     _container_fields = (("index", "dx"),
                          ("index", "dy"),
@@ -1078,6 +1209,7 @@ class YTSurface(YTSelectionContainer3D):
     >>> surf.export_ply("my_galaxy.ply", bounds = bounds)
     """
     _type_name = "surface"
+    _evictable_fields = False
     _con_args = ("data_source", "surface_field", "field_value")
     _container_fields = (("index", "dx"),
                          ("index", "dy"),
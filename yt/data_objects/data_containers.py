@@ -20,7 +20,7 @@ import numpy as np
 import weakref
 import shelve
 
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from contextlib import contextmanager
 
 from yt.data_objects.particle_io import particle_handler_registry
@@ -97,6 +97,169 @@ class YTFieldData(dict):
     """
     pass
 
+class CachedFieldData(YTFieldData):
+    """
+    Field data whose arrays are accounted for in a dataset-wide
+    :class:`FieldDataCache`.  The cache may evict fields from here to stay
+    under its memory budget; evicted fields are regenerated on their next
+    access through the owning data container.
+
+    Only fields stored with :meth:`store`, which the container uses for the
+    fields it reads or generates itself, may be evicted.  Fields set any
+    other way, such as through ``container[field] = value``, are pinned.
+    """
+    def __init__(self, cache, owner):
+        super(CachedFieldData, self).__init__()
+        self._cache = cache
+        self._owner = weakref.ref(owner)
+
+    @property
+    def nbytes(self):
+        """The number of bytes held by the arrays in this container."""
+        return self._cache.container_nbytes(self)
+
+    def __setitem__(self, key, val):
+        super(CachedFieldData, self).__setitem__(key, val)
+        self._cache.add(self, key, val)
+
+    def store(self, key, val):
+        """Set *key* to *val*, allowing the cache to evict it."""
+        super(CachedFieldData, self).__setitem__(key, val)
+        self._cache.add(self, key, val, evictable = True)
+
+    def __delitem__(self, key):
+        super(CachedFieldData, self).__delitem__(key)
+        self._cache.remove(self, key)
+
+    def pop(self, key, *args):
+        rv = super(CachedFieldData, self).pop(key, *args)
+        self._cache.remove(self, key)
+        return rv
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, val in dict(*args, **kwargs).items():
+            self[key] = val
+
+    def clear(self):
+        super(CachedFieldData, self).clear()
+        self._cache.remove_all(self)
+
+class FieldDataCache(object):
+    """
+    Tracks the memory held by the field data of every data container of a
+    dataset and evicts the least recently used fields once more than
+    *max_bytes* are held.  A *max_bytes* of zero (or less) means the cache
+    is unbounded, in which case only the statistics are collected.
+
+    Fields are only evicted after a field access has completed, and never
+    from a container that is in the middle of generating fields.
+    """
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (id(field_data), field) -> nbytes, in least recently used order
+        self._entries = OrderedDict()
+        # The entries that may be evicted; everything else is pinned.
+        self._evictable = set()
+        self._refs = {}
+        self._keys = defaultdict(set)
+        self._sizes = defaultdict(lambda: 0)
+
+    def _track(self, fd):
+        fid = id(fd)
+        if fid not in self._refs:
+            def _forget(ref, fid=fid, cache=weakref.proxy(self)):
+                try:
+                    cache._forget(fid)
+                except ReferenceError:
+                    pass
+            self._refs[fid] = weakref.ref(fd, _forget)
+        return fid
+
+    def _forget(self, fid):
+        for key in self._keys.pop(fid, ()):
+            self.nbytes -= self._entries.pop((fid, key), 0)
+            self._evictable.discard((fid, key))
+        self._refs.pop(fid, None)
+        self._sizes.pop(fid, None)
+
+    def add(self, fd, key, val, evictable = False):
+        fid = self._track(fd)
+        self.remove(fd, key)
+        nbytes = getattr(val, "nbytes", 0)
+        self._entries[fid, key] = nbytes
+        if evictable:
+            self._evictable.add((fid, key))
+        self._keys[fid].add(key)
+        self._sizes[fid] += nbytes
+        self.nbytes += nbytes
+
+    def remove(self, fd, key):
+        fid = id(fd)
+        nbytes = self._entries.pop((fid, key), None)
+        if nbytes is None: return
+        self._evictable.discard((fid, key))
+        self._keys[fid].discard(key)
+        self._sizes[fid] -= nbytes
+        self.nbytes -= nbytes
+
+    def remove_all(self, fd):
+        fid = id(fd)
+        for key in list(self._keys.get(fid, ())):
+            self.remove(fd, key)
+
+    def container_nbytes(self, fd):
+        return self._sizes.get(id(fd), 0)
+
+    def access(self, fd, key, hit):
+        """
+        Record an access of *key* in *fd*, marking it as the most recently
+        used field, and evict fields if we are over budget.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        entry = (id(fd), key)
+        if entry in self._entries:
+            self._entries[entry] = self._entries.pop(entry)
+        self.evict(protect = entry)
+
+    def evict(self, protect = None):
+        if self.max_bytes <= 0: return
+        for entry in list(self._entries.keys()):
+            if self.nbytes <= self.max_bytes: break
+            if entry == protect or entry not in self._evictable: continue
+            fid, key = entry
+            ref = self._refs.get(fid)
+            fd = ref() if ref is not None else None
+            if fd is None: continue
+            owner = fd._owner()
+            if owner is None or owner._locked or \
+              not owner._evictable_fields:
+                continue
+            mylog.debug("Evicting %s (%s bytes) from the field data cache",
+                        key, self._entries[entry])
+            fd.pop(key)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Return a dict of the hit, miss and eviction counters along with the
+        number of bytes currently held and the budget.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes}
+
 class RegisteredDataContainer(type):
     def __init__(cls, name, b, d):
         type.__init__(cls, name, b, d)
@@ -119,6 +282,11 @@ class YTDataContainer(object):
     _tds_fields = ()
     _field_cache = None
     _index = None
+    _locked = False
+    # Whether the fields this container reads or generates may be evicted
+    # by the field data cache and regenerated on demand.  Containers that
+    # cannot regenerate their fields through get_data opt out.
+    _evictable_fields = True
 
     def __init__(self, ds, field_parameters):
         """
@@ -140,7 +308,7 @@ class YTDataContainer(object):
         self._current_fluid_type = self.ds.default_fluid_type
         self.ds.objects.append(weakref.proxy(self))
         mylog.debug("Appending object to %s (type: %s)", self.ds, type(self))
-        self.field_data = YTFieldData()
+        self.field_data = CachedFieldData(self.ds.field_data_cache, self)
         self._default_field_parameters = {
             'center': self.ds.arr(np.zeros(3, dtype='float64'), 'cm'),
             'bulk_velocity': self.ds.arr(np.zeros(3, dtype='float64'), 'cm/s'),
@@ -263,10 +431,12 @@ class YTDataContainer(object):
         Returns a single field.  Will add if necessary.
         """
         f = self._determine_fields([key])[0]
-        if f not in self.field_data and key not in self.field_data:
+        hit = f in self.field_data or key in self.field_data
+        if not hit:
             if f in self._container_fields:
                 self.field_data[f] = \
                     self.ds.arr(self._generate_container_field(f))
+                self._record_field_access(f, hit)
                 return self.field_data[f]
             else:
                 self.get_data(f)
@@ -281,8 +451,14 @@ class YTDataContainer(object):
             elif isinstance(f, bytes):
                 fi = self.ds._get_field_info("unknown", f)
             rv = self.ds.arr(self.field_data[key], fi.units)
+        self._record_field_access(f, hit)
         return rv
 
+    def _record_field_access(self, field, hit):
+        fd = self.field_data
+        if isinstance(fd, CachedFieldData):
+            fd._cache.access(fd, field, hit)
+
     def __setitem__(self, key, val):
         """
         Sets a field to be some other value.
@@ -1086,6 +1262,16 @@ class YTSelectionContainer(YTDataContainer, ParallelAnalysisInterface):
         # This is an iterator that will yield the necessary chunks.
         self.get_data() # Ensure we have built ourselves
         if fields is None: fields = []
+        # The number of io chunks to read ahead in the background; None
+        # defers to the prefetch_chunks configuration option.
+        prefetch = kwargs.pop("prefetch", None)
+        if kwargs.get("chunk_sizing", None) == "adaptive":
+            # Adaptive io chunks are sized by the bytes of the fields read.
+            kwargs.setdefault("nfields", len(fields))
+        if chunking_style == "io" and len(fields) > 0:
+            prefetcher = self.index._chunk_prefetcher(self, fields, prefetch)
+            if prefetcher is not None:
+                kwargs["prefetcher"] = prefetcher
         for chunk in self.index._chunk(self, chunking_style, **kwargs):
             with self._chunked_read(chunk):
                 self.get_data(fields)
@@ -1179,23 +1365,74 @@ class YTSelectionContainer(YTDataContainer, ParallelAnalysisInterface):
         read_fluids, gen_fluids = self.index._read_fluid_fields(
                                         fluids, self, self._current_chunk)
         for f, v in read_fluids.items():
-            self.field_data[f] = self.ds.arr(v, input_units = finfos[f].units)
+            self._store_field(f, self.ds.arr(v, input_units = finfos[f].units))
             self.field_data[f].convert_to_units(finfos[f].output_units)
 
         read_particles, gen_particles = self.index._read_particle_fields(
                                         particles, self, self._current_chunk)
         for f, v in read_particles.items():
-            self.field_data[f] = self.ds.arr(v, input_units = finfos[f].units)
+            self._store_field(f, self.ds.arr(v, input_units = finfos[f].units))
             self.field_data[f].convert_to_units(finfos[f].output_units)
 
         fields_to_generate += gen_fluids + gen_particles
-        self._generate_fields(fields_to_generate)
+        self._generate_fields(fields_to_generate, keep = ofields)
         for field in list(self.field_data.keys()):
             if field not in ofields:
                 self.field_data.pop(field)
 
-    def _generate_fields(self, fields_to_generate):
+    def _field_generation_plan(self, fields_to_generate):
+        """
+        Order *fields_to_generate* so that every field comes after the
+        fields in the list that it depends on, using the dependencies
+        recorded during field detection.  Returns the ordered list and a
+        dict mapping each field to the fields in the list that consume it.
+        Fields whose dependencies are unknown or cyclic keep their original
+        relative order at the end of the list.
+        """
+        pending = set(fields_to_generate)
+        deps = {}
+        for field in fields_to_generate:
+            fd = self.ds.field_dependencies.get(field, None) or \
+                 self.ds.field_dependencies.get(field[1], None)
+            if fd is None:
+                try:
+                    fd = self.ds._get_field_info(*field).get_dependencies(
+                        ds = self.ds)
+                    self.ds.field_dependencies[field] = fd
+                except Exception:
+                    # Fields whose dependencies cannot be detected are just
+                    # generated in the order they were requested.
+                    deps[field] = set()
+                    continue
+            try:
+                requested = self._determine_fields(list(set(fd.requested)))
+            except YTFieldNotFound:
+                requested = []
+            deps[field] = set(f for f in requested
+                              if f in pending and f != field)
+        consumers = defaultdict(set)
+        for field in fields_to_generate:
+            for dep in deps[field]:
+                consumers[dep].add(field)
+        order = []
+        while pending:
+            ready = [f for f in fields_to_generate if f in pending and
+                     not (deps[f] & pending)]
+            if len(ready) == 0:
+                order += [f for f in fields_to_generate if f in pending]
+                break
+            order += ready
+            pending.difference_update(ready)
+        return order, consumers
+
+    def _generate_fields(self, fields_to_generate, keep = None):
         index = 0
+        # Derived fields are evaluated in dependency order.  Intermediate
+        # fields not listed in *keep* are dropped as soon as the last field
+        # that consumes them has been generated.
+        fields_to_generate, consumers = \
+            self._field_generation_plan(fields_to_generate)
+        done = set(f for f in fields_to_generate if f in self.field_data)
         with self._field_lock():
             # At this point, we assume that any fields that are necessary to
             # *generate* a field are in fact already available to us.  Note
@@ -1203,10 +1440,13 @@ class YTSelectionContainer(YTDataContainer, ParallelAnalysisInterface):
             # fields have a spatial requirement.  This will be checked inside
             # _generate_field, at which point additional dependencies may
             # actually be noted.
-            while any(f not in self.field_data for f in fields_to_generate):
+            while any(f not in done for f in fields_to_generate):
                 field = fields_to_generate[index % len(fields_to_generate)]
                 index += 1
-                if field in self.field_data: continue
+                if field in done: continue
+                if field in self.field_data:
+                    done.add(field)
+                    continue
                 fi = self.ds._get_field_info(*field)
                 try:
                     fd = self._generate_field(field)
@@ -1243,12 +1483,35 @@ class YTSelectionContainer(YTDataContainer, ParallelAnalysisInterface):
                         raise YTFieldUnitError(fi, fd.units)
                     except UnitParseError:
                         raise YTFieldUnitParseError(fi)
-                    self.field_data[field] = fd
+                    self._store_field(field, fd)
+                    done.add(field)
+                    if keep is not None:
+                        self._release_intermediates(
+                            field, consumers, done, keep)
                 except GenerationInProgress as gip:
                     for f in gip.fields:
+                        # This may be an intermediate we already released.
+                        done.discard(f)
                         if f not in fields_to_generate:
                             fields_to_generate.append(f)
 
+    def _store_field(self, field, val):
+        # Fields we read or generated ourselves can be regenerated, so the
+        # field data cache is allowed to evict them.
+        if isinstance(self.field_data, CachedFieldData):
+            self.field_data.store(field, val)
+        else:
+            self.field_data[field] = val
+
+    def _release_intermediates(self, field, consumers, done, keep):
+        for dep in list(consumers):
+            users = consumers[dep]
+            users.discard(field)
+            if len(users) > 0 or dep in keep or dep not in done:
+                continue
+            del consumers[dep]
+            self.field_data.pop(dep, None)
+
     @contextmanager
     def _field_lock(self):
         self._locked = True
@@ -15,6 +15,7 @@ points -- are excluded here, and left to the EnzoDerivedFields.)
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
+import copy
 import numpy as np
 
 from yt.funcs import \
@@ -49,6 +50,13 @@ class RegisteredDerivedQuantity(type):
 @add_metaclass(RegisteredDerivedQuantity)
 class DerivedQuantity(ParallelAnalysisInterface):
     num_vals = -1
+    # While DerivedQuantityCollection.compute runs, calls are first made in
+    # "record" mode, which only notes the passes over the data a call needs,
+    # and then in "replay" mode, which hands back the intermediate values
+    # those passes produced from a single shared pass.
+    _fused_mode = None
+    _fused_passes = None
+    _fused_values = None
 
     def __init__(self, data_source):
         self.data_source = data_source
@@ -61,21 +69,34 @@ class DerivedQuantity(ParallelAnalysisInterface):
         # create the index if it doesn't exist yet
         self.data_source.ds.index
         self.count_values(*args, **kwargs)
+        if self._fused_mode == "record":
+            self._fused_passes.append((copy.copy(self), args, kwargs))
+            return [None] * max(self.num_vals, 0)
+        if self._fused_mode == "replay" and self._fused_values:
+            return self.reduce_intermediate(self._fused_values.pop(0))
         chunks = self.data_source.chunks([], chunking_style="io")
         storage = {}
         for sto, ds in parallel_objects(chunks, -1, storage = storage):
             sto.result = self.process_chunk(ds, *args, **kwargs)
+        values = self._gather_values(storage)
+        values = self.reduce_intermediate(values)
+        return values
+
+    def _gather_values(self, storage, index = None):
         # Now storage will have everything, and will be done via pickling, so
         # the units will be preserved.  (Credit to Nathan for this
-        # idea/implementation.)
+        # idea/implementation.)  With *index*, each stored result is a list
+        # of results of several passes and we take the one at *index*.
         values = [ [] for i in range(self.num_vals) ]
         for key in sorted(storage):
+            result = storage[key]
+            if index is not None:
+                result = result[index]
             for i in range(self.num_vals):
-                values[i].append(storage[key][i])
+                values[i].append(result[i])
         # These will be YTArrays
-        values = [self.data_source.ds.arr(values[i]) for i in range(self.num_vals)]
-        values = self.reduce_intermediate(values)
-        return values
+        return [self.data_source.ds.arr(values[i])
+                for i in range(self.num_vals)]
 
     def process_chunk(self, data, *args, **kwargs):
         raise NotImplementedError
@@ -101,6 +122,81 @@ class DerivedQuantityCollection(object):
     def keys(self):
         return derived_quantity_registry.keys()
 
+    def compute(self, quantities):
+        r"""
+        Calculate several derived quantities with a single pass over the
+        data, returning a list of their results in order.
+
+        Each item of *quantities* is either the name of a quantity (as a
+        class name or as its attribute name on ``quantities``), or a tuple
+        of the name, the positional arguments and optionally a dict of
+        keyword arguments.  Positional arguments that are not a tuple are
+        passed as a single argument.
+
+        The ``process_chunk`` methods of all quantities run on each chunk in
+        turn, so fields they share are read once.  After the first chunk,
+        every field used so far is read up front for each chunk.  Each
+        quantity then reduces its own results exactly as it would when
+        called on its own.
+
+        Examples
+        --------
+
+        >>> ds = load("IsolatedGalaxy/galaxy0030/galaxy0030")
+        >>> sp = ds.sphere("max", (10, "kpc"))
+        >>> ext, mass, av = sp.quantities.compute(
+        ...     [("extrema", "density"),
+        ...      "total_mass",
+        ...      ("weighted_average_quantity", ("temperature", "cell_mass"))])
+
+        """
+        names = dict((camelcase_to_underscore(k), k) for k in self.keys())
+        requests = []
+        for item in quantities:
+            if not isinstance(item, tuple):
+                item = (item,)
+            name = item[0]
+            args = item[1] if len(item) > 1 else ()
+            kwargs = item[2] if len(item) > 2 else {}
+            if not isinstance(args, tuple):
+                args = (args,)
+            requests.append((self[names.get(name, name)], args, kwargs))
+        # Find out which passes over the data each quantity would make.
+        # Errors are ignored here; a quantity that raises is computed on its
+        # own below, which raises them again.
+        passes = []
+        for dq, args, kwargs in requests:
+            dq._fused_mode, dq._fused_passes = "record", []
+            try:
+                dq(*args, **kwargs)
+            except Exception:
+                pass
+            passes += [(dq, p) for p in dq._fused_passes]
+            dq._fused_mode = dq._fused_passes = None
+        self.data_source.ds.index
+        chunks = self.data_source.chunks([], chunking_style="io")
+        storage = {}
+        fields = None
+        for sto, chunk in parallel_objects(chunks, -1, storage = storage):
+            if fields:
+                chunk.get_data(fields)
+            sto.result = [q.process_chunk(chunk, *args, **kwargs)
+                          for dq, (q, args, kwargs) in passes]
+            if fields is None:
+                fields = list(chunk.field_data.keys())
+        for dq, args, kwargs in requests:
+            dq._fused_values = []
+        for i, (dq, (q, args, kwargs)) in enumerate(passes):
+            dq._fused_values.append(q._gather_values(storage, i))
+        results = []
+        for dq, args, kwargs in requests:
+            dq._fused_mode = "replay"
+            try:
+                results.append(dq(*args, **kwargs))
+            finally:
+                dq._fused_mode = dq._fused_values = None
+        return results
+
 class WeightedAverageQuantity(DerivedQuantity):
     r"""
     Calculates the weight average of a field or fields.
@@ -529,6 +625,170 @@ class Extrema(DerivedQuantity):
         return [self.data_source.ds.arr([mis.min(), mas.max()])
                 for mis, mas in zip(values[::2], values[1::2])]
 
+def _quantile_sketch(values, weights, size):
+    """
+    Summarize *values*, with optional *weights*, by *size* buckets of
+    roughly equal weight.  Returns arrays of the smallest value, the largest
+    value and the total weight in each bucket; unused buckets have zero
+    weight, so every sketch has the same shape and sketches can be stacked.
+    """
+    lo = np.zeros(size, dtype="float64")
+    hi = np.zeros(size, dtype="float64")
+    bw = np.zeros(size, dtype="float64")
+    values = np.asarray(values, dtype="float64").ravel()
+    if weights is None:
+        weights = np.ones_like(values)
+    else:
+        weights = np.asarray(weights, dtype="float64").ravel()
+    keep = np.isfinite(values) & (weights > 0)
+    values = values[keep]
+    weights = weights[keep]
+    if values.size == 0:
+        return lo, hi, bw
+    order = np.argsort(values, kind="mergesort")
+    values = values[order]
+    weights = weights[order]
+    cweights = np.cumsum(weights)
+    # Each value goes to the bucket holding the middle of its weight, so
+    # bucket indices are non-decreasing along the sorted values.
+    ind = ((cweights - 0.5 * weights) / cweights[-1] * size).astype("int64")
+    np.clip(ind, 0, size - 1, ind)
+    bw[:] = np.bincount(ind, weights=weights, minlength=size)
+    buckets = np.arange(size)
+    starts = np.searchsorted(ind, buckets, side="left")
+    ends = np.searchsorted(ind, buckets, side="right") - 1
+    used = ends >= starts
+    lo[used] = values[starts[used]]
+    hi[used] = values[ends[used]]
+    return lo, hi, bw
+
+def _sketch_quantiles(lo, hi, bw, q):
+    """
+    Estimate the quantiles *q* of the merged sketch buckets *lo*, *hi* and
+    *bw*, spreading the weight of each bucket uniformly between its
+    smallest and largest value.
+    """
+    used = bw > 0
+    lo = lo[used]
+    hi = hi[used]
+    bw = bw[used]
+    if bw.size == 0:
+        return np.nan * np.ones_like(q)
+    width = hi - lo
+    ramp = width > 0
+    # The cumulative weight below x is the sum of the ramps rising from lo
+    # to hi for buckets with some width, plus a step at lo for the others.
+    slope = bw[ramp] / width[ramp]
+    rlo = lo[ramp]
+    rhi = hi[ramp]
+    lo_order = np.argsort(rlo)
+    hi_order = np.argsort(rhi)
+    rlo = rlo[lo_order]
+    rhi = rhi[hi_order]
+    lo_slope = np.concatenate([[0.0], np.cumsum(slope[lo_order])])
+    lo_offset = np.concatenate([[0.0], np.cumsum((slope * lo[ramp])[lo_order])])
+    hi_slope = np.concatenate([[0.0], np.cumsum(slope[hi_order])])
+    hi_offset = np.concatenate([[0.0], np.cumsum((slope * hi[ramp])[hi_order])])
+    slo = lo[~ramp]
+    step_order = np.argsort(slo)
+    slo = slo[step_order]
+    steps = np.concatenate([[0.0], np.cumsum(bw[~ramp][step_order])])
+    points = np.unique(np.concatenate([lo, hi]))
+    i = np.searchsorted(rlo, points, side="right")
+    j = np.searchsorted(rhi, points, side="right")
+    k = np.searchsorted(slo, points, side="right")
+    cdf = (points * lo_slope[i] - lo_offset[i]) \
+        - (points * hi_slope[j] - hi_offset[j]) + steps[k]
+    # Step buckets jump at their value; start the curve from zero weight so
+    # that the lowest quantiles land on the smallest value.
+    total = bw.sum(dtype=np.float64)
+    cdf = np.minimum(cdf, total)
+    cdf[-1] = total
+    points = np.concatenate([[points[0]], points])
+    cdf = np.maximum.accumulate(np.concatenate([[0.0], cdf]))
+    return np.interp(np.asarray(q) * total, cdf, points)
+
+class Quantiles(DerivedQuantity):
+    r"""
+    Calculates approximate quantiles (for instance, the median) of a field
+    or list of fields, optionally weighted by another field.  Returns a
+    YTArray of the requested quantiles for each field requested; if one,
+    it returns a single YTArray, if many, a list of YTArrays in order of
+    the listed fields.  If q is a single number, each field gives a single
+    YTQuantity.
+
+    Rather than holding every value in memory, each chunk of data is
+    summarized by a sketch of sketch_size buckets of about equal weight,
+    and the sketches of all the chunks and processors are merged to give
+    the quantiles.  The fraction of the total weight lying below the
+    returned value differs from the requested quantile by at most
+    1/sketch_size, plus, per chunk, the largest single weight divided by
+    the total weight.  Memory use is sketch_size values per chunk,
+    whatever the number of cells or particles.
+
+    Parameters
+    ----------
+
+    fields : string / tuple, or list of strings / tuples
+        The field or fields of which the quantiles are to be calculated.
+    q : float or list of floats
+        The quantiles to calculate, between 0 and 1.  Default: 0.5, the
+        median.
+    weight : string or tuple
+        The weight field.  If None, every element counts equally.
+        Default: None
+    sketch_size : int
+        The number of buckets used to summarize each chunk.  Larger values
+        are more accurate and use more memory.
+        Default: 200
+
+    Examples
+    --------
+
+    >>> ds = load("IsolatedGalaxy/galaxy0030/galaxy0030")
+    >>> ad = ds.all_data()
+    >>> print ad.quantities.quantiles([("gas", "density"),
+    ...                                ("gas", "temperature")],
+    ...                               q=[0.1, 0.5, 0.9],
+    ...                               weight=("gas", "cell_mass"))
+
+    """
+    def count_values(self, fields, q, weight, sketch_size):
+        self.num_vals = 3 * len(fields)
+        self._q = q
+
+    def __call__(self, fields, q = 0.5, weight = None, sketch_size = 200):
+        fields = ensure_list(fields)
+        scalar = np.isscalar(q)
+        q = np.atleast_1d(np.asarray(q, dtype="float64"))
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("Quantiles must lie between 0 and 1.")
+        rv = super(Quantiles, self).__call__(fields, q, weight, sketch_size)
+        if rv[0] is not None and scalar:
+            rv = [r[0] for r in rv]
+        if len(rv) == 1: rv = rv[0]
+        return rv
+
+    def process_chunk(self, data, fields, q, weight, sketch_size):
+        if weight is None:
+            my_weight = None
+        else:
+            my_weight = data[weight].d
+        vals = []
+        for field in fields:
+            fd = data[field]
+            lo, hi, bw = _quantile_sketch(fd.d, my_weight, sketch_size)
+            vals += [data.ds.arr(lo, fd.units), data.ds.arr(hi, fd.units), bw]
+        return vals
+
+    def reduce_intermediate(self, values):
+        rvals = []
+        for lo, hi, bw in zip(values[::3], values[1::3], values[2::3]):
+            rvals.append(self.data_source.ds.arr(
+                _sketch_quantiles(lo.d.ravel(), hi.d.ravel(),
+                                  np.asarray(bw).ravel(), self._q), lo.units))
+        return rvals
+
 class SampleAtMaxFieldValues(DerivedQuantity):
     r"""
     Calculates the maximum value and returns whichever fields are asked to be
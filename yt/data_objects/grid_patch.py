@@ -362,14 +362,23 @@ class AMRGridPatch(YTSelectionContainer):
         if self._cache_mask and hash(selector) == self._last_selector_id:
             mask = self._last_mask
         else:
-            mask = selector.fill_mask(self)
+            cache = self.index.selection_cache
+            key = cache.key(selector, self.id)
+            entry = cache.get(key)
+            if entry is not None:
+                mask, count = entry
+            else:
+                mask = selector.fill_mask(self)
+                if mask is None:
+                    count = 0
+                    cache.set(key, (mask, count))
+                else:
+                    count = mask.sum()
+                    cache.set(key, (mask, count), mask.nbytes)
             if self._cache_mask:
                 self._last_mask = mask
             self._last_selector_id = hash(selector)
-            if mask is None:
-                self._last_count = 0
-            else:
-                self._last_count = mask.sum()
+            self._last_count = count
         return mask
 
     def select(self, selector, source, dest, offset):
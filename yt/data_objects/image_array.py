@@ -15,7 +15,6 @@ import warnings
 import numpy as np
 from yt.config import \
     ytcfg
-from yt.visualization.image_writer import write_bitmap, write_image
 from yt.units.yt_array import YTArray
 
 
@@ -301,6 +300,7 @@ class ImageArray(YTArray):
             warnings.warn("'clip_ratio' keyword is deprecated. Use 'sigma_clip' instead")
             sigma_clip = clip_ratio
 
+        from yt.visualization.image_writer import write_bitmap
         if sigma_clip is not None:
             nz = out[:, :, :3][out[:, :, :3].nonzero()]
             return write_bitmap(out.swapaxes(0, 1), filename,
@@ -355,6 +355,7 @@ class ImageArray(YTArray):
         if filename[-4:] != '.png':
             filename += '.png'
 
+        from yt.visualization.image_writer import write_image
         #TODO: Write info dict as png metadata
         if channel is None:
             return write_image(self.swapaxes(0, 1).to_ndarray(), filename,
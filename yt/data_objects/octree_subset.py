@@ -37,7 +37,19 @@ def cell_count_cache(func):
     def cc_cache_func(self, dobj):
         if hash(dobj.selector) != self._last_selector_id:
             self._cell_count = -1
-        rv = func(self, dobj)
+        cache = self.ds.index.selection_cache
+        key = cache.key(dobj.selector,
+                        (func.__name__,) + self._selection_cache_id)
+        entry = cache.get(key)
+        # The oct handler is kept with the entry, so it cannot be replaced
+        # by another one without us noticing.
+        if entry is not None and entry[1] is self.oct_handler:
+            rv = entry[0]
+        else:
+            rv = func(self, dobj)
+            # Cached arrays are shared between data containers.
+            rv.flags.writeable = False
+            cache.set(key, (rv, self.oct_handler), rv.nbytes)
         self._cell_count = rv.shape[0]
         self._last_selector_id = hash(dobj.selector)
         return rv
@@ -70,6 +82,14 @@ class OctreeSubset(YTSelectionContainer):
         self.base_region = base_region
         self.base_selector = base_region.selector
 
+    @property
+    def _selection_cache_id(self):
+        # Identifies the cells of this subset in the selection cache.
+        # Several subsets can share a domain_id (such as the ARTIO subsets,
+        # which all have -1) but cover different ranges of the index.
+        return (self.__class__.__name__, self.domain_id, self._domain_offset,
+                getattr(self, "min_ind", None), getattr(self, "max_ind", None))
+
     def __getitem__(self, key):
         tr = super(OctreeSubset, self).__getitem__(key)
         try:
@@ -14,11 +14,18 @@ Profile classes, to deal with generating and obtaining profiles
 #-----------------------------------------------------------------------------
 
 import numpy as np
-
-from yt.fields.derived_field import DerivedField
+import os
+import shutil
+import tempfile
+from multiprocessing import cpu_count
+
+from yt.fields.derived_field import \
+    DerivedField, \
+    NullFunc
 from yt.frontends.ytdata.utilities import \
     save_as_dataset
 from yt.funcs import \
+    get_num_threads, \
     get_output_filename, \
     ensure_list, \
     iterable
@@ -32,7 +39,10 @@ from yt.utilities.exceptions import \
 from yt.utilities.lib.misc_utilities import \
     new_bin_profile1d, \
     new_bin_profile2d, \
-    new_bin_profile3d
+    new_bin_profile3d, \
+    new_bin_profile_threaded, \
+    new_bin_profile_private, \
+    merge_profile_private
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
     ParallelAnalysisInterface, parallel_objects
 from yt.utilities.lib.particle_mesh_operations import \
@@ -81,9 +91,104 @@ class ProfileFieldAccumulator(object):
         self.qvalues = np.zeros(shape, dtype="float64")
         self.used = np.zeros(size, dtype='bool')
         self.weight_values = np.zeros(size, dtype="float64")
+        self.private = None
+
+    def private_storage(self, num_threads):
+        # Accumulators for each thread over flattened bins, kept until
+        # merge_private so that they are only allocated and reduced once.
+        if self.private is None or self.private[0].shape[0] != num_threads:
+            self.merge_private()
+            nbins = self.weight_values.size
+            nf = self.values.shape[-1]
+            self.private = (
+                np.zeros((num_threads, nbins), dtype="float64"),
+                np.zeros((num_threads, nbins, nf), dtype="float64"),
+                np.zeros((num_threads, nbins, nf), dtype="float64"),
+                np.zeros((num_threads, nbins, nf), dtype="float64"),
+                np.zeros((num_threads, nbins), dtype="uint8"))
+        return self.private
+
+    def merge_private(self):
+        if self.private is None: return
+        nf = self.values.shape[-1]
+        merge_profile_private(*(self.private + (
+            self.weight_values.reshape(-1),
+            self.values.reshape(-1, nf),
+            self.mvalues.reshape(-1, nf),
+            self.qvalues.reshape(-1, nf),
+            self.used.reshape(-1).view("uint8"))))
+        self.private = None
+
+class ProfileBinIndices(object):
+    """
+    The filter and bin indices of the data in each chunk binned by a
+    profile, kept in memory or, if a directory is given, in files there.
+    Fields added to the profile later can then be binned without reading
+    the bin fields again.
+    """
+    def __init__(self, size, path=None):
+        self.size = size
+        self.path = None
+        if path is not None:
+            try:
+                os.makedirs(path)
+            except OSError:
+                if not os.path.isdir(path):
+                    raise
+            self.path = tempfile.mkdtemp(prefix="yt_profile_bins_", dir=path)
+        # The smallest integer type that can hold a flattened bin index
+        self.dtype = np.min_scalar_type(max(int(np.prod(size)) - 1, 0))
+        self._data = {}
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def store(self, key, filter, bin_inds):
+        if filter is None:
+            # Nothing in this chunk lies within the bounds of the profile
+            self._data[key] = None
+            return
+        bins = np.ravel_multi_index(bin_inds, self.size).astype(self.dtype)
+        if self.path is None:
+            self._data[key] = (filter, bins)
+        else:
+            fn = os.path.join(self.path, "chunk_%08i.npz" % key)
+            np.savez(fn, filter=filter, bins=bins)
+            self._data[key] = fn
+
+    def load(self, key):
+        entry = self._data[key]
+        if entry is None:
+            return None, None
+        if self.path is None:
+            filter, bins = entry
+        else:
+            f = np.load(entry)
+            filter, bins = f["filter"], f["bins"]
+            f.close()
+        return filter, np.unravel_index(bins.astype(np.intp), self.size)
+
+    def clear(self):
+        self._data.clear()
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __del__(self):
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
 
 class ProfileND(ParallelAnalysisInterface):
     """The profile object class"""
+    # Number of OpenMP threads used to bin each chunk, and whether the
+    # threaded binning must reproduce the serial sums exactly.
+    num_threads = 1
+    deterministic = False
+    # Whether the bin indices of each chunk are kept for later calls to
+    # add_fields: False, True to keep them in memory, or a directory to
+    # keep them in.
+    retain_bins = False
+    _bin_indices = None
+
     def __init__(self, data_source, weight_field = None):
         self.data_source = data_source
         self.ds = data_source.ds
@@ -110,11 +215,20 @@ class ProfileND(ParallelAnalysisInterface):
         for f in fields:
             self.field_info[f] = self.data_source.ds.field_info[f]
         temp_storage = ProfileFieldAccumulator(len(fields), self.size)
+        if self.retain_bins and self._bin_indices is None:
+            path = None if self.retain_bins is True else self.retain_bins
+            self._bin_indices = ProfileBinIndices(self.size, path)
         citer = self.data_source.chunks([], "io")
-        for chunk in parallel_objects(citer):
-            self._bin_chunk(chunk, fields, temp_storage)
+        for key, chunk in enumerate(parallel_objects(citer)):
+            self._bin_chunk(chunk, fields, temp_storage, key)
         self._finalize_storage(fields, temp_storage)
 
+    def clear_bin_indices(self):
+        """Discard the bin indices retained for later calls to add_fields"""
+        if self._bin_indices is not None:
+            self._bin_indices.clear()
+            self._bin_indices = None
+
     def set_field_unit(self, field, new_unit):
         """Sets a new unit for the requested field
 
@@ -141,6 +255,7 @@ class ProfileND(ParallelAnalysisInterface):
         # We use our main comm here
         # This also will fill _field_data
 
+        temp_storage.merge_private()
         for i, field in enumerate(fields):
             # q values are returned as q * weight but we want just q
             temp_storage.qvalues[..., i][temp_storage.used] /= \
@@ -217,9 +332,64 @@ class ProfileND(ParallelAnalysisInterface):
             else:
                 self.field_map[field] = field
 
-    def _bin_chunk(self, chunk, fields, storage):
+    def _bin_chunk(self, chunk, fields, storage, key=None):
+        store = self._bin_indices
+        if store is not None and key in store:
+            filter, bin_inds = store.load(key)
+        else:
+            rv = self._get_bin_data(chunk)
+            if rv is None:
+                filter = bin_inds = None
+            else:
+                filter, bin_fields = rv
+                bin_inds = self._get_bin_indices(bin_fields)
+            if store is not None:
+                store.store(key, filter, bin_inds)
+        if filter is None: return
+        fdata, wdata = self._get_field_data(chunk, fields, filter)
+        self._bin_data(bin_inds, wdata, fdata, storage)
+        # We've binned it!
+
+    def _get_bin_indices(self, bin_fields):
         raise NotImplementedError
 
+    def _bin_data(self, bin_inds, wdata, fdata, storage):
+        num_threads = self.num_threads
+        if num_threads is None:
+            num_threads = int(get_num_threads()) or cpu_count()
+        if num_threads > 1:
+            # The threaded kernels work on flattened bins, so the
+            # accumulators are handed over as (views of) 1D arrays.
+            bins = np.ravel_multi_index(bin_inds, self.size)
+            nf = fdata.shape[1]
+            if self.deterministic:
+                new_bin_profile_threaded(bins, wdata, fdata,
+                          storage.weight_values.reshape(-1),
+                          storage.values.reshape(-1, nf),
+                          storage.mvalues.reshape(-1, nf),
+                          storage.qvalues.reshape(-1, nf),
+                          storage.used.reshape(-1).view("uint8"),
+                          num_threads)
+            else:
+                new_bin_profile_private(bins, wdata, fdata,
+                          *storage.private_storage(num_threads))
+        elif len(bin_inds) == 1:
+            new_bin_profile1d(bin_inds[0], wdata, fdata,
+                          storage.weight_values, storage.values,
+                          storage.mvalues, storage.qvalues,
+                          storage.used)
+        elif len(bin_inds) == 2:
+            new_bin_profile2d(bin_inds[0], bin_inds[1], wdata, fdata,
+                          storage.weight_values, storage.values,
+                          storage.mvalues, storage.qvalues,
+                          storage.used)
+        else:
+            new_bin_profile3d(bin_inds[0], bin_inds[1], bin_inds[2],
+                          wdata, fdata,
+                          storage.weight_values, storage.values,
+                          storage.mvalues, storage.qvalues,
+                          storage.used)
+
     def _filter(self, bin_fields):
         # cut_points is set to be everything initially, but
         # we also want to apply a filtering based on min/max
@@ -230,6 +400,14 @@ class ProfileND(ParallelAnalysisInterface):
         return filter, [data[filter] for data in bin_fields]
 
     def _get_data(self, chunk, fields):
+        rv = self._get_bin_data(chunk)
+        if rv is None: return None
+        filter, bin_fields = rv
+        arr, weight_data = self._get_field_data(chunk, fields, filter)
+        # So that we can pass these into
+        return arr, weight_data, bin_fields
+
+    def _get_bin_data(self, chunk):
         # We are using chunks now, which will manage the field parameters and
         # the like.
         bin_fields = [chunk[bf] for bf in self.bin_fields]
@@ -237,7 +415,10 @@ class ProfileND(ParallelAnalysisInterface):
         # binning
         filter, bin_fields = self._filter(bin_fields)
         if not np.any(filter): return None
-        arr = np.zeros((bin_fields[0].size, len(fields)), dtype="float64")
+        return filter, bin_fields
+
+    def _get_field_data(self, chunk, fields, filter):
+        arr = np.zeros((filter.sum(), len(fields)), dtype="float64")
         for i, field in enumerate(fields):
             units = chunk.ds.field_info[field].output_units
             arr[:,i] = chunk[field][filter].in_units(units)
@@ -247,8 +428,7 @@ class ProfileND(ParallelAnalysisInterface):
         else:
             weight_data = np.ones(filter.size, dtype="float64")
         weight_data = weight_data[filter]
-        # So that we can pass these into
-        return arr, weight_data, bin_fields
+        return arr, weight_data
 
     def __getitem__(self, field):
         fname = self.field_map.get(field, None)
@@ -435,18 +615,11 @@ class Profile1D(ProfileND):
         self.bin_fields = (self.x_field,)
         self.x = 0.5*(self.x_bins[1:]+self.x_bins[:-1])
 
-    def _bin_chunk(self, chunk, fields, storage):
-        rv = self._get_data(chunk, fields)
-        if rv is None: return
-        fdata, wdata, (bf_x,) = rv
+    def _get_bin_indices(self, bin_fields):
+        bf_x, = bin_fields
         bf_x.convert_to_units(self.field_info[self.x_field].output_units)
         bin_ind = np.digitize(bf_x, self.x_bins) - 1
-        new_bin_profile1d(bin_ind, wdata, fdata,
-                      storage.weight_values, storage.values,
-                      storage.mvalues, storage.qvalues,
-                      storage.used)
-
-        # We've binned it!
+        return (bin_ind,)
 
     def set_x_unit(self, new_unit):
         """Sets a new unit for the x field
@@ -541,19 +714,13 @@ class Profile2D(ProfileND):
         self.x = 0.5*(self.x_bins[1:]+self.x_bins[:-1])
         self.y = 0.5*(self.y_bins[1:]+self.y_bins[:-1])
 
-    def _bin_chunk(self, chunk, fields, storage):
-        rv = self._get_data(chunk, fields)
-        if rv is None: return
-        fdata, wdata, (bf_x, bf_y) = rv
+    def _get_bin_indices(self, bin_fields):
+        bf_x, bf_y = bin_fields
         bf_x.convert_to_units(self.field_info[self.x_field].output_units)
         bin_ind_x = np.digitize(bf_x, self.x_bins) - 1
         bf_y.convert_to_units(self.field_info[self.y_field].output_units)
         bin_ind_y = np.digitize(bf_y, self.y_bins) - 1
-        new_bin_profile2d(bin_ind_x, bin_ind_y, wdata, fdata,
-                      storage.weight_values, storage.values,
-                      storage.mvalues, storage.qvalues,
-                      storage.used)
-        # We've binned it!
+        return (bin_ind_x, bin_ind_y)
 
     def set_x_unit(self, new_unit):
         """Sets a new unit for the x field
@@ -590,6 +757,102 @@ class Profile2DFromDataset(ProfileNDFromDataset, Profile2D):
     def __init(self, ds):
         ProfileNDFromDataset.__init__(self, ds)
 
+class TimeSeriesProfile(Profile2D):
+    """An object that represents a 2D profile against time and a bin field.
+
+    These are created by
+    :meth:`~yt.data_objects.time_series.DatasetSeries.profile`.  The x axis
+    is the time of each output of the series, with bins bounded halfway
+    between consecutive outputs, and the y axis is the bin field.
+
+    Parameters
+    ----------
+
+    data_source : AMD3DData object
+        A data object of one of the outputs, used for field information
+        and units.
+    times : YTArray
+        The times of the outputs, in increasing order.
+    y_field : string field name
+        The field the fields are profiled as a function of.
+    y_bins : YTArray
+        The bin edges of the y field.
+    y_log : boolean
+        Whether the y bins are evenly spaced in log space.
+    weight_field : string field name
+        The field the profiled fields are weighted by.
+
+    """
+    def __init__(self, data_source, times, y_field, y_bins, y_log,
+                 weight_field = None):
+        ProfileND.__init__(self, data_source, weight_field)
+        self.fractional = False
+        self.accumulation = [False, False]
+        self.x_field = ("data", "time")
+        self.x_log = False
+        self.field_info[self.x_field] = DerivedField(
+            self.x_field, NullFunc, units=str(times.units), take_log=False,
+            display_name="Time")
+        t = times.d
+        if t.size > 1:
+            mid = 0.5*(t[1:] + t[:-1])
+            edges = np.concatenate([[2*t[0] - mid[0]], mid,
+                                    [2*t[-1] - mid[-1]]])
+        else:
+            edges = np.array([t[0], t[0]])
+        self.x_bins = self.ds.arr(edges, times.units)
+        self.x = times
+        self.y_field = data_source._determine_fields(y_field)[0]
+        self.y_log = y_log
+        self.field_info[self.y_field] = \
+            self.data_source.ds.field_info[self.y_field]
+        self.y_bins = y_bins
+        self.y = 0.5*(self.y_bins[1:]+self.y_bins[:-1])
+        self.size = (self.x.size, self.y_bins.size - 1)
+        self.bin_fields = (self.x_field, self.y_field)
+
+    def add_fields(self, fields):
+        raise NotImplementedError(
+            "Profiles of a series are made with DatasetSeries.profile.")
+
+    def _set_outputs(self, fields, outputs):
+        # Each output holds the weight and used arrays and, for every field,
+        # the values (and variance) of the profile of one dataset, in cgs
+        # units so that code units of the different datasets do not mix.
+        self.weight = np.array([o["weight"] for o in outputs])
+        self.used = np.array([o["used"] for o in outputs], dtype="bool")
+        blank = ~self.used
+        self.weight[blank] = 0.0
+        for field in fields:
+            self.field_info[field] = self.ds.field_info[field]
+            units = self.field_info[field].output_units
+            values, cgs_units = zip(*[o["field_data"][field] for o in outputs])
+            self.field_data[field] = \
+                self.ds.arr(np.array(values), cgs_units[0]).in_units(units)
+            self.field_data[field][blank] = 0.0
+            if self.weight_field is not None:
+                values, cgs_units = \
+                    zip(*[o["variance"][field] for o in outputs])
+                self.variance[field] = \
+                    self.ds.arr(np.array(values), cgs_units[0]).in_units(units)
+                self.variance[field][blank] = 0.0
+            self.field_units[field] = self.field_data[field].units
+            if isinstance(field, tuple):
+                self.field_map[field[1]] = field
+            else:
+                self.field_map[field] = field
+
+    def set_x_unit(self, new_unit):
+        """Sets a new unit for the time
+
+        parameters
+        ----------
+        new_unit : string or Unit object
+           The name of the new unit.
+        """
+        self.x_bins.convert_to_units(new_unit)
+        self.x.convert_to_units(new_unit)
+
 class ParticleProfile(Profile2D):
     """An object that represents a *deposited* 2D profile. This is like a
     Profile2D, except that it is intended for particle data. Instead of just
@@ -663,7 +926,7 @@ class ParticleProfile(Profile2D):
 
     # Either stick the particle field in the nearest bin,
     # or spread it out using the 2D CIC deposition function
-    def _bin_chunk(self, chunk, fields, storage):
+    def _bin_chunk(self, chunk, fields, storage, key=None):
         rv = self._get_data(chunk, fields)
         if rv is None: return
         fdata, wdata, (bf_x, bf_y) = rv
@@ -805,21 +1068,15 @@ class Profile3D(ProfileND):
         self.y = 0.5*(self.y_bins[1:]+self.y_bins[:-1])
         self.z = 0.5*(self.z_bins[1:]+self.z_bins[:-1])
 
-    def _bin_chunk(self, chunk, fields, storage):
-        rv = self._get_data(chunk, fields)
-        if rv is None: return
-        fdata, wdata, (bf_x, bf_y, bf_z) = rv
+    def _get_bin_indices(self, bin_fields):
+        bf_x, bf_y, bf_z = bin_fields
         bf_x.convert_to_units(self.field_info[self.x_field].output_units)
         bin_ind_x = np.digitize(bf_x, self.x_bins) - 1
         bf_y.convert_to_units(self.field_info[self.y_field].output_units)
         bin_ind_y = np.digitize(bf_y, self.y_bins) - 1
         bf_z.convert_to_units(self.field_info[self.z_field].output_units)
         bin_ind_z = np.digitize(bf_z, self.z_bins) - 1
-        new_bin_profile3d(bin_ind_x, bin_ind_y, bin_ind_z, wdata, fdata,
-                      storage.weight_values, storage.values,
-                      storage.mvalues, storage.qvalues,
-                      storage.used)
-        # We've binned it!
+        return (bin_ind_x, bin_ind_y, bin_ind_z)
 
     @property
     def bounds(self):
@@ -882,7 +1139,8 @@ def create_profile(data_source, bin_fields, fields, n_bins=64,
                    extrema=None, logs=None, units=None,
                    weight_field="cell_mass",
                    accumulation=False, fractional=False,
-                   deposition='ngp'):
+                   deposition='ngp', num_threads=1, deterministic=False,
+                   retain_bins=False):
     r"""
     Create a 1, 2, or 3D profile object.
 
@@ -929,7 +1187,26 @@ def create_profile(data_source, bin_fields, fields, n_bins=64,
     deposition : Controls the type of deposition used for ParticlePhasePlots.
         Valid choices are 'ngp' and 'cic'. Default is 'ngp'. This parameter is
         ignored the if the input fields are not of particle type.
-
+    num_threads : int or None
+        The number of OpenMP threads used to bin the data of each chunk.
+        If None, the number given by the numthreads configuration option
+        or the OMP_NUM_THREADS environment variable, or else the number of
+        cores, is used.  This has no effect on particle deposition
+        profiles.
+        Default: 1.
+    deterministic : bool
+        If True, the threaded binning gives sums bitwise identical to those
+        of the serial binning, at the cost of a poorer balance of the work
+        between threads when most of the data fall in few bins.  If False,
+        results may differ from the serial ones by rounding.
+        Default: False.
+    retain_bins : bool or string
+        If True, the bin indices of the data are kept in memory, so that
+        fields added later with the add_fields method of the profile only
+        read the new fields and the weight field, not the bin fields.  If
+        a directory, the bin indices are kept in files there instead.  This
+        has no effect on particle deposition profiles.
+        Default: False.
 
     Examples
     --------
@@ -1038,6 +1315,9 @@ def create_profile(data_source, bin_fields, fields, n_bins=64,
         obj = cls(*args, weight_field = weight_field)
         setattr(obj, "accumulation", accumulation)
         setattr(obj, "fractional", fractional)
+        setattr(obj, "num_threads", num_threads)
+        setattr(obj, "deterministic", deterministic)
+        setattr(obj, "retain_bins", retain_bins)
     if fields is not None:
         obj.add_fields([field for field in fields])
     for field in fields:
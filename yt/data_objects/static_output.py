@@ -57,6 +57,7 @@ from yt.data_objects.particle_filters import \
 from yt.data_objects.particle_unions import \
     ParticleUnion
 from yt.data_objects.data_containers import \
+    FieldDataCache, \
     data_object_registry
 from yt.utilities.minimal_representation import \
     MinimalDataset
@@ -345,7 +346,8 @@ class Dataset(object):
         return [], True
 
     def close(self):
-        pass
+        if self._instantiated_index is not None:
+            self._instantiated_index.io.close()
 
     def __getitem__(self, key):
         """ Returns units, parameters, or conversion_factors in that order. """
@@ -409,6 +411,20 @@ class Dataset(object):
         """
         return key in self.parameters
 
+    _field_data_cache = None
+    @property
+    def field_data_cache(self):
+        """
+        The :class:`~yt.data_objects.data_containers.FieldDataCache` that
+        accounts for the field data held by this dataset's data containers.
+        Its budget defaults to the ``field_data_cache_mb`` configuration
+        option and its ``stats()`` report hits, misses and evictions.
+        """
+        if self._field_data_cache is None:
+            max_bytes = ytcfg.getint("yt", "field_data_cache_mb") * 1024**2
+            self._field_data_cache = FieldDataCache(max_bytes)
+        return self._field_data_cache
+
     _instantiated_index = None
     @property
     def index(self):
@@ -480,6 +496,7 @@ class Dataset(object):
         mylog.debug("Loading field plugins.")
         self.field_info.load_all_plugins()
         deps, unloaded = self.field_info.check_derived_fields()
+        self.field_info.save_detection_cache()
         self.field_dependencies.update(deps)
         self.fields = FieldTypeContainer(self)
         self.index.field_list = sorted(self.field_list)
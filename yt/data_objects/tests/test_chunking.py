@@ -1,5 +1,13 @@
+import numpy as np
+import threading
+
+from contextlib import contextmanager
+
+from yt.config import ytcfg
+from yt.frontends.stream.api import load_octree
 from yt.testing import \
     fake_random_ds, \
+    fake_hexahedral_ds, \
     assert_equal
 from yt.units.yt_array import \
     uconcatenate
@@ -38,3 +46,95 @@ def test_chunking():
             yield assert_equal, coords['f']['io'], coords['f']['spatial']
             yield assert_equal, coords['i']['io'], coords['i']['all']
             yield assert_equal, coords['i']['io'], coords['i']['spatial']
+
+def test_prefetch_chunks():
+    ds = fake_random_ds(32, nprocs = 8)
+    ds.index.io._thread_safe_fluid_reads = True
+    for dobj in [ds.all_data(), ds.sphere("c", 0.3)]:
+        values = {}
+        for prefetch in [0, 1, 3]:
+            values[prefetch] = []
+            for chunk in dobj.chunks(["density", "velocity_magnitude"], "io",
+                                     chunk_sizing = "just_one",
+                                     prefetch = prefetch):
+                values[prefetch].append(chunk["velocity_magnitude"] *
+                                        chunk["density"])
+            values[prefetch] = uconcatenate(values[prefetch])
+        yield assert_equal, values[1], values[0]
+        yield assert_equal, values[3], values[0]
+    # Stopping early must not leave anything behind.
+    nthreads = threading.active_count()
+    for chunk in ds.all_data().chunks("density", "io",
+                                      chunk_sizing = "just_one", prefetch = 2):
+        break
+    yield assert_equal, threading.active_count(), nthreads
+
+def test_prefetch_chunks_preload():
+    # Like Enzo's, this IO handler swaps its state in preload, which must
+    # not happen for chunks that are read ahead in the background.
+    ds = fake_random_ds(32, nprocs = 8)
+    io = ds.index.io
+    io._thread_safe_fluid_reads = True
+    state = {"preloads": 0, "active": 0, "overlaps": 0}
+    @contextmanager
+    def preload(chunk, fields, max_size):
+        state["preloads"] += 1
+        state["active"] += 1
+        if state["active"] > 1:
+            state["overlaps"] += 1
+        yield io
+        state["active"] -= 1
+    io.preload = preload
+    dd = ds.all_data()
+    ref = uconcatenate([chunk["density"] for chunk in
+                        dd.chunks("density", "io", chunk_sizing = "just_one",
+                                  prefetch = 0)])
+    yield assert_equal, state["preloads"], 8
+    state["preloads"] = 0
+    values = uconcatenate([chunk["density"] for chunk in
+                           dd.chunks("density", "io", chunk_sizing = "just_one",
+                                     prefetch = 2)])
+    yield assert_equal, values, ref
+    yield assert_equal, state["preloads"], 0
+    yield assert_equal, state["overlaps"], 0
+
+def test_adaptive_chunk_sizing():
+    ds = fake_random_ds(32, nprocs = 8)
+    fields = ["density", "velocity_magnitude"]
+    old_target = ytcfg.get("yt", "chunk_target_mb")
+    try:
+        for dobj in [ds.all_data(), ds.sphere("c", 0.3)]:
+            ref = uconcatenate([chunk["density"] for chunk in
+                                dobj.chunks(fields, "io",
+                                            chunk_sizing = "just_one")])
+            nchunks = {}
+            for target in ["64", "0.001"]:
+                ytcfg["yt", "chunk_target_mb"] = target
+                values = []
+                for chunk in dobj.chunks(fields, "io",
+                                         chunk_sizing = "adaptive"):
+                    values.append(chunk["density"])
+                nchunks[target] = len(values)
+                yield assert_equal, uconcatenate(values), ref
+            assert nchunks["0.001"] > nchunks["64"]
+    finally:
+        ytcfg["yt", "chunk_target_mb"] = old_target
+
+def test_adaptive_chunk_sizing_other_indexes():
+    # Octree and unstructured mesh indexes accept adaptive chunk sizing too.
+    octree_mask = np.array([8, 0, 0, 0, 0, 8, 0, 0, 0, 0, 0, 0, 0,
+                            0, 0, 0, 8, 0, 0, 0, 0, 0, 0, 0, 0],
+                           dtype = np.uint8)
+    octree_ds = load_octree(
+        octree_mask = octree_mask, over_refine_factor = 0,
+        partial_coverage = 0,
+        data = {("gas", "density"): np.random.random((22, 1))},
+        bbox = np.array([[-10., 10.], [-10., 10.], [-10., 10.]]))
+    for ds, field in [(octree_ds, ("gas", "density")),
+                      (fake_hexahedral_ds(), ("connect1", "elem"))]:
+        dd = ds.all_data()
+        ref = uconcatenate([chunk[field] for chunk in dd.chunks(field, "io")])
+        values = uconcatenate([chunk[field] for chunk in
+                               dd.chunks(field, "io",
+                                         chunk_sizing = "adaptive")])
+        yield assert_equal, values, ref
@@ -69,3 +69,84 @@ def test_particle_counts():
 
     pds = fake_particle_ds(npart=128)
     assert pds.particle_type_counts == {'io': 128}
+
+def test_field_data_cache():
+    ds = fake_random_ds(16, fields=("density", "velocity_x", "velocity_y"),
+                        units=("g/cm**3", "cm/s", "cm/s"))
+    cache = ds.field_data_cache
+    ad = ds.all_data()
+    dens = ad["density"].copy()
+    ad["velocity_x"]
+    nbytes = ad.field_data.nbytes
+    assert_equal(nbytes, 2 * dens.nbytes)
+    assert_equal(cache.nbytes, nbytes)
+    # Only room for two fields, so the least recently used one goes.
+    cache.max_bytes = nbytes
+    ad["density"]
+    ad["velocity_y"]
+    assert ("gas", "velocity_x") not in ad.field_data
+    assert_equal(cache.evictions, 1)
+    assert cache.nbytes <= cache.max_bytes
+    # Evicted fields are transparently regenerated.
+    ad["velocity_x"]
+    assert_equal(ad["density"], dens)
+    stats = cache.stats()
+    assert_equal(stats["hits"] + stats["misses"], 6)
+    ad.clear_data()
+    assert_equal(cache.nbytes, 0)
+
+def test_field_data_cache_pinned():
+    ds = fake_random_ds(16, fields=("density", "velocity_x"),
+                        units=("g/cm**3", "cm/s"))
+    cache = ds.field_data_cache
+    cache.max_bytes = 1
+    ad = ds.all_data()
+    # Fields set by the user cannot be regenerated, so they are pinned.
+    ad["gas", "my_field"] = ad["density"] * 2
+    ad["velocity_x"]
+    assert ("gas", "my_field") in ad.field_data
+    assert ("gas", "density") not in ad.field_data
+    # Neither are the fields of a projection.
+    proj = ds.proj("density", 2)
+    ad["density"]
+    ad["velocity_x"]
+    for field in ("px", "py", "pdx", "pdy", ("gas", "density")):
+        assert field in proj.field_data
+    assert_equal(proj["density"].size, 16**2)
+
+def test_selection_cache():
+    ds = fake_amr_ds(fields=("Density",))
+    cache = ds.index.selection_cache
+    cache.max_bytes = 2**24
+    c = ds.domain_center
+    def _sphere():
+        return ds.sphere(c, 0.25)
+    dens = _sphere()["Density"].copy()
+    misses = cache.misses
+    assert misses > 0
+    assert_equal(cache.hits, 0)
+    # A different selector in between evicts the grids' last masks, but
+    # an equivalent sphere is then served from the index cache.
+    ds.region(c, c - 0.2, c + 0.1)["Density"]
+    assert_equal(_sphere()["Density"], dens)
+    assert cache.hits >= misses
+    # A tiny budget keeps the cache bounded.
+    cache.clear()
+    cache.max_bytes = 1
+    _sphere()["Density"]
+    assert_equal(len(cache), 1)
+    assert cache.evictions > 0
+
+def test_selection_cache_key():
+    ds = fake_random_ds(16)
+    cache = ds.index.selection_cache
+    cache.max_bytes = 2**20
+    c = ds.domain_center
+    s1 = ds.sphere(c, 0.25)
+    s2 = ds.sphere(c, 0.25)
+    assert_equal(cache.key(s1.selector, 0), cache.key(s2.selector, 0))
+    assert cache.key(s1.selector, 0) != cache.key(s1.selector, 1)
+    # Composed selectors are keyed by what they are composed of.
+    r1 = ds.region(c, c - 0.2, c + 0.2, data_source = s1)
+    r2 = ds.region(c, c - 0.2, c + 0.2, data_source = ds.sphere(c, 0.1))
+    assert cache.key(r1.selector, 0) != cache.key(r2.selector, 0)
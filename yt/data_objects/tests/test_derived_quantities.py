@@ -117,6 +117,58 @@ def test_sample_at_max_field_values():
             yield assert_equal, ad["temperature"][mi], temp
             yield assert_equal, ad["velocity_x"][mi], vm
 
+def test_quantiles():
+    qs = np.array([0.0, 0.1, 0.5, 0.9, 1.0])
+    for nprocs in [1, 2, 4, 8]:
+        ds = fake_random_ds(16, nprocs = nprocs, fields = ("density", ))
+        for ad in [ds.all_data(), ds.sphere("c", (0.25, "unitary"))]:
+            dens = ad["density"]
+            mass = ad["cell_mass"]
+            order = np.argsort(dens)
+            for weight, w in [(None, np.ones_like(dens.d)),
+                              ("cell_mass", mass.d)]:
+                vals = ad.quantities.quantiles("density", qs, weight = weight,
+                                               sketch_size = 50)
+                yield assert_equal, vals.units, dens.units
+                yield assert_equal, vals[0], dens.min()
+                yield assert_equal, vals[-1], dens.max()
+                # The weight below each estimate lies within the documented
+                # bound of the requested quantile.
+                cw = np.cumsum(w[order]) / w.sum()
+                bound = 1.0 / 50 + nprocs * w.max() / w.sum()
+                for q, v in zip(qs, vals.d):
+                    below = cw[np.searchsorted(dens.d[order], v, "left") - 1] \
+                        if v > dens.d.min() else 0.0
+                    yield assert_equal, abs(below - q) <= bound, True
+            median = ad.quantities.quantiles("density")
+            yield assert_equal, median.shape, ()
+            yield assert_rel_equal, median, np.median(dens), 1
+
+def test_compute():
+    for nprocs in [1, 2, 4, 8]:
+        ds = fake_random_ds(16, nprocs = nprocs,
+            fields = ("density", "temperature", "velocity_x", "velocity_y",
+                      "velocity_z"), particles = 32)
+        for ad in [ds.all_data(), ds.sphere("c", (0.25, "unitary"))]:
+            q = ad.quantities
+            ext, total, av, var, maxloc, bv = q.compute(
+                [("extrema", ["density", "temperature"]),
+                 "TotalMass",
+                 ("weighted_average_quantity", ("density", "cell_mass")),
+                 ("WeightedVariance", (["temperature"], "cell_mass")),
+                 ("max_location", "density"),
+                 ("bulk_velocity", (), {"use_particles": True})])
+            for v1, v2 in zip(ext, q.extrema(["density", "temperature"])):
+                yield assert_equal, v1, v2
+            yield assert_equal, total, q.total_mass()
+            yield assert_rel_equal, av, \
+                q.weighted_average_quantity("density", "cell_mass"), 12
+            yield assert_rel_equal, var, \
+                q.weighted_variance(["temperature"], "cell_mass"), 12
+            yield assert_equal, maxloc, q.max_location("density")
+            yield assert_rel_equal, bv, \
+                q.bulk_velocity(use_particles = True), 12
+
 if __name__ == "__main__":
     for i in test_extrema():
         i[0](*i[1:])
@@ -1,10 +1,18 @@
 import numpy as np
+import os
+import shutil
+import tempfile
 
 from yt.data_objects.profiles import \
+    ProfileFieldAccumulator, \
     Profile1D, \
     Profile2D, \
     Profile3D, \
     create_profile
+from yt.data_objects.time_series import \
+    DatasetSeries
+from yt.convenience import \
+    load
 from yt.testing import \
     fake_random_ds, \
     assert_equal, \
@@ -12,6 +20,9 @@ from yt.testing import \
     assert_rel_equal
 from yt.utilities.exceptions import \
     YTIllDefinedProfile
+from yt.utilities.lib.misc_utilities import \
+    new_bin_profile1d, \
+    new_bin_profile_private
 from yt.visualization.profile_plotter import \
     ProfilePlot, \
     PhasePlot
@@ -124,6 +135,119 @@ def test_profiles():
         p3d.add_fields(["ones"])
         yield assert_equal, p3d["ones"], np.ones((nb,nb,nb))
 
+def test_threaded_profiles():
+    ds = fake_random_ds(32, nprocs = 4, fields = _fields, units = _units)
+    dd = ds.all_data()
+    fields = ["temperature", "dinosaurs"]
+    for bin_fields in (["density"], ["density", "temperature"],
+                       ["density", "temperature", "dinosaurs"]):
+        for weight_field in (None, "cell_mass"):
+            ref = create_profile(dd, bin_fields, fields, n_bins = 16,
+                                 weight_field = weight_field)
+            for num_threads in [2, 3]:
+                det = create_profile(dd, bin_fields, fields, n_bins = 16,
+                                     weight_field = weight_field,
+                                     num_threads = num_threads,
+                                     deterministic = True)
+                fast = create_profile(dd, bin_fields, fields, n_bins = 16,
+                                      weight_field = weight_field,
+                                      num_threads = num_threads)
+                yield assert_equal, det.weight, ref.weight
+                yield assert_equal, det.used, ref.used
+                yield assert_equal, fast.used, ref.used
+                for field in fields:
+                    yield assert_equal, det[field], ref[field]
+                    # assert_rel_equal masks zeros in place, so pass copies
+                    yield assert_rel_equal, fast[field].copy(), \
+                        ref[field].copy(), 10
+                    if weight_field is not None:
+                        yield assert_equal, det.variance[field], \
+                            ref.variance[field]
+                        yield assert_rel_equal, fast.variance[field].copy(), \
+                            ref.variance[field].copy(), 8
+
+def test_private_accumulators():
+    # The per-thread accumulators are kept across chunks and merged once.
+    np.random.seed(0x4d3d3d3)
+    ref = ProfileFieldAccumulator(2, (8,))
+    storage = ProfileFieldAccumulator(2, (8,))
+    for chunk in range(3):
+        bins = np.random.randint(0, 8, size = 100).astype("intp")
+        wdata = np.random.random(100)
+        fdata = np.random.random((100, 2))
+        new_bin_profile1d(bins, wdata, fdata, ref.weight_values, ref.values,
+                          ref.mvalues, ref.qvalues, ref.used)
+        private = storage.private_storage(3)
+        new_bin_profile_private(bins, wdata, fdata, *private)
+        yield assert_equal, storage.private_storage(3) is private, True
+    storage.merge_private()
+    yield assert_equal, storage.private, None
+    yield assert_equal, storage.used, ref.used
+    yield assert_rel_equal, storage.weight_values, ref.weight_values, 12
+    yield assert_rel_equal, storage.values, ref.values, 12
+    yield assert_rel_equal, storage.mvalues, ref.mvalues, 12
+    yield assert_rel_equal, storage.qvalues, ref.qvalues, 10
+
+def test_retained_bin_indices():
+    ds = fake_random_ds(32, nprocs = 4, fields = _fields, units = _units)
+    dd = ds.all_data()
+    tmpdir = tempfile.mkdtemp()
+    for bin_fields in (["density"], ["density", "temperature"],
+                       ["density", "temperature", "dinosaurs"]):
+        ref = create_profile(dd, bin_fields, ["tribbles", "cell_mass"],
+                             n_bins = 16)
+        for retain_bins in (True, tmpdir):
+            prof = create_profile(dd, bin_fields, ["tribbles"], n_bins = 16,
+                                  retain_bins = retain_bins)
+            # Later fields must be binned without reading the bin fields
+            prof._get_bin_data = None
+            prof.add_fields(["cell_mass"])
+            yield assert_equal, prof.used, ref.used
+            yield assert_equal, prof.weight, ref.weight
+            yield assert_equal, prof["cell_mass"], ref["cell_mass"]
+            yield assert_equal, prof.variance["cell_mass"], \
+                ref.variance["cell_mass"]
+            prof.clear_bin_indices()
+    shutil.rmtree(tmpdir)
+
+def test_time_series_profile():
+    dss = []
+    for i in range(3):
+        ds = fake_random_ds(16, nprocs = 2, fields = _fields, units = _units)
+        ds.current_time = ds.quan(3.0 - i, "s")
+        dss.append(ds)
+    ts = DatasetSeries(dss)
+    extrema = ((0.01, "g/cm**3"), (1.0, "g/cm**3"))
+    prof = ts.profile("density", ["temperature"], n_bins = 8,
+                      extrema = extrema, log = True)
+    yield assert_equal, prof.x.to_ndarray(), [1.0, 2.0, 3.0]
+    yield assert_equal, prof.x_bins.to_ndarray(), [0.5, 1.5, 2.5, 3.5]
+    yield assert_equal, prof["temperature"].shape, (3, 8)
+    for i, ds in enumerate(dss[::-1]):
+        ref = create_profile(ds.all_data(), ["density"], ["temperature"],
+                             n_bins = 8, extrema = {"density": extrema},
+                             logs = {"density": True})
+        yield assert_rel_equal, prof["temperature"][i].copy(), \
+            ref["temperature"].copy(), 12
+        yield assert_equal, prof.used[i], ref.used
+        yield assert_rel_equal, prof.y_bins.copy(), ref.x_bins.copy(), 12
+
+    prof = ts.profile("density", ["cell_mass"], n_bins = 8,
+                      weight_field = None)
+    mi = min(ds.all_data()["density"].min() for ds in dss)
+    ma = max(ds.all_data()["density"].max() for ds in dss)
+    yield assert_equal, prof.y_bins[0] <= mi, True
+    yield assert_equal, prof.y_bins[-1] >= ma, True
+    total = sum(ds.all_data()["cell_mass"].sum() for ds in dss)
+    yield assert_rel_equal, prof["cell_mass"].sum(), total, 12
+
+    tmpdir = tempfile.mkdtemp()
+    fn = prof.save_as_dataset(os.path.join(tmpdir, "time_profile.h5"))
+    prof_ds = load(fn)
+    yield assert_equal, prof_ds.data["cell_mass"], prof["cell_mass"]
+    yield assert_equal, prof_ds.data["x"], prof.x
+    shutil.rmtree(tmpdir)
+
 extrema_s = {'particle_position_x': (0, 1)}
 logs_s = {'particle_position_x': False}
 
@@ -5,7 +5,9 @@ from yt.testing import \
     assert_rel_equal, \
     fake_amr_ds
 from yt.units.unit_object import Unit
+from yt.utilities.projection_cache import ProjectionCache
 import os
+import shutil
 import tempfile
 
 LENGTH_UNIT = 2.0
@@ -123,3 +125,76 @@ def test_max_level():
 
     proj = ds.proj('Density', 2, method='mip')
     assert proj['grid_level'].max() == ds.index.max_level
+
+def test_threaded_projection():
+    for ds in [fake_random_ds(32, nprocs=8), fake_amr_ds()]:
+        field = ds.field_list[0]
+        for method, weight_field in [("integrate", None),
+                                     ("integrate", "ones"),
+                                     ("mip", None)]:
+            ref = ds.proj(field, 1, weight_field=weight_field, method=method)
+            for num_threads in [2, 3]:
+                proj = ds.proj(field, 1, weight_field=weight_field,
+                               method=method, num_threads=num_threads)
+                for f in ["px", "py", "pdx", "pdy"]:
+                    assert_equal(proj[f], ref[f])
+                if method == "mip":
+                    assert_equal(proj[field], ref[field])
+                else:
+                    assert_rel_equal(proj[field].copy(), ref[field].copy(), 12)
+
+def test_multi_axis_projection():
+    ds = fake_amr_ds()
+    field = ds.field_list[0]
+    for weight_field in [None, "ones"]:
+        for num_threads in [1, 2]:
+            projs = ds.proj(field, ("x", "y", "z"), weight_field=weight_field,
+                            num_threads=num_threads)
+            assert_equal(len(projs), 3)
+            for ax, proj in enumerate(projs):
+                ref = ds.proj(field, ax, weight_field=weight_field)
+                assert_equal(proj.axis, ax)
+                for f in ["px", "py", "pdx", "pdy"]:
+                    assert_equal(proj[f], ref[f])
+                assert_rel_equal(proj[field].copy(), ref[field].copy(), 12)
+                frb = proj.to_frb(1.0, 32)
+                assert_equal(frb[field].shape, (32, 32))
+
+def test_projection_cache():
+    from yt.config import ytcfg
+    tmpdir = tempfile.mkdtemp()
+    old = dict((k, ytcfg.get("yt", k)) for k in
+               ["projection_cache", "projection_cache_dir"])
+    ytcfg["yt", "projection_cache"] = "True"
+    ytcfg["yt", "projection_cache_dir"] = tmpdir
+    try:
+        ds = fake_random_ds(16, nprocs=4)
+        ref = ds.proj("density", 0, weight_field="ones")
+        assert not ref._projection_cache_hit
+        proj = ds.proj("density", 0, weight_field="ones")
+        assert proj._projection_cache_hit
+        for f in ["px", "py", "pdx", "pdy", "density"]:
+            assert_equal(proj[f], ref[f])
+            assert_equal(proj[f].units, ref[f].units)
+        assert_equal(proj["weight_field"], ref["weight_field"])
+        # A different weight, axis or data source is a different projection.
+        assert not ds.proj("density", 0)._projection_cache_hit
+        sp = ds.sphere(ds.domain_center, 0.25)
+        assert not ds.proj("density", 0, data_source=sp)._projection_cache_hit
+        projs = ds.proj("density", (0, 1), weight_field="ones")
+        assert projs[0]._projection_cache_hit
+        assert not projs[1]._projection_cache_hit
+        assert_equal(projs[0]["density"], ref["density"])
+
+        cache = ProjectionCache()
+        entries = cache.entries()
+        assert_equal(len(entries), 4)
+        removed = cache.prune(cache.size() - 1)
+        assert_equal(len(removed), 1)
+        assert_equal(len(cache.entries()), 3)
+        cache.clear()
+        assert_equal(len(cache.entries()), 0)
+    finally:
+        for k, v in old.items():
+            ytcfg["yt", k] = v
+        shutil.rmtree(tmpdir)
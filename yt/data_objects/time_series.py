@@ -28,6 +28,9 @@ from yt.config import ytcfg
 from yt.data_objects.data_containers import data_object_registry
 from yt.data_objects.derived_quantities import \
     derived_quantity_registry
+from yt.data_objects.profiles import \
+    create_profile, \
+    TimeSeriesProfile
 from yt.data_objects.analyzer_objects import \
     create_quantity_proxy, \
     analysis_task_registry, \
@@ -318,6 +321,110 @@ class DatasetSeries(object):
                 store.result.append(rv)
         return [v for k, v in sorted(return_values.items())]
 
+    def profile(self, bin_field, fields, n_bins=64, extrema=None, log=None,
+                weight_field="cell_mass", data_object=None):
+        r"""Create a profile of fields against time and a bin field.
+
+        A 1D profile of the fields against the bin field is made for every
+        dataset, with the same bins for all of them, and the profiles are
+        gathered into a 2D profile whose x axis is the time of the outputs.
+        The datasets are distributed over processors as in :meth:`piter`.
+
+        Parameters
+        ----------
+        bin_field : string or tuple
+            The field to bin by.
+        fields : list of strings or tuples
+            The fields to be profiled.
+        n_bins : int
+            The number of bins of the bin field.
+            Default: 64.
+        extrema : tuple of min, max
+            The limits of the bins, as numbers in the output units of the bin
+            field or as (value, unit) tuples.  If None, the extrema of the
+            bin field over all the datasets are used, which costs an extra
+            pass over the series.
+        log : bool
+            Whether the bins are evenly spaced in log space.  Defaults to the
+            take_log attribute of the bin field.
+        weight_field : string or tuple
+            The weight field for computing weighted averages.  If None, the
+            profile values are sums of the data in each bin.
+            Default: "cell_mass".
+        data_object : DatasetSeriesObject
+            The data object to profile in each dataset, such as
+            ``ts.sphere("c", (10, "kpc"))``.  If None, all the data of each
+            dataset is used.
+
+        Returns
+        -------
+        A :class:`~yt.data_objects.profiles.TimeSeriesProfile`, which can be
+        saved with its ``save_as_dataset`` method.
+
+        Examples
+        --------
+
+        >>> ts = DatasetSeries("DD*/DD*.index")
+        >>> prof = ts.profile("density", ["temperature"])
+        >>> print (prof.x) # the times of the outputs
+        >>> print (prof["temperature"].shape) # (len(ts), 64)
+        >>> prof.save_as_dataset()
+
+        """
+        if data_object is None:
+            data_object = DatasetSeriesObject(self, "all_data")
+        dobj = data_object.get(self[0])
+        bin_field = dobj._determine_fields(bin_field)[0]
+        fields = dobj._determine_fields(ensure_list(fields))
+        if weight_field is not None:
+            weight_field = dobj._determine_fields(weight_field)[0]
+        if log is None:
+            log = dobj.ds._get_field_info(bin_field).take_log
+        if extrema is None:
+            storage = {}
+            for sto, ds in self.piter(storage=storage):
+                ex = data_object.get(ds).quantities.extrema(
+                    bin_field, non_zero=log).in_cgs()
+                sto.result = (ex.d, str(ex.units))
+            results = [storage[i] for i in sorted(storage)]
+            units = results[0][1]
+            mi = min(r[0][0] for r in results)
+            ma = max(r[0][1] for r in results)
+            # pad extrema by epsilon so cells at bin edges are not excluded
+            extrema = ((mi - np.spacing(mi), units),
+                       (ma + np.spacing(ma), units))
+        storage = {}
+        for sto, ds in self.piter(storage=storage):
+            prof = create_profile(data_object.get(ds), [bin_field], fields,
+                                  n_bins=n_bins, extrema={bin_field: extrema},
+                                  logs={bin_field: log},
+                                  weight_field=weight_field)
+            weight = prof.weight
+            if weight_field is not None:
+                units = ds._get_field_info(weight_field).output_units
+                weight = ds.arr(weight, units).in_cgs().d
+            result = {"time": ds.current_time.in_cgs().d,
+                      "bins": prof.x_bins.in_cgs(),
+                      "weight": weight, "used": prof.used,
+                      "field_data": {}, "variance": {}}
+            for field in fields:
+                values = prof.field_data[field].in_cgs()
+                result["field_data"][field] = (values.d, str(values.units))
+                if weight_field is not None:
+                    values = prof.variance[field].in_cgs()
+                    result["variance"][field] = (values.d, str(values.units))
+            sto.result = result
+        outputs = sorted(storage.values(), key=lambda o: o["time"])
+        ds = dobj.ds
+        times = ds.arr([o["time"] for o in outputs], "s")
+        bins = outputs[0]["bins"]
+        bins = ds.arr(bins.d, str(bins.units)).in_units(
+            ds.field_info[bin_field].output_units)
+        obj = TimeSeriesProfile(dobj, times, bin_field, bins, log,
+                                weight_field=weight_field)
+        obj._set_outputs(fields, outputs)
+        return obj
+
     @classmethod
     def from_filenames(cls, filenames, parallel = True, setup_function = None,
                        **kwargs):
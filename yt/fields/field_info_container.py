@@ -15,11 +15,17 @@ native.
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
+import functools
+import hashlib
+import json
+import os
+import re
 import numpy as np
 from numbers import Number as numeric_type
 
+from yt.config import ytcfg
 from yt.extern.six import string_types
-from yt.funcs import mylog, only_on_root
+from yt.funcs import mylog, only_on_root, is_root
 from yt.units.unit_object import Unit
 from .derived_field import \
     DerivedField, \
@@ -45,6 +51,76 @@ def tupleize(inp):
     # py3, since names of field types shouldn't begin with punctuation
     return ('?', inp, )
 
+_address = re.compile(" at 0x[0-9a-fA-F]+")
+
+def _value_key(value, seen):
+    # A repr of *value* for the field detection cache key.  Functions are
+    # described by their code rather than by their (address-bearing) repr.
+    if callable(value) and (hasattr(value, "__code__") or
+                            isinstance(value, functools.partial)):
+        return _function_key(value, seen)
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, str(getattr(value, "units", "")),
+                hashlib.md5(np.ascontiguousarray(value).tobytes()).hexdigest())
+    if isinstance(value, (list, tuple)):
+        return tuple(_value_key(v, seen) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((repr(k), _value_key(v, seen))
+                            for k, v in value.items()))
+    # Memory addresses differ between sessions and datasets.
+    return _address.sub("", repr(value))
+
+def _code_key(code, seen):
+    # The constants of a code object include the code of the functions,
+    # lambdas and comprehensions defined inside it.
+    consts = tuple(_code_key(c, seen) if hasattr(c, "co_code")
+                   else _value_key(c, seen) for c in code.co_consts)
+    return (code.co_code, code.co_names, consts)
+
+def _function_key(func, seen = None):
+    """
+    Return a description of everything that determines what *func* computes:
+    its code, default arguments and the contents of its closure, following
+    the functions it closes over.
+    """
+    if seen is None:
+        seen = set()
+    if id(func) in seen:
+        return "<recursive>"
+    seen.add(id(func))
+    if isinstance(func, functools.partial):
+        return ("partial", _function_key(func.func, seen),
+                _value_key(func.args, seen),
+                _value_key(func.keywords or {}, seen))
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return _address.sub("", repr(func))
+    cells = []
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            cells.append(_value_key(cell.cell_contents, seen))
+        except ValueError:
+            # The cell is empty.
+            cells.append(None)
+    return (getattr(func, "__module__", None), func.__name__,
+            _code_key(code, seen),
+            _value_key(getattr(func, "__defaults__", None), seen),
+            tuple(cells))
+
+def _from_json_field(name):
+    if isinstance(name, list):
+        return tuple(name)
+    return str(name)
+
+class FieldDependencies(object):
+    """
+    The dependencies of a derived field as restored from the field detection
+    cache, in place of the FieldDetector that originally found them.
+    """
+    def __init__(self, requested, requested_parameters):
+        self.requested = requested
+        self.requested_parameters = requested_parameters
+
 class FieldInfoContainer(dict):
     """
     This is a generic field container.  It contains a list of potential derived
@@ -57,6 +133,9 @@ class FieldInfoContainer(dict):
     known_other_fields = ()
     known_particle_fields = ()
     extra_union_fields = ()
+    _detection_cache = None
+    _detection_cache_key = None
+    _detection_cache_dirty = False
 
     def __init__(self, ds, field_list, slice_info = None):
         self._show_field_errors = []
@@ -276,8 +355,118 @@ class FieldInfoContainer(dict):
             loaded += self.load_plugin(n, ftype)
             only_on_root(mylog.debug, "Loaded %s (%s new fields)",
                          n, len(loaded))
+        self.load_detection_cache()
         self.find_dependencies(loaded)
 
+    def _detection_cache_filename(self):
+        """
+        Return the path of the field detection cache file for the current set
+        of fields, or None if the cache is disabled.  The file name is a hash
+        of the frontend, the on-disk field list, the yt version and every
+        field (including plugin fields) defined so far.
+        """
+        if self.ds is None or \
+           not ytcfg.getboolean("yt", "field_detection_cache"):
+            return None
+        import yt
+        key = hashlib.md5()
+        def _update(*items):
+            key.update(repr(items).encode("utf-8"))
+        _update("%s.%s" % (self.ds.__class__.__module__,
+                           self.ds.__class__.__name__),
+                yt.__version__, str(self.ds.geometry),
+                self.ds.dimensionality)
+        for field in sorted(self.field_list, key=tupleize):
+            _update(field)
+        for name in sorted(dict.keys(self), key=tupleize):
+            fi = self[name]
+            validators = [(type(v).__name__,
+                           _value_key(sorted(vars(v).items()), set()))
+                          for v in fi.validators]
+            _update(name, fi.units, fi.particle_type, validators,
+                    _function_key(fi._function))
+        cache_dir = os.path.expanduser(
+            ytcfg.get("yt", "field_detection_cache_dir"))
+        return os.path.join(cache_dir, "%s.json" % key.hexdigest())
+
+    def load_detection_cache(self):
+        """
+        Load the results of earlier field detection passes over the same set
+        of fields, so that check_derived_fields can skip running them
+        against a FieldDetector again.  The cache stays active until
+        save_detection_cache is called.
+        """
+        fn = self._detection_cache_filename()
+        self._detection_cache_key = fn
+        self._detection_cache_dirty = False
+        if fn is None:
+            self._detection_cache = None
+            return
+        self._detection_cache = {}
+        if not os.path.exists(fn):
+            return
+        try:
+            with open(fn) as f:
+                entries = json.load(f)
+        except (IOError, ValueError) as e:
+            mylog.warning("Could not read field detection cache %s: %s",
+                          fn, e)
+            return
+        for name, entry in entries:
+            self._detection_cache[_from_json_field(name)] = entry
+        mylog.debug("Loaded %s field detection results from %s",
+                    len(self._detection_cache), fn)
+
+    def save_detection_cache(self):
+        """
+        Write out any new field detection results and stop consulting the
+        cache.  Only the root processor writes the file.
+        """
+        cache, fn = self._detection_cache, self._detection_cache_key
+        self._detection_cache = self._detection_cache_key = None
+        if cache is None or not self._detection_cache_dirty or not is_root():
+            return
+        self._detection_cache_dirty = False
+        entries = [[list(k) if isinstance(k, tuple) else k, v]
+                   for k, v in sorted(cache.items(),
+                                      key=lambda kv: tupleize(kv[0]))]
+        dirname = os.path.dirname(fn)
+        tmp = "%s.%s.tmp" % (fn, os.getpid())
+        try:
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            with open(tmp, "w") as f:
+                json.dump(entries, f)
+            os.rename(tmp, fn)
+        except (IOError, OSError, TypeError, ValueError) as e:
+            mylog.warning("Could not write field detection cache %s: %s",
+                          fn, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _cached_detection(self, field):
+        # The stored detection result for field, or None if there is none
+        # or its units have changed since it was stored.
+        if self._detection_cache is None:
+            return None
+        entry = self._detection_cache.get(field, None)
+        if entry is None or entry["units"] != self[field].units:
+            return None
+        return entry
+
+    def _store_detection(self, field, status, fd = None):
+        if self._detection_cache is None:
+            return
+        entry = {"status": status, "units": self[field].units,
+                 "requested": [], "requested_parameters": []}
+        if fd is not None:
+            entry["requested"] = [list(f) if isinstance(f, tuple) else f
+                                  for f in sorted(fd.requested, key=tupleize)]
+            entry["requested_parameters"] = sorted(
+                set(fd.requested_parameters))
+        self._detection_cache[field] = entry
+        self._detection_cache_dirty = True
+
     def load_plugin(self, plugin_name, ftype = "gas", skip_check = False):
         if callable(plugin_name):
             f = plugin_name
@@ -358,6 +547,17 @@ class FieldInfoContainer(dict):
             mylog.debug("Checking %s", field)
             if field not in self: raise RuntimeError
             fi = self[field]
+            entry = self._cached_detection(field)
+            if entry is not None and field not in self._show_field_errors:
+                if entry["status"] != "valid":
+                    self.pop(field)
+                    if entry["status"] == "unavailable":
+                        unavailable.append(field)
+                    continue
+                deps[field] = FieldDependencies(
+                    set(_from_json_field(f) for f in entry["requested"]),
+                    entry["requested_parameters"])
+                continue
             try:
                 fd = fi.get_dependencies(ds = self.ds)
             except Exception as e:
@@ -366,16 +566,19 @@ class FieldInfoContainer(dict):
                 if type(e) != YTFieldNotFound:
                     mylog.debug("Raises %s during field %s detection.",
                                 str(type(e)), field)
+                self._store_detection(field, "error")
                 self.pop(field)
                 continue
             # This next bit checks that we can't somehow generate everything.
             # We also manually update the 'requested' attribute
             missing = not all(f in self.field_list for f in fd.requested)
             if missing:
+                self._store_detection(field, "unavailable")
                 self.pop(field)
                 unavailable.append(field)
                 continue
             fd.requested = set(fd.requested)
+            self._store_detection(field, "valid", fd)
             deps[field] = fd
             mylog.debug("Succeeded with %s (needs %s)", field, fd.requested)
         dfl = set(self.ds.derived_field_list).union(deps.keys())
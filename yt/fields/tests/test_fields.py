@@ -1,4 +1,8 @@
 import numpy as np
+import os
+import shutil
+import tempfile
+from collections import defaultdict
 
 from yt import \
     load
@@ -14,6 +18,14 @@ from yt.testing import \
     requires_file
 from yt.utilities.cosmology import \
     Cosmology
+from yt.config import ytcfg
+from yt.fields.derived_field import \
+    ValidateParameter
+from yt.fields.field_detector import \
+    FieldDetector
+from yt.fields.field_info_container import \
+    FieldDependencies, \
+    tupleize
 from yt.frontends.stream.fields import \
     StreamFieldInfo
 from yt.units.yt_array import \
@@ -347,6 +359,93 @@ def test_morton_index():
     a2 = np.argsort(mi2)
     assert_array_equal(a1, a2)
 
+def test_fused_field_generation():
+    ds = fake_random_ds(16)
+    calls = defaultdict(lambda: 0)
+
+    def _make_field(name, source, factor):
+        def _func(field, data):
+            if not isinstance(data, FieldDetector):
+                calls[name] += 1
+            return factor * data[source]
+        ds.add_field(("gas", name), function=_func, units="g/cm**3")
+
+    _make_field("dens_a", "density", 2.0)
+    _make_field("dens_b", "dens_a", 3.0)
+    _make_field("dens_c", "dens_b", 5.0)
+    _make_field("dens_d", "dens_b", 7.0)
+    ad = ds.all_data()
+    ad.get_data([("gas", "dens_d"), ("gas", "dens_c")])
+    # Every field function runs exactly once and the shared intermediates
+    # are not kept around.
+    for name in ["dens_a", "dens_b", "dens_c", "dens_d"]:
+        assert_equal(calls[name], 1)
+    assert ("gas", "dens_a") not in ad.field_data
+    assert ("gas", "dens_b") not in ad.field_data
+    assert_array_almost_equal_nulp(ad["gas", "dens_c"],
+                                   30.0 * ad["gas", "density"], 4)
+    assert_array_almost_equal_nulp(ad["gas", "dens_d"],
+                                   42.0 * ad["gas", "density"], 4)
+
+def test_field_detection_cache():
+    tmpdir = tempfile.mkdtemp()
+    old = dict((k, ytcfg.get("yt", k)) for k in
+               ["field_detection_cache", "field_detection_cache_dir"])
+    ytcfg["yt", "field_detection_cache"] = "True"
+    ytcfg["yt", "field_detection_cache_dir"] = tmpdir
+    try:
+        ds1 = fake_random_ds(16, particles = 16)
+        ds1.index
+        assert_equal(len(os.listdir(tmpdir)), 1)
+        ds2 = fake_random_ds(16, particles = 16)
+        ds2.index
+        assert_equal(len(os.listdir(tmpdir)), 1)
+        assert_equal(ds2.derived_field_list, ds1.derived_field_list)
+        assert_equal(sorted(ds2.field_dependencies, key=tupleize),
+                     sorted(ds1.field_dependencies, key=tupleize))
+        for field, fd in ds2.field_dependencies.items():
+            assert isinstance(fd, FieldDependencies)
+            assert_equal(fd.requested,
+                         ds1.field_dependencies[field].requested)
+        ad = ds2.all_data()
+        assert_equal(ad["gas", "cell_mass"],
+                     ad["gas", "density"] * ad["index", "cell_volume"])
+    finally:
+        for k, v in old.items():
+            ytcfg["yt", k] = v
+        shutil.rmtree(tmpdir)
+
+def test_field_detection_cache_key():
+    tmpdir = tempfile.mkdtemp()
+    old = dict((k, ytcfg.get("yt", k)) for k in
+               ["field_detection_cache", "field_detection_cache_dir"])
+    ytcfg["yt", "field_detection_cache"] = "True"
+    ytcfg["yt", "field_detection_cache_dir"] = tmpdir
+    def _scaled(factor, offset = 0.0):
+        def _func(field, data):
+            return (factor + offset) * data["gas", "density"]
+        return _func
+    try:
+        keys = []
+        # The same code with different closures, defaults or validators
+        # must not share cache entries.
+        for func, validators in [(_scaled(2.0), None),
+                                 (_scaled(3.0), None),
+                                 (_scaled(2.0, offset = 1.0), None),
+                                 (_scaled(2.0), [ValidateParameter("a")]),
+                                 (_scaled(2.0), [ValidateParameter("b")]),
+                                 (_scaled(2.0), None)]:
+            ds = fake_random_ds(16)
+            ds.add_field(("gas", "scaled_density"), function = func,
+                         units = "g/cm**3", validators = validators)
+            keys.append(ds.field_info._detection_cache_filename())
+        assert_equal(len(set(keys)), 5)
+        assert_equal(keys[-1], keys[0])
+    finally:
+        for k, v in old.items():
+            ytcfg["yt", k] = v
+        shutil.rmtree(tmpdir)
+
 if __name__ == "__main__":
     setup()
     for t in test_all_fields():
@@ -140,7 +140,11 @@ class ARTIndex(OctreeIndex):
                 g = og
             yield YTDataChunk(dobj, "spatial", [g], None)
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _estimate_io_cells(self, subset):
+        return subset.domain.level_count.sum() * subset._num_zones**3
+
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
         """
         Since subsets are calculated per domain,
         i.e. per file, yield each domain at a time to
@@ -148,6 +152,10 @@ class ARTIndex(OctreeIndex):
         to be level-by-level.
         """
         oobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
+        if chunk_sizing == "adaptive":
+            for subsets in self._adaptive_chunk_groups(oobjs, nfields):
+                yield YTDataChunk(dobj, "io", subsets, None, cache = cache)
+            return
         for subset in oobjs:
             yield YTDataChunk(dobj, "io", [subset], None,
                               cache = cache)
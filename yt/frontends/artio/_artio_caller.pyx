@@ -1691,7 +1691,8 @@ cdef class SFCRangeSelector(SelectorObject):
         return self.base_selector.select_grid(left_edge, right_edge, level, o)
 
     def _hash_vals(self):
-        return (hash(self.base_selector), self.sfc_start, self.sfc_end)
+        return (("base_selector", self.base_selector._hash_key()),
+                ("sfc_start", self.sfc_start), ("sfc_end", self.sfc_end))
 
 sfc_subset_selector = AlwaysSelector
 #sfc_subset_selector = SFCRangeSelector
@@ -305,9 +305,20 @@ class ARTIOIndex(Index):
                 g = og
             yield YTDataChunk(dobj, "spatial", [g], None, cache = True)
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _estimate_io_cells(self, subset):
+        if isinstance(subset, ARTIORootMeshSubset):
+            # One root cell per index of the space-filling curve.
+            return subset.sfc_end - subset.sfc_start + 1
+        return subset.oct_handler.nocts * subset._num_zones**3
+
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
         # _current_chunk is made from identify_base_chunk
         oobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
+        if chunk_sizing == "adaptive":
+            for subsets in self._adaptive_chunk_groups(oobjs, nfields):
+                yield YTDataChunk(dobj, "io", subsets, None, cache = cache)
+            return
         for chunk in oobjs:
             yield YTDataChunk(dobj, "io", [chunk], None,
                               cache = cache)
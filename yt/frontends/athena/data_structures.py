@@ -145,6 +145,8 @@ class AthenaHierarchy(GridIndex):
     grid = AthenaGrid
     _dataset_type='athena'
     _data_file = None
+    # _chunk_io is overridden and does not take a prefetcher.
+    _prefetch_implemented = False
 
     def __init__(self, ds, dataset_type='athena'):
         self.dataset = weakref.proxy(ds)
@@ -426,11 +428,16 @@ class AthenaHierarchy(GridIndex):
         mask[grid_ind] = True
         return [g for g in self.grids[mask] if g.Level == grid.Level + 1]
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
         gobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
-        for subset in gobjs:
-            yield YTDataChunk(dobj, "io", [subset],
-                              self._count_selection(dobj, [subset]),
+        if chunk_sizing == "adaptive":
+            groups = self._adaptive_chunk_groups(gobjs, nfields)
+        else:
+            groups = ([subset] for subset in gobjs)
+        for subsets in groups:
+            yield YTDataChunk(dobj, "io", subsets,
+                              self._count_selection(dobj, subsets),
                               cache = cache)
 
 class AthenaDataset(Dataset):
@@ -13,6 +13,7 @@ Data structures for BoxLib Codes
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
+import glob
 import inspect
 import os
 import re
@@ -291,10 +292,43 @@ class BoxlibHierarchy(GridIndex):
         mylog.debug("FAB header suggests dtype of %s", dtype)
         self._dtype = np.dtype(dtype)
 
+    @property
+    def _index_cache_files(self):
+        # The grid dimensions and offsets come from the header of each level
+        # (such as Level_0/Cell_H), which is named in the main header.  We
+        # need the list before parsing anything, so we look for them.
+        level_headers = glob.glob(
+            os.path.join(self.dataset.output_dir, "*", "*_H"))
+        return [self.header_filename] + sorted(level_headers)
+
+    def _get_index_cache_extras(self):
+        return {"level_dds": self.level_dds,
+                "grid_start_index": self.grid_start_index,
+                "grid_offsets": np.array([g._base_offset for g in self.grids],
+                                         dtype="int64")}
+
+    def _restore_index_cache(self, data):
+        self.max_level = self.dataset._max_level
+        self.dimensionality = self.dataset.dimensionality
+        self.level_dds = data["level_dds"]
+        self.grid_start_index[:] = data["grid_start_index"]
+        self.grids = []
+        for i, (offset, filename) in enumerate(zip(data["grid_offsets"],
+                                                   data["filenames"])):
+            go = self.grid(i, int(offset), str(filename), self)
+            go.Level = self.grid_levels[i, 0]
+            self.grids.append(go)
+        for go, children in zip(self.grids, self._cached_children(data)):
+            go._children_ids = children
+            for cid in children:
+                self.grids[cid - go._id_offset]._parent_id.append(go.id)
+        self.float_type = 'float64'
+
     def _populate_grid_objects(self):
         mylog.debug("Creating grid objects")
         self.grids = np.array(self.grids, dtype='object')
-        self._reconstruct_parent_child()
+        if not self._index_cache_restored:
+            self._reconstruct_parent_child()
         for i, grid in enumerate(self.grids):
             if (i % 1e4) == 0: mylog.debug("Prepared % 7i / % 7i grids", i,
                                            self.num_grids)
@@ -25,6 +25,7 @@ from yt.frontends.chombo.io import parse_orion_sinks
 class IOHandlerBoxlib(BaseIOHandler):
 
     _dataset_type = "boxlib_native"
+    _thread_safe_fluid_reads = True
 
     def __init__(self, ds, *args, **kwargs):
         self.ds = ds
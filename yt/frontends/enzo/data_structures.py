@@ -321,6 +321,31 @@ class EnzoHierarchy(GridIndex):
         self.grids = temp_grids
         self.filenames = fn
 
+    @property
+    def _index_cache_files(self):
+        return (self.index_filename,)
+
+    def _get_index_cache_extras(self):
+        extras = {}
+        for ptype, counts in getattr(self, "grid_active_particle_count",
+                                     {}).items():
+            extras["active_particle_count_%s" % ptype] = counts
+        return extras
+
+    def _restore_index_cache(self, data):
+        self.grids = np.empty(self.num_grids, dtype='object')
+        for i in range(self.num_grids):
+            g = self.grids[i] = self.grid(i + 1, self)
+            g.Level = self.grid_levels[i, 0]
+        for g, children in zip(self.grids, self._cached_children(data)):
+            g._children_ids = children.tolist()
+            for cid in g._children_ids:
+                self.grids[cid - 1]._parent_id = g.id
+        for ptype in getattr(self, "grid_active_particle_count", {}):
+            self.grid_active_particle_count[ptype][:] = \
+                data["active_particle_count_%s" % ptype]
+        self.filenames = [[str(fn) or None] for fn in data["filenames"]]
+
     def _initialize_grid_arrays(self):
         super(EnzoHierarchy, self)._initialize_grid_arrays()
         if "AppendActiveParticleType" in self.parameters.keys() and \
@@ -550,6 +575,7 @@ class EnzoHierarchyInMemory(EnzoHierarchy):
 
     grid = EnzoGridInMemory
     _enzo = None
+    _index_cache_files = ()
 
     @property
     def enzo(self):
@@ -630,7 +656,22 @@ class EnzoHierarchyInMemory(EnzoHierarchy):
             random_sample = np.mgrid[0:max(len(my_grids)-1,1)].astype("int32")
         return my_grids[(random_sample,)]
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  preload_fields = None, chunk_sizing = None, nfields = 1,
+                  prefetcher = None):
+        if chunk_sizing is not None and not local_only:
+            for chunk in super(EnzoHierarchy, self)._chunk_io(
+                    dobj, cache, local_only, preload_fields, chunk_sizing,
+                    nfields, prefetcher):
+                yield chunk
+            return
+        chunks = self._chunk_io_files(dobj, cache, local_only)
+        if prefetcher is not None:
+            chunks = prefetcher(chunks)
+        for chunk in chunks:
+            yield chunk
+
+    def _chunk_io_files(self, dobj, cache, local_only):
         gfiles = defaultdict(list)
         gobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
         for g in gobjs:
@@ -15,6 +15,7 @@ Enzo-specific IO functions
 
 import random
 from contextlib import contextmanager
+from itertools import groupby
 
 from yt.utilities.io_handler import \
     BaseIOHandler
@@ -35,10 +36,14 @@ class IOHandlerPackedHDF5(BaseIOHandler):
     _dataset_type = "enzo_packed_3d"
     _base = slice(None)
     _field_dtype = "float64"
+    _thread_safe_fluid_reads = True
 
     def _read_field_names(self, grid):
         if grid.filename is None: return []
-        f = h5py.File(grid.filename, "r")
+        with self._open_h5(grid.filename) as f:
+            return self._read_field_names_from_handle(grid, f)
+
+    def _read_field_names_from_handle(self, grid, f):
         try:
             group = f["/Grid%08i" % grid.id]
         except KeyError:
@@ -69,7 +74,6 @@ class IOHandlerPackedHDF5(BaseIOHandler):
             # to be correct -- it will get fixed later -- it just needs to be
             # okay for now.
             self._field_dtype = list(dtypes)[0]
-        f.close()
         return fields
 
     @property
@@ -79,63 +83,57 @@ class IOHandlerPackedHDF5(BaseIOHandler):
     def _read_particle_coords(self, chunks, ptf):
         chunks = list(chunks)
         for chunk in chunks: # These should be organized by grid filename
-            f = None
-            for g in chunk.objs:
-                if g.filename is None: continue
-                if f is None:
-                    #print "Opening (count) %s" % g.filename
-                    f = h5py.File(g.filename, "r")
-                nap = sum(g.NumberOfActiveParticles.values())
-                if g.NumberOfParticles == 0 and nap == 0:
-                    continue
-                ds = f.get("/Grid%08i" % g.id)
-                for ptype, field_list in sorted(ptf.items()):
-                    if ptype != "io":
-                        if g.NumberOfActiveParticles[ptype] == 0: continue
-                        pds = ds.get("Particles/%s" % ptype)
-                    else:
-                        pds = ds
-                    pn = _particle_position_names.get(ptype,
-                            r"particle_position_%s")
-                    x, y, z = (np.asarray(pds.get(pn % ax).value, dtype="=f8")
-                               for ax in 'xyz')
-                    for field in field_list:
-                        if np.asarray(pds[field]).ndim > 1:
-                            self._array_fields[field] = pds[field].shape
-                    yield ptype, (x, y, z)
-            if f: f.close()
+            grids = [g for g in chunk.objs if g.filename is not None]
+            if len(grids) == 0: continue
+            with self._open_h5(grids[0].filename) as f:
+                for g in grids:
+                    nap = sum(g.NumberOfActiveParticles.values())
+                    if g.NumberOfParticles == 0 and nap == 0:
+                        continue
+                    ds = f.get("/Grid%08i" % g.id)
+                    for ptype, field_list in sorted(ptf.items()):
+                        if ptype != "io":
+                            if g.NumberOfActiveParticles[ptype] == 0: continue
+                            pds = ds.get("Particles/%s" % ptype)
+                        else:
+                            pds = ds
+                        pn = _particle_position_names.get(ptype,
+                                r"particle_position_%s")
+                        x, y, z = (np.asarray(pds.get(pn % ax).value, dtype="=f8")
+                                   for ax in 'xyz')
+                        for field in field_list:
+                            if np.asarray(pds[field]).ndim > 1:
+                                self._array_fields[field] = pds[field].shape
+                        yield ptype, (x, y, z)
 
     def _read_particle_fields(self, chunks, ptf, selector):
         chunks = list(chunks)
         for chunk in chunks: # These should be organized by grid filename
-            f = None
-            for g in chunk.objs:
-                if g.filename is None: continue
-                if f is None:
-                    #print "Opening (read) %s" % g.filename
-                    f = h5py.File(g.filename, "r")
-                nap = sum(g.NumberOfActiveParticles.values())
-                if g.NumberOfParticles == 0 and nap == 0:
-                    continue
-                ds = f.get("/Grid%08i" % g.id)
-                for ptype, field_list in sorted(ptf.items()):
-                    if ptype != "io":
-                        if g.NumberOfActiveParticles[ptype] == 0: continue
-                        pds = ds.get("Particles/%s" % ptype)
-                    else:
-                        pds = ds
-                    pn = _particle_position_names.get(ptype,
-                            r"particle_position_%s")
-                    x, y, z = (np.asarray(pds.get(pn % ax).value, dtype="=f8")
-                               for ax in 'xyz')
-                    mask = selector.select_points(x, y, z, 0.0)
-                    if mask is None: continue
-                    for field in field_list:
-                        data = np.asarray(pds.get(field).value, "=f8")
-                        if field in _convert_mass:
-                            data *= g.dds.prod(dtype="f8")
-                        yield (ptype, field), data[mask]
-            if f: f.close()
+            grids = [g for g in chunk.objs if g.filename is not None]
+            if len(grids) == 0: continue
+            with self._open_h5(grids[0].filename) as f:
+                for g in grids:
+                    nap = sum(g.NumberOfActiveParticles.values())
+                    if g.NumberOfParticles == 0 and nap == 0:
+                        continue
+                    ds = f.get("/Grid%08i" % g.id)
+                    for ptype, field_list in sorted(ptf.items()):
+                        if ptype != "io":
+                            if g.NumberOfActiveParticles[ptype] == 0: continue
+                            pds = ds.get("Particles/%s" % ptype)
+                        else:
+                            pds = ds
+                        pn = _particle_position_names.get(ptype,
+                                r"particle_position_%s")
+                        x, y, z = (np.asarray(pds.get(pn % ax).value, dtype="=f8")
+                                   for ax in 'xyz')
+                        mask = selector.select_points(x, y, z, 0.0)
+                        if mask is None: continue
+                        for field in field_list:
+                            data = np.asarray(pds.get(field).value, "=f8")
+                            if field in _convert_mass:
+                                data *= g.dds.prod(dtype="f8")
+                            yield (ptype, field), data[mask]
 
     def _read_fluid_selection(self, chunks, selector, fields, size):
         rv = {}
@@ -145,27 +143,26 @@ class IOHandlerPackedHDF5(BaseIOHandler):
             if not (len(chunks) == len(chunks[0].objs) == 1):
                 raise RuntimeError
             g = chunks[0].objs[0]
-            f = h5py.File(u(g.filename), 'r')
             if g.id in self._cached_fields:
                 gf = self._cached_fields[g.id]
                 rv.update(gf)
             if len(rv) == len(fields): return rv
-            gds = f.get("/Grid%08i" % g.id)
-            for field in fields:
-                if field in rv:
-                    self._hits += 1
-                    continue
-                self._misses += 1
-                ftype, fname = field
-                if fname in gds:
-                    rv[(ftype, fname)] = gds.get(fname).value.swapaxes(0, -1)
-                else:
-                    rv[(ftype, fname)] = np.zeros(g.ActiveDimensions)
+            with self._open_h5(u(g.filename)) as f:
+                gds = f.get("/Grid%08i" % g.id)
+                for field in fields:
+                    if field in rv:
+                        self._hits += 1
+                        continue
+                    self._misses += 1
+                    ftype, fname = field
+                    if fname in gds:
+                        rv[(ftype, fname)] = gds.get(fname).value.swapaxes(0, -1)
+                    else:
+                        rv[(ftype, fname)] = np.zeros(g.ActiveDimensions)
             if self._cache_on:
                 for gid in rv:
                     self._cached_fields.setdefault(gid, {})
                     self._cached_fields[gid].update(rv[gid])
-            f.close()
             return rv
         if size is None:
             size = sum((g.count(selector) for chunk in chunks
@@ -180,36 +177,35 @@ class IOHandlerPackedHDF5(BaseIOHandler):
         ind = 0
         h5_type = self._field_dtype
         for chunk in chunks:
-            fid = None
-            for g in chunk.objs:
-                if g.filename is None: continue
-                if fid is None:
-                    fid = h5py.h5f.open(b(g.filename), h5py.h5f.ACC_RDONLY)
-                gf = self._cached_fields.get(g.id, {})
-                data = np.empty(g.ActiveDimensions[::-1], dtype=h5_type)
-                data_view = data.swapaxes(0, -1)
-                nd = 0
-                for field in fields:
-                    if field in gf:
-                        nd = g.select(selector, gf[field], rv[field], ind)
-                        self._hits += 1
-                        continue
-                    self._misses += 1
-                    ftype, fname = field
-                    try:
-                        node = "/Grid%08i/%s" % (g.id, fname)
-                        dg = h5py.h5d.open(fid, b(node))
-                    except KeyError:
-                        if fname == "Dark_Matter_Density": continue
-                        raise
-                    dg.read(h5py.h5s.ALL, h5py.h5s.ALL, data)
-                    if self._cache_on:
-                        self._cached_fields.setdefault(g.id, {})
-                        # Copy because it's a view into an empty temp array
-                        self._cached_fields[g.id][field] = data_view.copy()
-                    nd = g.select(selector, data_view, rv[field], ind) # caches
-                ind += nd
-            if fid: fid.close()
+            grids = [g for g in chunk.objs if g.filename is not None]
+            if len(grids) == 0: continue
+            with self._open_h5(grids[0].filename) as f:
+                fid = f.id
+                for g in grids:
+                    gf = self._cached_fields.get(g.id, {})
+                    data = np.empty(g.ActiveDimensions[::-1], dtype=h5_type)
+                    data_view = data.swapaxes(0, -1)
+                    nd = 0
+                    for field in fields:
+                        if field in gf:
+                            nd = g.select(selector, gf[field], rv[field], ind)
+                            self._hits += 1
+                            continue
+                        self._misses += 1
+                        ftype, fname = field
+                        try:
+                            node = "/Grid%08i/%s" % (g.id, fname)
+                            dg = h5py.h5d.open(fid, b(node))
+                        except KeyError:
+                            if fname == "Dark_Matter_Density": continue
+                            raise
+                        dg.read(h5py.h5s.ALL, h5py.h5s.ALL, data)
+                        if self._cache_on:
+                            self._cached_fields.setdefault(g.id, {})
+                            # Copy because it's a view into an empty temp array
+                            self._cached_fields[g.id][field] = data_view.copy()
+                        nd = g.select(selector, data_view, rv[field], ind) # caches
+                    ind += nd
         return rv
 
     @contextmanager
@@ -250,7 +246,6 @@ class IOHandlerPackedHDF5(BaseIOHandler):
                 len(self._cached_fields), max_size)
 
     def _read_chunk_data(self, chunk, fields):
-        fid = fn = None
         rv = {}
         mylog.debug("Preloading fields %s", fields)
         # Split into particles and non-particles
@@ -267,33 +262,33 @@ class IOHandlerPackedHDF5(BaseIOHandler):
         if len(fluid_fields) == 0: return rv
         h5_type = self._field_dtype
         for g in chunk.objs:
-            rv[g.id] = gf = {}
+            rv[g.id] = {}
             if g.id in self._cached_fields:
                 rv[g.id].update(self._cached_fields[g.id])
-            if g.filename is None: continue
-            elif g.filename != fn:
-                if fid is not None: fid.close()
-                fid = None
-            if fid is None:
-                fid = h5py.h5f.open(b(g.filename), h5py.h5f.ACC_RDONLY)
-                fn = g.filename
-            data = np.empty(g.ActiveDimensions[::-1], dtype=h5_type)
-            data_view = data.swapaxes(0, -1)
-            for field in fluid_fields:
-                if field in gf:
-                    self._hits += 1
-                    continue
-                self._misses += 1
-                ftype, fname = field
-                try:
-                    node = "/Grid%08i/%s" % (g.id, fname)
-                    dg = h5py.h5d.open(fid, b(node))
-                except KeyError:
-                    if fname == "Dark_Matter_Density": continue
-                    raise
-                dg.read(h5py.h5s.ALL, h5py.h5s.ALL, data)
-                gf[field] = data_view.copy()
-        if fid: fid.close()
+        # Grids are organized by filename, so consecutive grids will usually
+        # share an open file.
+        for fn, grids in groupby(chunk.objs, lambda g: g.filename):
+            if fn is None: continue
+            with self._open_h5(fn) as f:
+                fid = f.id
+                for g in grids:
+                    gf = rv[g.id]
+                    data = np.empty(g.ActiveDimensions[::-1], dtype=h5_type)
+                    data_view = data.swapaxes(0, -1)
+                    for field in fluid_fields:
+                        if field in gf:
+                            self._hits += 1
+                            continue
+                        self._misses += 1
+                        ftype, fname = field
+                        try:
+                            node = "/Grid%08i/%s" % (g.id, fname)
+                            dg = h5py.h5d.open(fid, b(node))
+                        except KeyError:
+                            if fname == "Dark_Matter_Density": continue
+                            raise
+                        dg.read(h5py.h5s.ALL, h5py.h5s.ALL, data)
+                        gf[field] = data_view.copy()
         if self._cache_on:
             for gid in rv:
                 self._cached_fields.setdefault(gid, {})
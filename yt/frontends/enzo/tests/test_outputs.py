@@ -14,7 +14,10 @@ Enzo frontend tests
 #-----------------------------------------------------------------------------
 
 import numpy as np
+import shutil
+import tempfile
 
+from yt.config import ytcfg
 from yt.testing import \
     assert_almost_equal, \
     assert_equal, \
@@ -173,3 +176,25 @@ def test_active_particle_datasets():
 
     assert_equal(apcos.particle_type_counts,
                  {'CenOstriker': 899755, 'DarkMatter': 32768})
+
+@requires_file(enzotiny)
+def test_index_cache():
+    tmpdir = tempfile.mkdtemp()
+    old = ytcfg.get("yt", "index_cache"), ytcfg.get("yt", "index_cache_dir")
+    ytcfg["yt", "index_cache"] = "True"
+    ytcfg["yt", "index_cache_dir"] = tmpdir
+    try:
+        ds1 = data_dir_load(enzotiny)
+        ds2 = data_dir_load(enzotiny)
+        assert not ds1.index._index_cache_restored
+        assert ds2.index._index_cache_restored
+        for attr in ds1.index._index_properties:
+            assert_equal(getattr(ds1.index, attr), getattr(ds2.index, attr))
+        for g1, g2 in zip(ds1.index.grids, ds2.index.grids):
+            assert_equal(g1.filename, g2.filename)
+            assert_equal(g1._parent_id, g2._parent_id)
+            assert_equal(g1._children_ids, g2._children_ids)
+        assert_equal(ds1.all_data()["density"], ds2.all_data()["density"])
+    finally:
+        ytcfg["yt", "index_cache"], ytcfg["yt", "index_cache_dir"] = old
+        shutil.rmtree(tmpdir)
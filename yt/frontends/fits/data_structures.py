@@ -80,6 +80,8 @@ class FITSGrid(AMRGridPatch):
 class FITSHierarchy(GridIndex):
 
     grid = FITSGrid
+    # _chunk_io is overridden and does not take a prefetcher.
+    _prefetch_implemented = False
 
     def __init__(self,ds,dataset_type='fits'):
         self.dataset_type = dataset_type
@@ -284,15 +286,19 @@ class FITSHierarchy(GridIndex):
     def _setup_data_io(self):
         self.io = io_registry[self.dataset_type](self.dataset)
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
         # local_only is only useful for inline datasets and requires
         # implementation by subclasses.
         gfiles = defaultdict(list)
         gobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
         for g in gobjs:
             gfiles[g.id].append(g)
-        for fn in sorted(gfiles):
-            gs = gfiles[fn]
+        groups = (gfiles[fn] for fn in sorted(gfiles))
+        if chunk_sizing == "adaptive":
+            groups = self._adaptive_chunk_groups(
+                [g for gs in groups for g in gs], nfields)
+        for gs in groups:
             yield YTDataChunk(dobj, "io", gs, self._count_selection(dobj, gs),
                               cache = cache)
 
@@ -674,3 +680,4 @@ class FITSDataset(Dataset):
 
     def close(self):
         self._handle.close()
+        super(FITSDataset, self).close()
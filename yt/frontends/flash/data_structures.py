@@ -453,6 +453,7 @@ class FLASHDataset(Dataset):
 
     def close(self):
         self._handle.close()
+        super(FLASHDataset, self).close()
 
 class FLASHParticleFile(ParticleFile):
     pass
@@ -18,6 +18,7 @@ from __future__ import print_function
 import numpy as np
 import os
 
+from yt.config import ytcfg
 from yt.extern.six import string_types
 from yt.frontends.owls.io import \
     IOHandlerOWLS
@@ -34,6 +35,7 @@ ZeroMass = object()
     
 class IOHandlerGadgetBinary(BaseIOHandler):
     _dataset_type = "gadget_binary"
+    _thread_safe_index = True
     _vector_fields = (("Coordinates", 3),
                       ("Velocity", 3),
                       ("Velocities", 3),
@@ -81,9 +83,18 @@ class IOHandlerGadgetBinary(BaseIOHandler):
         for chunk in chunks:
             for obj in chunk.objs:
                 data_files.update(obj.data_files)
+        use_memmap = ytcfg.getboolean("yt", "memmap_particle_io")
         for data_file in sorted(data_files):
             poff = data_file.field_offsets
             tp = data_file.total_particles
+            if use_memmap:
+                for ptype in ptf:
+                    pos = self._memmap_field(data_file, ptype, "Coordinates")
+                    if pos is None: continue
+                    yield ptype, tuple(pos[:,i].astype("float64")
+                                       for i in range(3))
+                    del pos
+                continue
             f = open(data_file.filename, "rb")
             for ptype in ptf:
                 # This is where we could implement sub-chunking
@@ -98,14 +109,30 @@ class IOHandlerGadgetBinary(BaseIOHandler):
         for chunk in chunks:
             for obj in chunk.objs:
                 data_files.update(obj.data_files)
+        use_memmap = ytcfg.getboolean("yt", "memmap_particle_io")
         for data_file in sorted(data_files):
             poff = data_file.field_offsets
             tp = data_file.total_particles
-            f = open(data_file.filename, "rb")
+            if use_memmap:
+                f = None
+                def _read(ptype, field, mask = None):
+                    arr = self._memmap_field(data_file, ptype, field)
+                    if mask is not None:
+                        # Only the selected particles are gathered from the
+                        # file.
+                        arr = arr[mask,...]
+                    return arr
+            else:
+                f = open(data_file.filename, "rb")
+                def _read(ptype, field, mask = None):
+                    f.seek(poff[ptype, field], os.SEEK_SET)
+                    arr = self._read_field_from_file(f, tp[ptype], field)
+                    if mask is not None:
+                        arr = arr[mask,...]
+                    return arr
             for ptype, field_list in sorted(ptf.items()):
-                f.seek(poff[ptype, "Coordinates"], os.SEEK_SET)
-                pos = self._read_field_from_file(f,
-                            tp[ptype], "Coordinates")
+                pos = _read(ptype, "Coordinates")
+                if pos is None: continue
                 mask = selector.select_points(
                     pos[:,0], pos[:,1], pos[:,2], 0.0)
                 del pos
@@ -118,18 +145,19 @@ class IOHandlerGadgetBinary(BaseIOHandler):
                         data[:] = m
                         yield (ptype, field), data
                         continue
-                    f.seek(poff[ptype, field], os.SEEK_SET)
-                    data = self._read_field_from_file(f, tp[ptype], field)
-                    data = data[mask,...]
-                    yield (ptype, field), data
-            f.close()
+                    data = _read(ptype, field, mask)
+                    yield (ptype, field), data.astype("float64", copy=False)
+            if f is not None:
+                f.close()
+
+    def _field_dtype(self, name):
+        if name == "ParticleIDs":
+            return "uint32"
+        return "float32"
 
     def _read_field_from_file(self, f, count, name):
         if count == 0: return
-        if name == "ParticleIDs":
-            dt = "uint32"
-        else:
-            dt = "float32"
+        dt = self._field_dtype(name)
         if name in self._vector_fields:
             count *= self._vector_fields[name]
         arr = np.fromfile(f, dtype=dt, count = count)
@@ -138,6 +166,21 @@ class IOHandlerGadgetBinary(BaseIOHandler):
             arr = arr.reshape((count//factor, factor), order="C")
         return arr.astype("float64")
 
+    def _memmap_field(self, data_file, ptype, name):
+        """
+        Return a read-only memory map of the block of field *name* for
+        particle type *ptype* in *data_file*, in the file's own dtype, or
+        None if there are no particles of that type.
+        """
+        count = data_file.total_particles[ptype]
+        if count == 0: return
+        shape = (count,)
+        if name in self._vector_fields:
+            shape = (count, self._vector_fields[name])
+        return np.memmap(data_file.filename, dtype=self._field_dtype(name),
+                         mode="r", offset=data_file.field_offsets[ptype, name],
+                         shape=shape)
+
     def _initialize_index(self, data_file, regions):
         count = sum(data_file.total_particles.values())
         DLE = data_file.ds.domain_left_edge
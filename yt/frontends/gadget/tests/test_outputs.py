@@ -15,8 +15,13 @@ Gadget frontend tests
 #-----------------------------------------------------------------------------
 
 from collections import OrderedDict
+import shutil
+import tempfile
 
-from yt.testing import requires_file
+from yt.config import ytcfg
+from yt.testing import \
+    assert_equal, \
+    requires_file
 from yt.utilities.answer_testing.framework import \
     data_dir_load, \
     requires_ds, \
@@ -56,3 +61,63 @@ def test_iso_collapse():
     for test in sph_answer(ds, 'snap_505', 2**17, iso_fields):
         test_iso_collapse.__name__ = test.description
         yield test
+
+
+@requires_file(isothermal_bin)
+def test_particle_index_cache():
+    tmpdir = tempfile.mkdtemp()
+    old = ytcfg.get("yt", "index_cache"), ytcfg.get("yt", "index_cache_dir")
+    ytcfg["yt", "index_cache"] = "True"
+    ytcfg["yt", "index_cache_dir"] = tmpdir
+    try:
+        ds1 = data_dir_load(isothermal_bin, kwargs=iso_kwargs)
+        ds2 = data_dir_load(isothermal_bin, kwargs=iso_kwargs)
+        ds1.index
+        ds2.index
+        assert not ds1.index._index_cache_restored
+        assert ds2.index._index_cache_restored
+        assert_equal(ds1.index.max_level, ds2.index.max_level)
+        assert_equal(ds1.index.oct_handler.nocts,
+                     ds2.index.oct_handler.nocts)
+        for m1, m2 in zip(ds1.index.regions.masks, ds2.index.regions.masks):
+            assert_equal(m1, m2)
+        ad1, ad2 = ds1.all_data(), ds2.all_data()
+        assert_equal(ad1["all", "particle_mass"], ad2["all", "particle_mass"])
+    finally:
+        ytcfg["yt", "index_cache"], ytcfg["yt", "index_cache_dir"] = old
+        shutil.rmtree(tmpdir)
+
+
+@requires_file(isothermal_bin)
+def test_particle_index_threads():
+    old = ytcfg.get("yt", "index_threads")
+    try:
+        ytcfg["yt", "index_threads"] = "1"
+        ds1 = data_dir_load(isothermal_bin, kwargs=iso_kwargs)
+        ds1.index
+        ytcfg["yt", "index_threads"] = "4"
+        ds2 = data_dir_load(isothermal_bin, kwargs=iso_kwargs)
+        ds2.index
+    finally:
+        ytcfg["yt", "index_threads"] = old
+    assert_equal(ds1.index.oct_handler.nocts, ds2.index.oct_handler.nocts)
+    for m1, m2 in zip(ds1.index.regions.masks, ds2.index.regions.masks):
+        assert_equal(m1, m2)
+
+
+@requires_file(isothermal_bin)
+def test_gadget_binary_memmap():
+    fields = [("Gas", "Coordinates"), ("Gas", "Mass"), ("Gas", "Density"),
+              ("all", "ParticleIDs")]
+    old = ytcfg.get("yt", "memmap_particle_io")
+    values = []
+    try:
+        for value in ("False", "True"):
+            ytcfg["yt", "memmap_particle_io"] = value
+            ds = data_dir_load(isothermal_bin, kwargs=iso_kwargs)
+            sp = ds.sphere("c", (0.5, "unitary"))
+            values.append([sp[field] for field in fields])
+    finally:
+        ytcfg["yt", "memmap_particle_io"] = old
+    for v1, v2 in zip(*values):
+        assert_equal(v1, v2)
@@ -30,7 +30,6 @@ from yt.data_objects.static_output import \
 from yt.utilities.file_handler import \
     HDF5FileHandler
 from .fields import GAMERFieldInfo
-from yt.testing import assert_equal
 
 
 
@@ -127,6 +126,7 @@ class GAMERHierarchy(GridIndex):
 
     # for _debug mode only
     def _validate_parent_children_relasionship(self):
+        from yt.testing import assert_equal
         mylog.info('Validating the parent-children relationship ...')
 
         father_list = self._handle["Tree/Father"].value
@@ -43,6 +43,7 @@ def _get_h5_handle(fn):
 
 class IOHandlerOWLS(BaseIOHandler):
     _dataset_type = "OWLS"
+    _thread_safe_index = True
     _vector_fields = ("Coordinates", "Velocity", "Velocities")
     _known_ptypes = ghdf5_ptypes
     _var_mass = None
@@ -71,16 +72,15 @@ class IOHandlerOWLS(BaseIOHandler):
             for obj in chunk.objs:
                 data_files.update(obj.data_files)
         for data_file in sorted(data_files, key=lambda x: x.filename):
-            f = _get_h5_handle(data_file.filename)
-            # This double-reads
-            for ptype, field_list in sorted(ptf.items()):
-                if data_file.total_particles[ptype] == 0:
-                    continue
-                x = f["/%s/Coordinates" % ptype][:,0].astype("float64")
-                y = f["/%s/Coordinates" % ptype][:,1].astype("float64")
-                z = f["/%s/Coordinates" % ptype][:,2].astype("float64")
-                yield ptype, (x, y, z)
-            f.close()
+            with self._open_h5(data_file.filename, _get_h5_handle) as f:
+                # This double-reads
+                for ptype, field_list in sorted(ptf.items()):
+                    if data_file.total_particles[ptype] == 0:
+                        continue
+                    x = f["/%s/Coordinates" % ptype][:,0].astype("float64")
+                    y = f["/%s/Coordinates" % ptype][:,1].astype("float64")
+                    z = f["/%s/Coordinates" % ptype][:,2].astype("float64")
+                    yield ptype, (x, y, z)
 
     def _read_particle_fields(self, chunks, ptf, selector):
         # Now we have all the sizes, and we can allocate
@@ -89,124 +89,120 @@ class IOHandlerOWLS(BaseIOHandler):
             for obj in chunk.objs:
                 data_files.update(obj.data_files)
         for data_file in sorted(data_files, key=lambda x: x.filename):
-            f = _get_h5_handle(data_file.filename)
-            for ptype, field_list in sorted(ptf.items()):
-                if data_file.total_particles[ptype] == 0:
-                    continue
-                g = f["/%s" % ptype]
-                coords = g["Coordinates"][:].astype("float64")
-                mask = selector.select_points(
-                            coords[:,0], coords[:,1], coords[:,2], 0.0)
-                del coords
-                if mask is None: continue
-                for field in field_list:
-
-                    if field in ("Mass", "Masses") and \
-                        ptype not in self.var_mass:
-                        data = np.empty(mask.sum(), dtype="float64")
-                        ind = self._known_ptypes.index(ptype)
-                        data[:] = self.ds["Massarr"][ind]
-
-                    elif field in self._element_names:
-                        rfield = 'ElementAbundance/' + field
-                        data = g[rfield][:][mask,...]
-                    elif field.startswith("Metallicity_"):
-                        col = int(field.rsplit("_", 1)[-1])
-                        data = g["Metallicity"][:,col][mask]
-                    elif field.startswith("Chemistry_"):
-                        col = int(field.rsplit("_", 1)[-1])
-                        data = g["ChemistryAbundances"][:,col][mask]
-                    else:
-                        data = g[field][:][mask,...]
-
-                    yield (ptype, field), data
-            f.close()
+            with self._open_h5(data_file.filename, _get_h5_handle) as f:
+                for ptype, field_list in sorted(ptf.items()):
+                    if data_file.total_particles[ptype] == 0:
+                        continue
+                    g = f["/%s" % ptype]
+                    coords = g["Coordinates"][:].astype("float64")
+                    mask = selector.select_points(
+                                coords[:,0], coords[:,1], coords[:,2], 0.0)
+                    del coords
+                    if mask is None: continue
+                    for field in field_list:
+
+                        if field in ("Mass", "Masses") and \
+                            ptype not in self.var_mass:
+                            data = np.empty(mask.sum(), dtype="float64")
+                            ind = self._known_ptypes.index(ptype)
+                            data[:] = self.ds["Massarr"][ind]
+
+                        elif field in self._element_names:
+                            rfield = 'ElementAbundance/' + field
+                            data = g[rfield][:][mask,...]
+                        elif field.startswith("Metallicity_"):
+                            col = int(field.rsplit("_", 1)[-1])
+                            data = g["Metallicity"][:,col][mask]
+                        elif field.startswith("Chemistry_"):
+                            col = int(field.rsplit("_", 1)[-1])
+                            data = g["ChemistryAbundances"][:,col][mask]
+                        else:
+                            data = g[field][:][mask,...]
+
+                        yield (ptype, field), data
 
     def _initialize_index(self, data_file, regions):
         index_ptype = self.index_ptype
-        f = _get_h5_handle(data_file.filename)
-        if index_ptype == "all":
-            pcount = f["/Header"].attrs["NumPart_ThisFile"][:].sum()
-            keys = f.keys()
-        else:
-            pt = int(index_ptype[-1])
-            pcount = f["/Header"].attrs["NumPart_ThisFile"][pt]
-            keys = [index_ptype]
-        morton = np.empty(pcount, dtype='uint64')
-        ind = 0
-        for key in keys:
-            if not key.startswith("PartType"): continue
-            if "Coordinates" not in f[key]: continue
-            ds = f[key]["Coordinates"]
-            dt = ds.dtype.newbyteorder("N") # Native
-            pos = np.empty(ds.shape, dtype=dt)
-            pos[:] = ds
-            regions.add_data_file(pos, data_file.file_id,
-                                  data_file.ds.filter_bbox)
-            morton[ind:ind+pos.shape[0]] = compute_morton(
-                pos[:,0], pos[:,1], pos[:,2],
-                data_file.ds.domain_left_edge,
-                data_file.ds.domain_right_edge,
-                data_file.ds.filter_bbox)
-            ind += pos.shape[0]
-        f.close()
+        with self._open_h5(data_file.filename, _get_h5_handle) as f:
+            if index_ptype == "all":
+                pcount = f["/Header"].attrs["NumPart_ThisFile"][:].sum()
+                keys = f.keys()
+            else:
+                pt = int(index_ptype[-1])
+                pcount = f["/Header"].attrs["NumPart_ThisFile"][pt]
+                keys = [index_ptype]
+            morton = np.empty(pcount, dtype='uint64')
+            ind = 0
+            for key in keys:
+                if not key.startswith("PartType"): continue
+                if "Coordinates" not in f[key]: continue
+                ds = f[key]["Coordinates"]
+                dt = ds.dtype.newbyteorder("N") # Native
+                pos = np.empty(ds.shape, dtype=dt)
+                pos[:] = ds
+                regions.add_data_file(pos, data_file.file_id,
+                                      data_file.ds.filter_bbox)
+                morton[ind:ind+pos.shape[0]] = compute_morton(
+                    pos[:,0], pos[:,1], pos[:,2],
+                    data_file.ds.domain_left_edge,
+                    data_file.ds.domain_right_edge,
+                    data_file.ds.filter_bbox)
+                ind += pos.shape[0]
         return morton
 
     def _count_particles(self, data_file):
-        f = _get_h5_handle(data_file.filename)
-        pcount = f["/Header"].attrs["NumPart_ThisFile"][:]
-        f.close()
+        with self._open_h5(data_file.filename, _get_h5_handle) as f:
+            pcount = f["/Header"].attrs["NumPart_ThisFile"][:]
         npart = dict(("PartType%s" % (i), v) for i, v in enumerate(pcount))
         return npart
 
 
     def _identify_fields(self, data_file):
-        f = _get_h5_handle(data_file.filename)
-        fields = []
-        cname = self.ds._particle_coordinates_name  # Coordinates
-        mname = self.ds._particle_mass_name  # Mass
-
-        # loop over all keys in OWLS hdf5 file
-        #--------------------------------------------------
-        for key in f.keys():
-
-            # only want particle data
-            #--------------------------------------
-            if not key.startswith("PartType"): continue
-
-            # particle data group
-            #--------------------------------------
-            g = f[key]
-            if cname not in g: continue
-
-            # note str => not unicode!
-
-            #ptype = int(key[8:])
-            ptype = str(key)
-            if ptype not in self.var_mass:
-                fields.append((ptype, mname))
-
-            # loop over all keys in PartTypeX group
-            #----------------------------------------
-            for k in g.keys():
-
-                if k == 'ElementAbundance':
-                    gp = g[k]
-                    for j in gp.keys():
-                        kk = j
+        with self._open_h5(data_file.filename, _get_h5_handle) as f:
+            fields = []
+            cname = self.ds._particle_coordinates_name  # Coordinates
+            mname = self.ds._particle_mass_name  # Mass
+
+            # loop over all keys in OWLS hdf5 file
+            #--------------------------------------------------
+            for key in f.keys():
+
+                # only want particle data
+                #--------------------------------------
+                if not key.startswith("PartType"): continue
+
+                # particle data group
+                #--------------------------------------
+                g = f[key]
+                if cname not in g: continue
+
+                # note str => not unicode!
+
+                #ptype = int(key[8:])
+                ptype = str(key)
+                if ptype not in self.var_mass:
+                    fields.append((ptype, mname))
+
+                # loop over all keys in PartTypeX group
+                #----------------------------------------
+                for k in g.keys():
+
+                    if k == 'ElementAbundance':
+                        gp = g[k]
+                        for j in gp.keys():
+                            kk = j
+                            fields.append((ptype, str(kk)))
+                    elif k == 'Metallicity' and len(g[k].shape) > 1:
+                        # Vector of metallicity
+                        for i in range(g[k].shape[1]):
+                            fields.append((ptype, "Metallicity_%02i" % i))
+                    elif k == "ChemistryAbundances" and len(g[k].shape)>1:
+                        for i in range(g[k].shape[1]):
+                            fields.append((ptype, "Chemistry_%03i" % i))
+                    else:
+                        kk = k
+                        if not hasattr(g[kk], "shape"): continue
                         fields.append((ptype, str(kk)))
-                elif k == 'Metallicity' and len(g[k].shape) > 1:
-                    # Vector of metallicity
-                    for i in range(g[k].shape[1]):
-                        fields.append((ptype, "Metallicity_%02i" % i))
-                elif k == "ChemistryAbundances" and len(g[k].shape)>1:
-                    for i in range(g[k].shape[1]):
-                        fields.append((ptype, "Chemistry_%03i" % i))
-                else:
-                    kk = k
-                    if not hasattr(g[kk], "shape"): continue
-                    fields.append((ptype, str(kk)))
-
-
-        f.close()
+
+
         return fields, {}
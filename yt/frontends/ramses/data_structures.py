@@ -460,8 +460,16 @@ class RAMSESIndex(OctreeIndex):
                 g = og
             yield YTDataChunk(dobj, "spatial", [g], None)
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _estimate_io_cells(self, subset):
+        return subset.domain.local_oct_count * subset._num_zones**3
+
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
         oobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
+        if chunk_sizing == "adaptive":
+            for subsets in self._adaptive_chunk_groups(oobjs, nfields):
+                yield YTDataChunk(dobj, "io", subsets, None, cache = cache)
+            return
         for subset in oobjs:
             yield YTDataChunk(dobj, "io", [subset], None, cache = cache)
 
@@ -1457,7 +1457,13 @@ class StreamOctreeHandler(OctreeIndex):
                 g = og
             yield YTDataChunk(dobj, "spatial", [g])
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
+        if chunk_sizing is not None:
+            # The whole octree is a single subset, so there is nothing to
+            # group or split.
+            mylog.debug("Ignoring chunk_sizing = %s for stream octrees",
+                        chunk_sizing)
         oobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
         for subset in oobjs:
             yield YTDataChunk(dobj, "io", [subset], None, cache = cache)
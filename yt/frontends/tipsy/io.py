@@ -20,6 +20,7 @@ import numpy as np
 from numpy.lib.recfunctions import append_fields
 import os
 
+from yt.config import ytcfg
 from yt.utilities.io_handler import \
     BaseIOHandler
 from yt.utilities.lib.geometry_utils import \
@@ -32,6 +33,7 @@ CHUNKSIZE = 10000000
 
 class IOHandlerTipsyBinary(BaseIOHandler):
     _dataset_type = "tipsy"
+    _thread_safe_index = True
     _vector_fields = ("Coordinates", "Velocity", "Velocities")
 
     _pdtypes = None  # dtypes, to be filled in later
@@ -100,14 +102,37 @@ class IOHandlerTipsyBinary(BaseIOHandler):
                                               self.domain_right_edge[i] - eps)
         return rv
 
+    # The domain edges are used to clip coordinates; they are derived from the
+    # dataset rather than set in _initialize_index, which is skipped when the
+    # particle index is restored from a cache.
+    @property
+    def domain_left_edge(self):
+        return self.ds.domain_left_edge.in_units("code_length").ndarray_view()
+
+    @property
+    def domain_right_edge(self):
+        return self.ds.domain_right_edge.in_units("code_length").ndarray_view()
+
     def _read_particle_coords(self, chunks, ptf):
         data_files = set([])
         for chunk in chunks:
             for obj in chunk.objs:
                 data_files.update(obj.data_files)
+        use_memmap = ytcfg.getboolean("yt", "memmap_particle_io")
         for data_file in sorted(data_files):
             poff = data_file.field_offsets
             tp = data_file.total_particles
+            if use_memmap:
+                for ptype, field_list in sorted(ptf.items(),
+                                                key=lambda a: poff[a[0]]):
+                    pp = self._memmap_particles(data_file, ptype)
+                    if pp is None: continue
+                    for start in range(0, pp.size, self._chunksize):
+                        p = pp[start:start + self._chunksize]
+                        yield ptype, [p["Coordinates"][ax].astype("float64")
+                                      for ax in 'xyz']
+                    del pp
+                continue
             f = open(data_file.filename, "rb")
             for ptype, field_list in sorted(ptf.items(),
                                             key=lambda a: poff[a[0]]):
@@ -133,6 +158,7 @@ class IOHandlerTipsyBinary(BaseIOHandler):
             aux_fields_offsets = \
                 self._calculate_particle_offsets_aux(data_file)
             tp = data_file.total_particles
+            use_memmap = ytcfg.getboolean("yt", "memmap_particle_io")
             f = open(data_file.filename, "rb")
 
             # we need to open all aux files for chunking to work
@@ -144,6 +170,24 @@ class IOHandlerTipsyBinary(BaseIOHandler):
                                             key=lambda a: poff[a[0]]):
                 f.seek(poff[ptype], os.SEEK_SET)
                 afields = list(set(field_list).intersection(self._aux_fields))
+                if use_memmap and len(afields) == 0:
+                    # The records are viewed in place and only the selected
+                    # particles are copied out by _fill_fields.
+                    pp = self._memmap_particles(data_file, ptype)
+                    if pp is None: continue
+                    for start in range(0, pp.size, self._chunksize):
+                        p = pp[start:start + self._chunksize]
+                        mask = selector.select_points(
+                            p["Coordinates"]['x'].astype("float64"),
+                            p["Coordinates"]['y'].astype("float64"),
+                            p["Coordinates"]['z'].astype("float64"), 0.0)
+                        if mask is None:
+                            continue
+                        tf = self._fill_fields(field_list, p, mask, data_file)
+                        for field in field_list:
+                            yield (ptype, field), tf.pop(field)
+                    del pp
+                    continue
                 for afield in afields:
                     aux_fh[afield].seek(
                         aux_fields_offsets[afield][ptype][0], os.SEEK_SET)
@@ -193,6 +237,18 @@ class IOHandlerTipsyBinary(BaseIOHandler):
             for fh in list(aux_fh.values()):
                 fh.close()
 
+    def _memmap_particles(self, data_file, ptype):
+        """
+        Return a read-only memory map of the particle records of *ptype* in
+        *data_file*, or None if there are none.
+        """
+        count = data_file.total_particles[ptype]
+        if count == 0:
+            return None
+        return np.memmap(data_file.filename, dtype=self._pdtypes[ptype],
+                         mode="r", offset=data_file.field_offsets[ptype],
+                         shape=(count,))
+
     def _update_domain(self, data_file):
         '''
         This method is used to determine the size needed for a box that will
@@ -245,8 +301,6 @@ class IOHandlerTipsyBinary(BaseIOHandler):
                           dtype="uint64")
         ind = 0
         DLE, DRE = ds.domain_left_edge, ds.domain_right_edge
-        self.domain_left_edge = DLE.in_units("code_length").ndarray_view()
-        self.domain_right_edge = DRE.in_units("code_length").ndarray_view()
         with open(data_file.filename, "rb") as f:
             f.seek(ds._header_offset)
             for iptype, ptype in enumerate(self._ptypes):
@@ -16,6 +16,7 @@ Tipsy tests using the AGORA dataset
 
 from collections import OrderedDict
 
+from yt.config import ytcfg
 from yt.testing import \
     assert_equal, \
     requires_file
@@ -120,3 +121,20 @@ def test_tipsy_galaxy():
 def test_TipsyDataset():
     assert isinstance(data_dir_load(pkdgrav), TipsyDataset)
     assert isinstance(data_dir_load(gasoline_dmonly), TipsyDataset)
+
+@requires_file(tipsy_gal)
+def test_tipsy_memmap():
+    fields = [("Gas", "Coordinates"), ("Gas", "Mass"), ("Stars", "Metals"),
+              ("DarkMatter", "Velocities")]
+    old = ytcfg.get("yt", "memmap_particle_io")
+    values = []
+    try:
+        for value in ("False", "True"):
+            ytcfg["yt", "memmap_particle_io"] = value
+            ds = data_dir_load(tipsy_gal)
+            sp = ds.sphere("c", (20.0, "kpc"))
+            values.append([sp[field] for field in fields])
+    finally:
+        ytcfg["yt", "memmap_particle_io"] = old
+    for v1, v2 in zip(*values):
+        assert_equal(v1, v2)
@@ -115,6 +115,7 @@ class YTDataset(Dataset):
         mylog.debug("Loading field plugins.")
         self.field_info.load_all_plugins()
         deps, unloaded = self.field_info.check_derived_fields()
+        self.field_info.save_detection_cache()
         self.field_dependencies.update(deps)
 
     def _setup_gas_alias(self):
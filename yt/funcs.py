@@ -32,7 +32,6 @@ import numpy as np
 import itertools
 import base64
 import numpy
-import matplotlib
 import getpass
 from distutils.version import LooseVersion
 from math import floor, ceil
@@ -579,6 +578,7 @@ def get_yt_version():
         return version[:12].strip().decode('utf-8')
 
 def get_version_stack():
+    import matplotlib
     version_info = {}
     version_info['yt'] = get_yt_version()
     version_info['numpy'] = numpy.version.version
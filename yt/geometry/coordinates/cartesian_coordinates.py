@@ -21,6 +21,9 @@ from .coordinate_handler import \
     _get_vert_fields, \
     cartesian_to_cylindrical, \
     cylindrical_to_cartesian
+from .pixelization_index import \
+    PixelizationIndex
+from yt.config import ytcfg
 from yt.funcs import mylog
 from yt.utilities.lib.pixelization_routines import \
     pixelize_element_mesh, pixelize_off_axis_cartesian, \
@@ -128,13 +131,41 @@ class CartesianCoordinateHandler(CoordinateHandler):
         period[1] = self.period[self.y_axis[dim]]
         if hasattr(period, 'in_units'):
             period = period.in_units("code_length").d
-        buff = pixelize_cartesian(data_source['px'], data_source['py'],
-                             data_source['pdx'], data_source['pdy'],
-                             data_source[field], size[0], size[1],
-                             bounds, int(antialias),
-                             period, int(periodic)).transpose()
+        arrays = [data_source[f] for f in ('px', 'py', 'pdx', 'pdy')]
+        arrays.append(data_source[field])
+        index = self._get_pixelization_index(data_source, bounds, dim)
+        if index is not None:
+            ind = index.query(bounds, period if periodic else None)
+            # Only pixelize the cells that overlap the bounds, unless that is
+            # most of them anyway.
+            if ind.size < index.size // 2:
+                arrays = [np.asarray(a)[ind] for a in arrays]
+        px, py, pdx, pdy, values = arrays
+        buff = pixelize_cartesian(px, py, pdx, pdy, values,
+                                  size[0], size[1], bounds, int(antialias),
+                                  period, int(periodic),
+                                  num_threads = ytcfg.getint(
+                                      "yt", "pixelize_threads")).transpose()
         return buff
 
+    def _get_pixelization_index(self, data_source, bounds, dim):
+        # The index is built once per data source, the first time it is
+        # pixelized with bounds that do not cover the whole domain.
+        source = tuple(data_source[f] for f in ('px', 'py', 'pdx', 'pdy'))
+        index = getattr(data_source, '_pixelization_index', None)
+        if index is not None and \
+           all(a is b for a, b in zip(index.source, source)):
+            return index
+        DLE = self.ds.domain_left_edge.in_units("code_length").d
+        DRE = self.ds.domain_right_edge.in_units("code_length").d
+        xax, yax = self.x_axis[dim], self.y_axis[dim]
+        if bounds[0] <= DLE[xax] and bounds[1] >= DRE[xax] and \
+           bounds[2] <= DLE[yax] and bounds[3] >= DRE[yax]:
+            return None
+        index = PixelizationIndex(*source)
+        data_source._pixelization_index = index
+        return index
+
     def _oblique_pixelize(self, data_source, field, bounds, size, antialias):
         indices = np.argsort(data_source['dx'])[::-1]
         buff = pixelize_off_axis_cartesian(
@@ -143,7 +174,8 @@ class CartesianCoordinateHandler(CoordinateHandler):
                               data_source['py'], data_source['pdx'],
                               data_source['pdy'], data_source['pdz'],
                               data_source.center, data_source._inv_mat, indices,
-                              data_source[field], size[0], size[1], bounds).transpose()
+                              data_source[field], size[0], size[1], bounds,
+                              ytcfg.getint("yt", "pixelize_threads")).transpose()
         return buff
 
     def convert_from_cartesian(self, coord):
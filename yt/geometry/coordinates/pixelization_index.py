@@ -0,0 +1,119 @@
+"""
+A spatial index over the pixels of 2D data containers.
+
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2013, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+
+class PixelizationIndex(object):
+    r"""
+    An index over the variable-resolution pixels of a 2D data container,
+    given by their centers px, py and half-widths pdx, pdy, that finds the
+    pixels overlapping a rectangle without looking at all of them.
+
+    The pixels are grouped by the binary exponent of their half-widths,
+    which for AMR data is one group per level.  Within a group, the pixels
+    are sorted into a regular grid of bins by their centers, with about
+    cells_per_bin pixels in each bin, so that a query only has to look at
+    the bins within the rectangle widened by the largest half-width of the
+    group.
+
+    Parameters
+    ----------
+    px, py, pdx, pdy : array_like
+        The centers and half-widths of the pixels.
+    cells_per_bin : int, optional
+        The average number of pixels per bin.
+    """
+    def __init__(self, px, py, pdx, pdy, cells_per_bin = 16):
+        # The arrays the index was built from, to tell whether it is stale.
+        self.source = (px, py, pdx, pdy)
+        px, py, pdx, pdy = (np.asarray(a) for a in self.source)
+        self.px, self.py, self.pdx, self.pdy = px, py, pdx, pdy
+        self.size = px.size
+        exponent = np.frexp(np.maximum(pdx, pdy))[1]
+        self.groups = []
+        for e in np.unique(exponent):
+            ind = np.flatnonzero(exponent == e)
+            self.groups.append(self._bin_group(
+                ind, px[ind], py[ind], pdx[ind], pdy[ind], cells_per_bin))
+
+    def _bin_group(self, ind, px, py, pdx, pdy, cells_per_bin):
+        nb = int(np.clip(np.sqrt(ind.size / float(cells_per_bin)), 1, 4096))
+        left = np.array([px.min(), py.min()])
+        width = np.array([px.max(), py.max()]) - left
+        width[width == 0] = 1.0
+        bin_width = width / nb
+        ix = np.clip(((px - left[0]) / bin_width[0]).astype("int64"),
+                     0, nb - 1)
+        iy = np.clip(((py - left[1]) / bin_width[1]).astype("int64"),
+                     0, nb - 1)
+        bins = iy * nb + ix
+        order = np.argsort(bins, kind = "mergesort")
+        offsets = np.zeros(nb * nb + 1, dtype = "int64")
+        np.cumsum(np.bincount(bins, minlength = nb * nb), out = offsets[1:])
+        if self.size < 2**31:
+            ind = ind.astype("int32")
+        return dict(ind = ind[order], offsets = offsets, nb = nb,
+                    left = left, bin_width = bin_width,
+                    hw = (pdx.max(), pdy.max()))
+
+    def _query_group(self, group, x0, x1, y0, y1):
+        nb, left, bin_width = group["nb"], group["left"], group["bin_width"]
+        hx, hy = group["hw"]
+        # A pixel can reach into the rectangle from at most hx or hy away.
+        b = []
+        for lo, hi, l, w in ((x0 - hx, x1 + hx, left[0], bin_width[0]),
+                             (y0 - hy, y1 + hy, left[1], bin_width[1])):
+            blo = int(np.floor((lo - l) / w))
+            bhi = int(np.floor((hi - l) / w))
+            if bhi < 0 or blo >= nb:
+                return None
+            b.append((max(blo, 0), min(bhi, nb - 1)))
+        (ix0, ix1), (iy0, iy1) = b
+        offsets, ind = group["offsets"], group["ind"]
+        # The bins of a row are contiguous in the sorted pixels.
+        rows = [ind[offsets[iy * nb + ix0]:offsets[iy * nb + ix1 + 1]]
+                for iy in range(iy0, iy1 + 1)]
+        return np.concatenate(rows)
+
+    def query(self, bounds, period = None):
+        r"""
+        Return the sorted indices of the pixels overlapping bounds, given
+        as (xmin, xmax, ymin, ymax).  If a period (period_x, period_y) is
+        given, the pixels overlapping the periodic images of bounds in each
+        direction with a nonzero period are included as well.
+        """
+        x0, x1, y0, y1 = bounds
+        shifts = [[0.0], [0.0]]
+        if period is not None:
+            for ax in range(2):
+                if period[ax] > 0:
+                    shifts[ax] += [period[ax], -period[ax]]
+        hits = []
+        for sx in shifts[0]:
+            for sy in shifts[1]:
+                for group in self.groups:
+                    ind = self._query_group(group, x0 + sx, x1 + sx,
+                                            y0 + sy, y1 + sy)
+                    if ind is None or ind.size == 0:
+                        continue
+                    px, py = self.px[ind], self.py[ind]
+                    pdx, pdy = self.pdx[ind], self.pdy[ind]
+                    keep = (px + pdx >= x0 + sx) & (px - pdx <= x1 + sx) & \
+                           (py + pdy >= y0 + sy) & (py - pdy <= y1 + sy)
+                    hits.append(ind[keep])
+        if len(hits) == 0:
+            return np.empty(0, dtype = "int64")
+        return np.unique(np.concatenate(hits))
@@ -29,3 +29,61 @@ def test_cartesian_coordinates():
         yield assert_equal, dd[fd], dd[fp]
     yield assert_equal, dd["cell_volume"].sum(dtype="float64"), \
                         ds.domain_width.prod()
+
+def test_pixelization_index():
+    from yt.geometry.coordinates.pixelization_index import PixelizationIndex
+    from yt.utilities.lib.pixelization_routines import pixelize_cartesian
+    ds = fake_amr_ds()
+    proj = ds.proj("Density", 2)
+    px, py, pdx, pdy = (proj[f].d for f in ("px", "py", "pdx", "pdy"))
+    index = PixelizationIndex(px, py, pdx, pdy)
+    period = np.array([1.0, 1.0])
+    for bounds in [(0.1, 0.35, 0.6, 0.7), (-0.2, 0.1, 0.9, 1.2),
+                   (0.0, 1.0, 0.0, 1.0), (2.0, 3.0, 2.0, 3.0)]:
+        x0, x1, y0, y1 = bounds
+        inside = (px + pdx >= x0) & (px - pdx <= x1) & \
+                 (py + pdy >= y0) & (py - pdy <= y1)
+        yield assert_equal, index.query(bounds), np.flatnonzero(inside)
+        # Pixelizing only the cells the index finds, including their
+        # periodic images, gives the same image.
+        ind = index.query(bounds, period)
+        ref = pixelize_cartesian(px, py, pdx, pdy, proj["Density"].d,
+                                 64, 64, bounds, 1, period, 1)
+        buff = pixelize_cartesian(px[ind], py[ind], pdx[ind], pdy[ind],
+                                  proj["Density"].d[ind],
+                                  64, 64, bounds, 1, period, 1)
+        yield assert_equal, buff, ref
+    frb = proj.to_frb(0.25, 64, center=(0.3, 0.6, 0.5))
+    bounds = [float(b.in_units("code_length")) for b in frb.bounds]
+    ref = pixelize_cartesian(px, py, pdx, pdy, proj["Density"].d, 64, 64,
+                             bounds, 1, period, 1).transpose()
+    yield assert_equal, frb["Density"].d, ref
+    assert proj._pixelization_index is not None
+
+def test_threaded_pixelization():
+    from yt.testing import fake_random_ds
+    from yt.utilities.lib.pixelization_routines import \
+        pixelize_cartesian, pixelize_off_axis_cartesian
+    ds = fake_amr_ds()
+    proj = ds.proj("Density", 2)
+    args = [proj[f].d for f in ("px", "py", "pdx", "pdy", "Density")]
+    for antialias in [0, 1]:
+        for line_width in [0.0, 0.5]:
+            ref = pixelize_cartesian(*(args + [100, 100, (0.1, 0.7, 0.2, 0.8),
+                                               antialias, (1.0, 1.0), 1,
+                                               line_width]))
+            for num_threads in [2, 3, 8]:
+                buff = pixelize_cartesian(
+                    *(args + [100, 100, (0.1, 0.7, 0.2, 0.8), antialias,
+                              (1.0, 1.0), 1, line_width, num_threads]))
+                yield assert_equal, buff, ref
+    ds = fake_random_ds(32)
+    cut = ds.cutting([0.2, 0.3, 0.5], ds.domain_center)
+    args = [cut["x"], cut["y"], cut["z"], cut["px"], cut["py"], cut["pdx"],
+            cut["pdy"], cut["pdz"], cut.center, cut._inv_mat,
+            np.argsort(cut["dx"])[::-1], cut["density"], 64, 64,
+            (-0.5, 0.5, -0.5, 0.5)]
+    ref = pixelize_off_axis_cartesian(*args)
+    for num_threads in [2, 3]:
+        buff = pixelize_off_axis_cartesian(*(args + [num_threads]))
+        yield assert_equal, buff, ref
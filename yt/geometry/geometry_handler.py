@@ -14,7 +14,12 @@ Geometry container base class.
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
+import hashlib
 import os
+import threading
+import time
+from collections import deque, OrderedDict
+from multiprocessing.pool import ThreadPool
 from yt.extern.six.moves import cPickle
 import weakref
 from yt.utilities.on_demand_imports import _h5py as h5py
@@ -35,6 +40,12 @@ class Index(ParallelAnalysisInterface):
     _global_mesh = True
     _unsupported_objects = ()
     _index_properties = ()
+    # Whether _chunk_io accepts a ChunkPrefetcher for its io chunks.
+    _prefetch_implemented = False
+    # Indexes that can be saved to and restored from an on-disk cache (see
+    # _load_index_cache) list the files they are built from here.
+    _index_cache_files = ()
+    _index_cache_restored = False
 
     def __init__(self, ds, dataset_type):
         ParallelAnalysisInterface.__init__(self)
@@ -57,6 +68,19 @@ class Index(ParallelAnalysisInterface):
         mylog.debug("Detecting fields.")
         self._detect_output_fields()
 
+    _selection_cache = None
+    @property
+    def selection_cache(self):
+        """
+        The :class:`SelectionCache` holding the selection masks and counts
+        computed for this index.  Its budget is set by the
+        ``selection_cache_mb`` configuration option.
+        """
+        if self._selection_cache is None:
+            max_bytes = ytcfg.getint("yt", "selection_cache_mb") * 1024**2
+            self._selection_cache = SelectionCache(max_bytes)
+        return self._selection_cache
+
     def _initialize_state_variables(self):
         self._parallel_locking = False
         self._data_file = None
@@ -113,6 +137,93 @@ class Index(ParallelAnalysisInterface):
         if getattr(self, "io", None) is not None: return
         self.io = io_registry[self.dataset_type](self.dataset)
 
+    @property
+    def _index_cache_filename(self):
+        sources = self._index_cache_files
+        if not ytcfg.getboolean("yt", "index_cache") or len(sources) == 0:
+            return None
+        source = os.path.abspath(sources[0])
+        cache_dir = ytcfg.get("yt", "index_cache_dir")
+        if cache_dir == "":
+            return "%s.yt_index.npz" % source
+        key = hashlib.md5(source.encode("utf-8")).hexdigest()
+        return os.path.join(os.path.expanduser(cache_dir), "%s_%s.npz" %
+                            (os.path.basename(source), key))
+
+    def _index_cache_validation_items(self):
+        # Parameters of the index, beyond the files it is built from, that
+        # must match for a cached index to be used.
+        return []
+
+    def _index_cache_validation(self):
+        import yt
+        stats = []
+        for fn in self._index_cache_files:
+            st = os.stat(fn)
+            stats.append("%s:%s:%r" % (os.path.abspath(fn), st.st_size,
+                                       st.st_mtime))
+        items = [str(v) for v in self._index_cache_validation_items()]
+        return np.array(["%s.%s" % (self.__class__.__module__,
+                                    self.__class__.__name__),
+                         yt.__version__] + items + stats)
+
+    def _load_index_cache(self):
+        """
+        Return the cached index arrays as a dict if a cache file exists and
+        matches the size and modification time of every file in
+        _index_cache_files along with the other parameters of the index,
+        otherwise return None.
+        """
+        fn = self._index_cache_filename
+        if fn is None or not os.path.exists(fn):
+            return None
+        try:
+            with np.load(fn) as f:
+                data = dict((k, f[k]) for k in f.files)
+        except (IOError, ValueError) as e:
+            mylog.warning("Could not read index cache %s: %s", fn, e)
+            return None
+        expected = self._index_cache_validation()
+        if "validation" not in data or \
+           data["validation"].shape != expected.shape or \
+           not (data["validation"] == expected).all():
+            mylog.info("Index cache %s is out of date; re-parsing.", fn)
+            return None
+        mylog.info("Loading index from cache %s", fn)
+        return data
+
+    def _get_index_cache_data(self):
+        # The dict of arrays to save in the index cache, or None if there is
+        # nothing to save.
+        return None
+
+    def _save_index_cache(self):
+        fn = self._index_cache_filename
+        if fn is None or self.comm.rank != 0:
+            return
+        data = self._get_index_cache_data()
+        if data is None:
+            return
+        data["validation"] = self._index_cache_validation()
+        dirname = os.path.dirname(fn)
+        tmp = "%s.%s.tmp.npz" % (fn[:-4], os.getpid())
+        try:
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            np.savez(tmp, **data)
+            os.rename(tmp, fn)
+        except (IOError, OSError) as e:
+            mylog.warning("Could not write index cache %s: %s", fn, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        mylog.info("Saved index cache to %s", fn)
+
+    def _restore_index_cache(self, data):
+        # Indexes that set _index_cache_files must rebuild themselves from
+        # the *data* returned by _load_index_cache here.
+        raise NotImplementedError
+
     @parallel_root_only
     def save_data(self, array, node, name, set_attr=None, force=False, passthrough = False):
         """
@@ -221,10 +332,15 @@ class Index(ParallelAnalysisInterface):
         selector = dobj.selector
         if chunk is None:
             self._identify_base_chunk(dobj)
+        t0 = time.time()
         fields_to_return = self.io._read_particle_selection(
             self._chunk_io(dobj, cache = False),
             selector,
             fields_to_read)
+        if chunk is not None and chunk.chunk_type == "io":
+            self._record_chunk_timing(
+                sum(v.nbytes for v in fields_to_return.values()),
+                time.time() - t0)
         return fields_to_return, fields_to_generate
 
     def _read_fluid_fields(self, fields, dobj, chunk = None):
@@ -238,13 +354,107 @@ class Index(ParallelAnalysisInterface):
             chunk_size = dobj.size
         else:
             chunk_size = chunk.data_size
-        fields_to_return = self.io._read_fluid_selection(
+        # Fields may already have been read in the background by a
+        # ChunkPrefetcher.
+        prefetched = getattr(chunk, "_prefetched", None) or {}
+        fields_to_return = dict((f, prefetched.pop(f))
+                                for f in fields_to_read if f in prefetched)
+        fields_to_read = [f for f in fields_to_read
+                          if f not in fields_to_return]
+        if len(fields_to_read) == 0:
+            return fields_to_return, fields_to_generate
+        t0 = time.time()
+        data = self.io._read_fluid_selection_concurrent(
             self._chunk_io(dobj),
             selector,
             fields_to_read,
             chunk_size)
+        if chunk is not None and chunk.chunk_type == "io":
+            self._record_chunk_timing(
+                sum(v.nbytes for v in data.values()), time.time() - t0)
+        fields_to_return.update(data)
         return fields_to_return, fields_to_generate
 
+    _chunk_timings = None
+    def _record_chunk_timing(self, nbytes, seconds):
+        # Keep the most recent io chunk reads of this dataset; they set the
+        # size of adaptively sized chunks.
+        if self._chunk_timings is None:
+            self._chunk_timings = deque(maxlen = 32)
+        self._chunk_timings.append((nbytes, seconds))
+
+    def _adaptive_chunk_bytes(self):
+        """
+        Return the number of bytes an adaptively sized io chunk should hold.
+        This is the ``chunk_target_mb`` budget, lowered so that a chunk can
+        be read in about ``chunk_target_seconds`` at the rate measured for
+        the earlier io chunks of this dataset.
+        """
+        budget = ytcfg.getfloat("yt", "chunk_target_mb") * 1024**2
+        latency = ytcfg.getfloat("yt", "chunk_target_seconds")
+        if self._chunk_timings and latency > 0:
+            nbytes = sum(b for b, t in self._chunk_timings)
+            seconds = sum(t for b, t in self._chunk_timings)
+            if nbytes > 0 and seconds > 0:
+                budget = min(budget, latency * nbytes / seconds)
+        return max(budget, 1)
+
+    def _estimate_io_cells(self, obj):
+        # The number of values per field that reading *obj* will produce, or
+        # None if unknown, in which case obj gets an io chunk of its own.
+        return None
+
+    def _adaptive_chunk_groups(self, objs, nfields = 1, itemsize = 8):
+        """
+        Split *objs* into consecutive groups whose estimated size (cells
+        times *nfields* times *itemsize*) stays within the adaptive chunk
+        budget.  Every group holds at least one object.
+        """
+        budget = self._adaptive_chunk_bytes()
+        group, group_bytes = [], 0
+        for obj in objs:
+            cells = self._estimate_io_cells(obj)
+            if cells is None:
+                if group:
+                    yield group
+                    group, group_bytes = [], 0
+                yield [obj]
+                continue
+            nbytes = cells * max(nfields, 1) * itemsize
+            if group and group_bytes + nbytes > budget:
+                yield group
+                group, group_bytes = [], 0
+            group.append(obj)
+            group_bytes += nbytes
+        if group:
+            yield group
+
+    def _chunk_prefetcher(self, dobj, fields, max_in_flight = None):
+        """
+        Return a :class:`ChunkPrefetcher` that reads the on-disk fluid
+        fields needed to compute *fields* for the next *max_in_flight* io
+        chunks of *dobj* on background threads, or None if prefetching is
+        disabled or not supported by this index and its IO handler.
+        """
+        if max_in_flight is None:
+            max_in_flight = ytcfg.getint("yt", "prefetch_chunks")
+        if max_in_flight <= 0 or not self._prefetch_implemented or \
+           not self.io._thread_safe_fluid_reads:
+            return None
+        fields = dobj._identify_dependencies(dobj._determine_fields(fields))
+        fields_to_read = []
+        for ftype, fname in fields:
+            if fname not in self.field_list and \
+               (ftype, fname) not in self.field_list:
+                continue
+            if self.ds._get_field_info(ftype, fname).particle_type:
+                continue
+            fields_to_read.append((ftype, fname))
+        if len(fields_to_read) == 0:
+            return None
+        return ChunkPrefetcher(self.io, dobj.selector, fields_to_read,
+                               max_in_flight)
+
     def _chunk(self, dobj, chunking_style, ngz = 0, **kwargs):
         # A chunk is either None or (grids, size)
         if dobj._current_chunk is None:
@@ -292,7 +502,7 @@ class YTDataChunk(object):
         # costly getattr functions, but this allows us to generalize.
         mname = "select_%s" % method
         arrs = []
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             f = getattr(obj, mname)
             arrs.append(f(self.dobj))
         if method == "dtcoords":
@@ -316,7 +526,7 @@ class YTDataChunk(object):
                      registry = self.dobj.ds.unit_registry)
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_fcoords(self.dobj)
             if c.shape[0] == 0: continue
             ci[ind:ind+c.shape[0], :] = c
@@ -332,7 +542,7 @@ class YTDataChunk(object):
         ci = np.empty((self.data_size, 3), dtype='int64')
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_icoords(self.dobj)
             if c.shape[0] == 0: continue
             ci[ind:ind+c.shape[0], :] = c
@@ -352,7 +562,7 @@ class YTDataChunk(object):
                      registry = self.dobj.ds.unit_registry)
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_fwidth(self.dobj)
             if c.shape[0] == 0: continue
             ci[ind:ind+c.shape[0], :] = c
@@ -368,7 +578,7 @@ class YTDataChunk(object):
         ci = np.empty(self.data_size, dtype='int64')
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_ires(self.dobj)
             if c.shape == 0: continue
             ci[ind:ind+c.size] = c
@@ -387,7 +597,7 @@ class YTDataChunk(object):
         self._tcoords = ct # Se this for tcoords
         if self.data_size == 0: return cdt
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             gdt, gt = obj.select_tcoords(self.dobj)
             if gt.size == 0: continue
             ct[ind:ind+gt.size] = gt
@@ -410,6 +620,148 @@ class YTDataChunk(object):
         return ci
 
 
+class ChunkPrefetcher(object):
+    """
+    Reads the fluid *fields* of io chunks on background threads, at most
+    *max_in_flight* chunks ahead of the one being processed, which bounds
+    the memory used.  Calling it with an iterator over io chunks returns a
+    generator over the same chunks, each handed out once its data has been
+    attached to it as ``_prefetched``; the data is picked up by
+    :meth:`Index._read_fluid_fields`.
+
+    The chunks must not depend on any IO handler state set up around them
+    (such as :meth:`BaseIOHandler.preload`), since they are read before the
+    previous chunks have been processed.
+    """
+    def __init__(self, io, selector, fields, max_in_flight = 1):
+        self.io = io
+        self.selector = selector
+        self.fields = fields
+        self.max_in_flight = max_in_flight
+
+    def _read(self, chunk):
+        return self.io._read_fluid_selection(
+            [chunk], self.selector, list(self.fields), chunk.data_size)
+
+    def __call__(self, chunks):
+        chunks = iter(chunks)
+        queue = deque()
+        pool = ThreadPool(self.max_in_flight)
+        try:
+            while True:
+                # Start reading the next chunks before handing this one back.
+                while len(queue) <= self.max_in_flight:
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        break
+                    result = None
+                    if chunk.data_size > 0:
+                        result = pool.apply_async(self._read, (chunk,))
+                    queue.append((chunk, result))
+                if len(queue) == 0:
+                    break
+                chunk, result = queue.popleft()
+                if result is not None:
+                    chunk._prefetched = result.get()
+                yield chunk
+        finally:
+            # Let the reads in flight finish, so that the files they hold
+            # are released, before shutting the threads down.
+            for chunk, result in queue:
+                if result is not None:
+                    result.wait()
+            pool.close()
+            pool.join()
+
+class SelectionCache(object):
+    """
+    A least recently used cache of the selection results (masks, counts and
+    coordinates) computed for individual grids or octree subsets, bounded by
+    *max_bytes*.  A *max_bytes* of zero (or less) turns the cache off.
+
+    Entries are keyed by the selector's class and the parameters its hash
+    is computed from, so equivalent selectors from different data
+    containers share entries.
+    """
+    # Every entry is charged this many bytes on top of the arrays it holds,
+    # so that empty selections also count against the budget.
+    _entry_overhead = 128
+    # These selectors do not hash all of the state they select with.
+    _uncacheable = ("CutRegionSelector", "HaloParticlesSelector")
+
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        # The key of the last selector seen, as the same selector is usually
+        # looked up for many objects in a row.
+        self._last_selector = (None, None)
+
+    def key(self, selector, obj_key):
+        """
+        Return the cache key for the selection of *selector* on the object
+        identified by *obj_key*, or None if the result should not be cached.
+        """
+        if self.max_bytes <= 0:
+            return None
+        name = selector.__class__.__name__
+        if name in self._uncacheable:
+            return None
+        last, selector_key = self._last_selector
+        if last is not selector:
+            selector_key = selector._hash_key()
+            self._last_selector = (selector, selector_key)
+        return (selector_key, obj_key)
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, nbytes=0):
+        if key is None:
+            return
+        nbytes += self._entry_overhead
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Return a dict of the hit, miss and eviction counters along with the
+        number of bytes currently held and the budget.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes}
+
 class ChunkDataCache(object):
     def __init__(self, base_iter, preload_fields, geometry_handler,
                  max_length = 256):
@@ -31,11 +31,16 @@ cdef class GridTree:
     cdef int num_grids
     cdef int num_root_grids
     cdef int num_leaf_grids
+    cdef int ref_factor
     cdef public bitarray mask
     cdef void setup_data(self, GridVisitorData *data)
     cdef void visit_grids(self, GridVisitorData *data,
                           grid_visitor_function *func,
                           SelectorObject selector)
+    cdef void visit_grid_list(self, GridVisitorData *data,
+                              grid_visitor_function *func,
+                              SelectorObject selector,
+                              np.int64_t[:] grid_ids)
     cdef void recursively_visit_grid(self,
                           GridVisitorData *data,
                           grid_visitor_function *func,
@@ -43,6 +48,10 @@ cdef class GridTree:
                           GridTreeNode *grid,
                           np.uint8_t *buf = ?)
 
+cdef class GridTreeSubset:
+    cdef GridTree tree
+    cdef np.int64_t[:] grid_ids
+
 cdef class MatchPointsToGrids:
 
     cdef int num_points
@@ -25,7 +25,8 @@ from yt.utilities.lib.bitarray cimport bitarray
 cdef GridTreeNode Grid_initialize(np.ndarray[np.float64_t, ndim=1] le,
                                   np.ndarray[np.float64_t, ndim=1] re,
                                   np.ndarray[np.int32_t, ndim=1] dims,
-                                  int num_children, int level, int index):
+                                  int num_children, int level, int index,
+                                  np.ndarray[np.int64_t, ndim=1] si = None):
 
     cdef GridTreeNode node
     cdef int i
@@ -37,7 +38,10 @@ cdef GridTreeNode Grid_initialize(np.ndarray[np.float64_t, ndim=1] le,
         node.right_edge[i] = re[i]
         node.dims[i] = dims[i]
         node.dds[i] = (re[i] - le[i])/dims[i]
-        node.start_index[i] = <np.int64_t> rint(le[i] / node.dds[i])
+        if si is None:
+            node.start_index[i] = <np.int64_t> rint(le[i] / node.dds[i])
+        else:
+            node.start_index[i] = si[i]
     node.num_children = num_children
     if num_children <= 0:
         node.children = NULL
@@ -60,26 +64,33 @@ cdef class GridTree:
                   np.ndarray[np.int32_t, ndim=2] dimensions,
                   np.ndarray[np.int64_t, ndim=1] parent_ind,
                   np.ndarray[np.int64_t, ndim=1] level,
-                  np.ndarray[np.int64_t, ndim=1] num_children):
+                  np.ndarray[np.int64_t, ndim=1] num_children,
+                  np.ndarray[np.int64_t, ndim=2] start_index = None,
+                  int ref_factor = 2):
 
         cdef int i, j, k
         cdef np.ndarray[np.int64_t, ndim=1] child_ptr
+        cdef np.ndarray[np.int64_t, ndim=1] si
 
         child_ptr = np.zeros(num_grids, dtype='int64')
 
         self.num_grids = num_grids
         self.num_root_grids = 0
         self.num_leaf_grids = 0
+        self.ref_factor = ref_factor
         
         self.grids = <GridTreeNode *> malloc(
                 sizeof(GridTreeNode) * num_grids)
                 
         for i in range(num_grids):
+            si = None
+            if start_index is not None:
+                si = start_index[i,:]
             self.grids[i] = Grid_initialize(left_edge[i,:],
                                             right_edge[i,:],
                                             dimensions[i,:],
                                             num_children[i],
-                                            level[i], i)
+                                            level[i], i, si)
             if level[i] == 0:
                 self.num_root_grids += 1
             if num_children[i] == 0:
@@ -102,6 +113,13 @@ cdef class GridTree:
     def __init__(self, *args, **kwargs):
         self.mask = None
 
+    def subset(self, grid_ids):
+        """
+        Return a view of this tree restricted to the grids *grid_ids*, which
+        are visited in the order given.
+        """
+        return GridTreeSubset(self, grid_ids)
+
     def __iter__(self):
         yield self
     
@@ -156,7 +174,7 @@ cdef class GridTree:
         data.n_tuples = 0
         data.child_tuples = NULL
         data.array = NULL
-        data.ref_factor = 2 #### FIX THIS
+        data.ref_factor = self.ref_factor
 
     cdef void visit_grids(self, GridVisitorData *data,
                           grid_visitor_function *func,
@@ -193,6 +211,24 @@ cdef class GridTree:
             self.recursively_visit_grid(data, func, selector, grid.children[i],
                                         buf)
 
+    cdef void visit_grid_list(self, GridVisitorData *data,
+                              grid_visitor_function *func,
+                              SelectorObject selector,
+                              np.int64_t[:] grid_ids):
+        # Visit only the grids in grid_ids, in that order, without recursing
+        # into their children.  Child cells are still masked out.  No cached
+        # mask is used, so this does not depend on a previous call to count.
+        cdef int i
+        cdef GridTreeNode *grid
+        for i in range(grid_ids.shape[0]):
+            grid = &self.grids[grid_ids[i]]
+            data.grid = grid
+            if selector.select_bbox(grid.left_edge, grid.right_edge) == 0:
+                continue
+            grid_visitors.setup_tuples(data)
+            selector.visit_grid_cells(data, func, NULL)
+        grid_visitors.free_tuples(data)
+
     def count(self, SelectorObject selector):
         # Use the counting grid visitor
         cdef GridVisitorData data
@@ -269,6 +305,84 @@ cdef class GridTree:
         self.visit_grids(&data, grid_visitors.fwidth_cells, selector)
         return fwidth
     
+cdef class GridTreeSubset:
+    """
+    A set of grids in a GridTree, visited in a fixed order.  This offers the
+    same count and select_* methods as the tree itself (and so can be used as
+    the fast index of a data chunk), but the values come out in the order of
+    the grids in the chunk, matching the order their fields are read in.
+    """
+
+    def __init__(self, GridTree tree, grid_ids):
+        self.tree = tree
+        self.grid_ids = np.asarray(grid_ids, dtype="int64")
+        if self.grid_ids.shape[0] > 0 and \
+           (np.min(grid_ids) < 0 or np.max(grid_ids) >= tree.num_grids):
+            raise IndexError("Grid ids out of range for this tree.")
+
+    def __iter__(self):
+        yield self
+
+    def __len__(self):
+        return self.grid_ids.shape[0]
+
+    def count(self, SelectorObject selector):
+        cdef GridVisitorData data
+        cdef np.uint64_t size = 0
+        self.tree.setup_data(&data)
+        data.array = <void*>(&size)
+        self.tree.visit_grid_list(&data, grid_visitors.count_cells, selector,
+                                  self.grid_ids)
+        return size
+
+    def select_icoords(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        if size == -1:
+            size = self.count(selector)
+        cdef np.ndarray[np.int64_t, ndim=2] icoords
+        icoords = np.empty((size, 3), dtype="int64")
+        self.tree.setup_data(&data)
+        data.array = icoords.data
+        self.tree.visit_grid_list(&data, grid_visitors.icoords_cells,
+                                  selector, self.grid_ids)
+        return icoords
+
+    def select_ires(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        if size == -1:
+            size = self.count(selector)
+        cdef np.ndarray[np.int64_t, ndim=1] ires
+        ires = np.empty(size, dtype="int64")
+        self.tree.setup_data(&data)
+        data.array = ires.data
+        self.tree.visit_grid_list(&data, grid_visitors.ires_cells,
+                                  selector, self.grid_ids)
+        return ires
+
+    def select_fcoords(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        if size == -1:
+            size = self.count(selector)
+        cdef np.ndarray[np.float64_t, ndim=2] fcoords
+        fcoords = np.empty((size, 3), dtype="float64")
+        self.tree.setup_data(&data)
+        data.array = fcoords.data
+        self.tree.visit_grid_list(&data, grid_visitors.fcoords_cells,
+                                  selector, self.grid_ids)
+        return fcoords
+
+    def select_fwidth(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        if size == -1:
+            size = self.count(selector)
+        cdef np.ndarray[np.float64_t, ndim=2] fwidth
+        fwidth = np.empty((size, 3), dtype="float64")
+        self.tree.setup_data(&data)
+        data.array = fwidth.data
+        self.tree.visit_grid_list(&data, grid_visitors.fwidth_cells,
+                                  selector, self.grid_ids)
+        return fwidth
+
 cdef class MatchPointsToGrids:
 
     @cython.boundscheck(False)
@@ -32,13 +32,20 @@ from .grid_container import \
     GridTree, MatchPointsToGrids
 
 
+# These selectors implement their own fill_mask, which the GridTree visitors
+# do not reproduce, so they always use the per-grid path.
+_fast_index_excluded = ("SliceSelector", "OrthoRaySelector", "RaySelector",
+                        "DataCollectionSelector", "GridSelector")
+
 class GridIndex(Index):
     """The index class for patch and block AMR datasets. """
     float_type = 'float64'
     _preload_implemented = False
+    _prefetch_implemented = True
     _index_properties = ("grid_left_edge", "grid_right_edge",
                          "grid_levels", "grid_particle_count",
                          "grid_dimensions")
+    _grid_tree = None
 
     def _setup_geometry(self):
         mylog.debug("Counting grids.")
@@ -47,15 +54,51 @@ class GridIndex(Index):
         mylog.debug("Initializing grid arrays.")
         self._initialize_grid_arrays()
 
-        mylog.debug("Parsing index.")
-        self._parse_index()
+        cache = self._load_index_cache()
+        if cache is not None:
+            mylog.debug("Restoring index from cache.")
+            for attr in self._index_properties:
+                getattr(self, attr)[:] = cache[attr]
+            self._restore_index_cache(cache)
+            self._index_cache_restored = True
+        else:
+            mylog.debug("Parsing index.")
+            self._parse_index()
 
         mylog.debug("Constructing grid objects.")
         self._populate_grid_objects()
 
+        if cache is None:
+            self._save_index_cache()
+
         mylog.debug("Re-examining index")
         self._initialize_level_stats()
 
+    def _index_cache_validation_items(self):
+        return [self.num_grids]
+
+    def _get_index_cache_data(self):
+        data = {}
+        for attr in self._index_properties:
+            data[attr] = np.asarray(getattr(self, attr))
+        data["filenames"] = np.array([g.filename or "" for g in self.grids])
+        # Children are stored in compressed sparse row form.
+        children = [[c.id for c in g.Children] for g in self.grids]
+        data["children_ptr"] = np.cumsum(
+            [0] + [len(c) for c in children]).astype("int64")
+        data["children_ids"] = np.array(
+            [cid for c in children for cid in c], dtype="int64")
+        data.update(self._get_index_cache_extras())
+        return data
+
+    def _get_index_cache_extras(self):
+        # Frontend-specific arrays to store alongside the index.
+        return {}
+
+    def _cached_children(self, data):
+        ptr, ids = data["children_ptr"], data["children_ids"]
+        return [ids[ptr[i]:ptr[i+1]] for i in range(self.num_grids)]
+
     def __del__(self):
         del self.grid_dimensions
         del self.grid_left_edge
@@ -252,6 +295,12 @@ class GridIndex(Index):
         return self.grids[ind], ind
 
     def _get_grid_tree(self):
+        # The tree only depends on the grid hierarchy, so it is built once.
+        if self._grid_tree is None:
+            self._grid_tree = self._build_grid_tree()
+        return self._grid_tree
+
+    def _build_grid_tree(self):
 
         left_edge = self.ds.arr(np.zeros((self.num_grids, 3)),
                                'code_length')
@@ -261,6 +310,7 @@ class GridIndex(Index):
         parent_ind = np.zeros((self.num_grids), dtype='int64')
         num_children = np.zeros((self.num_grids), dtype='int64')
         dimensions = np.zeros((self.num_grids, 3), dtype="int32")
+        start_index = np.zeros((self.num_grids, 3), dtype="int64")
 
         for i, grid in enumerate(self.grids) :
 
@@ -273,9 +323,26 @@ class GridIndex(Index):
                 parent_ind[i] = grid.Parent.id - grid.Parent._id_offset
             num_children[i] = np.int64(len(grid.Children))
             dimensions[i,:] = grid.ActiveDimensions
+            start_index[i,:] = grid.get_global_startindex()
 
         return GridTree(self.num_grids, left_edge, right_edge, dimensions,
-                        parent_ind, level, num_children)
+                        parent_ind, level, num_children, start_index,
+                        int(self.ds.refine_by))
+
+    @property
+    def _use_fast_index(self):
+        return ytcfg.getboolean("yt", "fast_index")
+
+    def _get_fast_index(self, grids):
+        """
+        Return a view of the cached GridTree restricted to *grids*, which can
+        count and generate coordinates for a selector without calling into
+        each grid, or None if the fast index is turned off.
+        """
+        if not self._use_fast_index:
+            return None
+        tree = self._get_grid_tree()
+        return tree.subset([g.id - g._id_offset for g in grids])
 
     def convert(self, unit):
         return self.dataset.conversion_factors[unit]
@@ -297,9 +364,9 @@ class GridIndex(Index):
             dobj._chunk_info = np.empty(len(grids), dtype='object')
             for i, g in enumerate(grids):
                 dobj._chunk_info[i] = g
-        # These next two lines, when uncommented, turn "on" the fast index.
-        #if dobj._type_name != "grid":
-        #    fast_index = self._get_grid_tree()
+        if dobj._type_name != "grid" and \
+           dobj.selector.__class__.__name__ not in _fast_index_excluded:
+            fast_index = self._get_fast_index(dobj._chunk_info)
         if getattr(dobj, "size", None) is None:
             dobj.size = self._count_selection(dobj, fast_index = fast_index)
         if getattr(dobj, "shape", None) is None:
@@ -345,8 +412,12 @@ class GridIndex(Index):
             yield YTDataChunk(dobj, "spatial", [g], size, cache = False)
 
     _grid_chunksize = 1000
+    def _estimate_io_cells(self, grid):
+        return grid.ActiveDimensions.prod()
+
     def _chunk_io(self, dobj, cache=True, local_only=False,
-                  preload_fields=None, chunk_sizing="auto"):
+                  preload_fields=None, chunk_sizing="auto", nfields=1,
+                  prefetcher=None):
         # local_only is only useful for inline datasets and requires
         # implementation by subclasses.
         if preload_fields is None:
@@ -354,7 +425,7 @@ class GridIndex(Index):
         preload_fields, _ = self._split_fields(preload_fields)
         gfiles = defaultdict(list)
         gobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
-        fast_index = dobj._current_chunk._fast_index
+        use_fast_index = dobj._current_chunk._fast_index is not None
         for g in gobjs:
             gfiles[g.filename].append(g)
         # We can apply a heuristic here to make sure we aren't loading too
@@ -373,16 +444,37 @@ class GridIndex(Index):
             size = 1
         elif chunk_sizing == "old":
             size = self._grid_chunksize
+        elif chunk_sizing == "adaptive":
+            size = None
         else:
             raise RuntimeError("%s is an invalid value for the 'chunk_sizing' argument." % chunk_sizing)
-        for fn in sorted(gfiles):
-            gs = gfiles[fn]
-            for grids in (gs[pos:pos + size] for pos
-                          in range(0, len(gs), size)):
-                dc = YTDataChunk(dobj, "io", grids,
-                        self._count_selection(dobj, grids),
-                        cache = cache, fast_index = fast_index)
-                # We allow four full chunks to be included.
-                with self.io.preload(dc, preload_fields, 
-                            4.0 * size):
-                    yield dc
+
+        def _io_chunks():
+            for fn in sorted(gfiles):
+                gs = gfiles[fn]
+                if size is None:
+                    # Chunks hold a number of bytes rather than of grids.
+                    groups = self._adaptive_chunk_groups(gs, nfields)
+                else:
+                    groups = (gs[pos:pos + size] for pos
+                              in range(0, len(gs), size))
+                for grids in groups:
+                    fast_index = None
+                    if use_fast_index:
+                        fast_index = self._get_fast_index(grids)
+                    yield YTDataChunk(dobj, "io", grids,
+                            self._count_selection(dobj, grids, fast_index),
+                            cache = cache, fast_index = fast_index)
+
+        if prefetcher is not None:
+            # The chunks are read ahead of time, so they cannot be preloaded:
+            # the preload context of a chunk would already be gone (or be
+            # replaced by the next one) while it is being processed.
+            for dc in prefetcher(_io_chunks()):
+                yield dc
+            return
+        for dc in _io_chunks():
+            # We allow four full chunks to be included.
+            with self.io.preload(dc, preload_fields,
+                        4.0 * (size or len(dc.objs))):
+                yield dc
@@ -18,7 +18,9 @@ import collections
 import numpy as np
 import os
 import weakref
+from multiprocessing.pool import ThreadPool
 
+from yt.config import ytcfg
 from yt.funcs import only_on_root
 from yt.utilities.logger import ytLogger as mylog
 from yt.data_objects.octree_subset import ParticleOctreeSubset
@@ -96,7 +98,15 @@ class ParticleIndex(Index):
         self.regions = ParticleRegions(
                 ds.domain_left_edge, ds.domain_right_edge,
                 [N, N, N], len(self.data_files))
-        self._initialize_indices()
+        cache = self._load_index_cache()
+        if cache is not None:
+            self._restore_index_cache(cache)
+            self._index_cache_restored = True
+        else:
+            self._initialize_indices()
+            self._save_index_cache()
+            # The Morton keys are only kept to be saved in the cache.
+            self._morton = None
         self.oct_handler.finalize()
         self.max_level = self.oct_handler.max_level
         self.dataset.max_level = self.max_level
@@ -113,25 +123,90 @@ class ParticleIndex(Index):
         #   * Pass particles to specific processors, along with NREF buffer
         #   * Broadcast back a serialized octree to join
         #
-        # For now we will do this in serial.
+        # For now we will do this in serial, or with a local thread pool
+        # when the io handler supports it.
         index_ptype = self.index_ptype
         # Set the index_ptype attribute of self.io dynamically here, so we don't
         # need to assume that the dataset has the attribute.
         self.io.index_ptype = index_ptype
         morton = np.empty(self.total_particles, dtype="uint64")
-        ind = 0
+        offsets = [0]
         for data_file in self.data_files:
             if index_ptype == "all":
                 npart = sum(data_file.total_particles.values())
             else:
                 npart = data_file.total_particles[index_ptype]
-            morton[ind:ind + npart] = \
-                self.io._initialize_index(data_file, self.regions)
-            ind += npart
-        morton.sort()
+            offsets.append(offsets[-1] + npart)
+        nthreads = min(ytcfg.getint("yt", "index_threads"),
+                       len(self.data_files))
+        if nthreads > 1 and self.io._thread_safe_index:
+            only_on_root(mylog.info, "Generating Morton indices with %s "
+                         "threads", nthreads)
+            def _index_file(i):
+                # Each run is sorted in its worker, and the runs are then
+                # merged below.  The region masks are shared, but
+                # ParticleRegions.add_data_file holds the GIL while it
+                # updates them.
+                run = morton[offsets[i]:offsets[i+1]]
+                run[:] = self.io._initialize_index(
+                    self.data_files[i], self.regions)
+                run.sort()
+            def _merge_runs(bounds):
+                # The stable sort is a run-aware merge sort, so on two
+                # adjacent presorted runs it is a linear merge, and numpy
+                # releases the GIL while it runs.
+                morton[bounds[0]:bounds[1]].sort(kind="mergesort")
+            pool = ThreadPool(nthreads)
+            try:
+                pool.map(_index_file, range(len(self.data_files)))
+                # Merge adjacent pairs of runs on the pool until one is left.
+                # The last rounds have fewer pairs than threads, and the
+                # final merge of two halves is done by a single thread.
+                runs = offsets
+                while len(runs) > 2:
+                    pairs = [(runs[i], runs[i + 2])
+                             for i in range(0, len(runs) - 2, 2)]
+                    pool.map(_merge_runs, pairs)
+                    runs = runs[::2] + ([runs[-1]] if len(runs) % 2 == 0
+                                        else [])
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for i, data_file in enumerate(self.data_files):
+                morton[offsets[i]:offsets[i+1]] = \
+                    self.io._initialize_index(data_file, self.regions)
+            morton.sort()
+        self._morton = morton
         # Now we add them all at once.
         self.oct_handler.add(morton)
 
+    @property
+    def _index_cache_files(self):
+        # The cache is only used when every data file is a file on disk whose
+        # size and modification time can be checked.
+        filenames = [df.filename for df in self.data_files]
+        if not all(os.path.isfile(fn) for fn in filenames):
+            return ()
+        return filenames
+
+    def _index_cache_validation_items(self):
+        ds = self.dataset
+        return [self.index_ptype, self.total_particles, ds.n_ref,
+                ds.over_refine_factor, getattr(ds, "filter_bbox", False),
+                np.asarray(ds.domain_left_edge).tolist(),
+                np.asarray(ds.domain_right_edge).tolist(),
+                len(self.regions.masks)]
+
+    def _get_index_cache_data(self):
+        return {"morton": self._morton,
+                "masks": np.array(self.regions.masks)}
+
+    def _restore_index_cache(self, data):
+        self.io.index_ptype = self.index_ptype
+        self.regions.masks = [m.copy() for m in data["masks"]]
+        self.oct_handler.add(data["morton"])
+
     def _detect_output_fields(self):
         # TODO: Add additional fields
         dsl = []
@@ -181,8 +256,24 @@ class ParticleIndex(Index):
                 g = og
             yield YTDataChunk(dobj, "spatial", [g])
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _estimate_io_cells(self, subset):
+        index_ptype = self.index_ptype
+        count = 0
+        for data_file in subset.data_files:
+            if index_ptype == "all":
+                count += sum(data_file.total_particles.values())
+            else:
+                count += data_file.total_particles[index_ptype]
+        return count
+
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
         oobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
+        if chunk_sizing == "adaptive":
+            # Subsets are combined into chunks by the particles they hold.
+            for subsets in self._adaptive_chunk_groups(oobjs, nfields):
+                yield YTDataChunk(dobj, "io", subsets, None, cache = cache)
+            return
         for subset in oobjs:
             yield YTDataChunk(dobj, "io", [subset], None, cache = cache)
 
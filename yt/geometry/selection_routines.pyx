@@ -634,6 +634,12 @@ cdef class SelectorObject:
     def _hash_vals(self):
         raise NotImplementedError
 
+    def _hash_key(self):
+        # The values the hash is computed from.  Unlike the hash itself these
+        # cannot collide, so they identify the selection exactly.
+        return (self.__class__.__name__,) + tuple(self._hash_vals()) + \
+            self._base_hash()
+
     def _base_hash(self):
         return (("min_level", self.min_level),
                 ("max_level", self.max_level),
@@ -1653,7 +1659,7 @@ cdef class DataCollectionSelector(SelectorObject):
         return mask.astype("bool")
 
     def _hash_vals(self):
-        return (hash(self.obj_ids.tostring()), self.nids)
+        return (("obj_ids", self.obj_ids.tostring()), ("nids", self.nids))
 
 data_collection_selector = DataCollectionSelector
 
@@ -1858,7 +1864,8 @@ cdef class OctreeSubsetSelector(SelectorObject):
         return res
 
     def _hash_vals(self):
-        return (hash(self.base_selector), self.domain_id)
+        return (("base_selector", self.base_selector._hash_key()),
+                ("domain_id", self.domain_id))
 
 octree_subset_selector = OctreeSubsetSelector
 
@@ -1932,7 +1939,8 @@ cdef class IndexedOctreeSubsetSelector(SelectorObject):
         return self.base_selector.select_grid(left_edge, right_edge, level, o)
 
     def _hash_vals(self):
-        return (hash(self.base_selector), self.min_ind, self.max_ind)
+        return (("base_selector", self.base_selector._hash_key()),
+                ("min_ind", self.min_ind), ("max_ind", self.max_ind))
 
 indexed_octree_subset_selector = IndexedOctreeSubsetSelector
 
@@ -2033,7 +2041,8 @@ cdef class ComposeSelector(SelectorObject):
             return 0
 
     def _hash_vals(self):
-        return (hash(self.selector1), hash(self.selector2))
+        return (("selector1", self.selector1._hash_key()),
+                ("selector2", self.selector2._hash_key()))
 
 compose_selector = ComposeSelector
 
@@ -15,6 +15,7 @@ Tests for GridTree
 import numpy as np
 import random
 
+from yt.config import ytcfg
 from yt.testing import \
     assert_equal, assert_raises
 from yt.frontends.stream.api import \
@@ -125,3 +126,32 @@ def test_grid_arrays_view():
     yield assert_equal, grid_arr['right_edge'], ds.index.grid_right_edge
     yield assert_equal, grid_arr['dims'], ds.index.grid_dimensions
     yield assert_equal, grid_arr['level'], ds.index.grid_levels[:,0]
+
+def test_fast_index():
+    ds = setup_test_ds()
+    tree = ds.index._get_grid_tree()
+    assert ds.index._get_grid_tree() is tree
+    def _objects():
+        return (ds.sphere([0.4, 0.45, 0.5], 0.15),
+                ds.region([0.5]*3, [0.3, 0.35, 0.4], [0.7, 0.6, 0.55]),
+                ds.all_data())
+    fields = ["x", "y", "z", "dx", "grid_level", "density"]
+    old = ytcfg.get("yt", "fast_index")
+    try:
+        ytcfg["yt", "fast_index"] = "False"
+        slow = _objects()
+        for dobj in slow:
+            dobj.get_data(fields)
+        ytcfg["yt", "fast_index"] = "True"
+        fast = _objects()
+        for dobj in fast:
+            dobj.get_data(fields)
+    finally:
+        ytcfg["yt", "fast_index"] = old
+    for dobj1, dobj2 in zip(slow, fast):
+        assert dobj1._current_chunk._fast_index is None
+        assert dobj2._current_chunk._fast_index is not None
+        yield assert_equal, dobj1.size, dobj2.size
+        yield assert_equal, dobj1.icoords, dobj2.icoords
+        for field in fields:
+            yield assert_equal, dobj1[field], dobj2[field]
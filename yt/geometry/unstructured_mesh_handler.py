@@ -87,7 +87,11 @@ class UnstructuredIndex(Index):
             if size == 0: continue
             yield YTDataChunk(dobj, "spatial", [g], size)
 
-    def _chunk_io(self, dobj, cache = True, local_only = False):
+    def _chunk_io(self, dobj, cache = True, local_only = False,
+                  chunk_sizing = None, nfields = 1):
+        if chunk_sizing is not None:
+            mylog.debug("Ignoring chunk_sizing = %s for unstructured meshes; "
+                        "using one io chunk per mesh", chunk_sizing)
         oobjs = getattr(dobj._current_chunk, "objs", dobj._chunk_info)
         for subset in oobjs:
             s = self._count_selection(dobj, oobjs)
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import yt
+from yt.testing import assert_equal
+
+
+def test_lazy_imports():
+    # Heavy subsystems are only imported once one of their names is used.
+    code = ("import sys, yt; "
+            "print(' '.join(m for m in ('matplotlib', 'yt.testing', "
+            "'yt.visualization.api', 'yt.analysis_modules.list_modules') "
+            "if m in sys.modules))")
+    output = subprocess.check_output([sys.executable, "-c", code])
+    assert_equal(output.decode("utf-8").strip(), "")
+
+
+def test_lazy_names():
+    from yt.visualization.api import SlicePlot
+    from yt.visualization.volume_rendering import api as vr_api
+    assert yt.SlicePlot is SlicePlot
+    assert yt.volume_rendering is vr_api
+    assert yt.create_scene is vr_api.create_scene
+    assert "ProjectionPlot" in dir(yt)
+    assert "ProjectionPlot" in yt.__all__
@@ -21,6 +21,7 @@ from numpy.testing import \
     assert_raises, assert_equal
 from nose.tools import assert_true
 import operator
+from fractions import Fraction
 from sympy import Symbol
 from yt.testing import \
     fake_random_ds, assert_allclose_units, \
@@ -504,6 +505,51 @@ def test_latitude_longitude():
     yield assert_equal, (lon*0.0).in_units("deg"), deg*180.0
     yield assert_equal, (lon*180.0).in_units("deg"), deg*360
 
+def test_dimension_vector():
+    u1 = Unit("erg")
+    u2 = Unit("g*cm**2/s**2")
+    u3 = Unit("statC")
+    yield assert_equal, u1.dimension_vector, u2.dimension_vector
+    yield assert_equal, u1.dimension_vector, (1, 2, -2, 0, 0, 0)
+    yield assert_equal, u3.dimension_vector, \
+        (Fraction(1, 2), Fraction(3, 2), -1, 0, 0, 0)
+    yield assert_true, u1.same_dimensions_as(u2)
+    yield assert_true, not u1.same_dimensions_as(u3)
+    yield assert_true, (u3**2 / Unit("cm")).same_dimensions_as(u1)
+
+def test_memoized_operations():
+    g = Unit("g")
+    cm = Unit("cm")
+    # Repeated operations on the same units return the same result object.
+    yield assert_true, g * cm is g * cm
+    yield assert_true, g / cm**3 is g / cm**3
+    yield assert_true, (g / cm**3) * cm**3 is (g / cm**3) * cm**3
+    # Memoization is by identity, so equal units with different symbols
+    # keep their own expressions.
+    erg = Unit("erg")
+    other = Unit("g*cm**2/s**2")
+    yield assert_equal, str(erg / Unit("s")), "erg/s"
+    yield assert_equal, str(other / Unit("s")), "cm**2*g/s**3"
+
+def test_unit_registry_rebinding():
+    from yt.funcs import fix_length
+    from yt.units.yt_array import YTQuantity
+    ds = fake_random_ds(16)
+    # fix_length sets the registry of the units of its argument in place,
+    # which must not leak into units made later without a registry.
+    length = YTQuantity(10, "kpc")
+    fix_length(length, ds)
+    yield assert_true, length.units.registry is ds.unit_registry
+    yield assert_true, Unit("kpc") is not Unit("kpc")
+    yield assert_true, \
+        YTQuantity(1, "kpc").units.registry is not ds.unit_registry
+    # Memoized operations follow a change of registry.
+    kpc = Unit("kpc")
+    yield assert_true, (kpc * kpc).registry is kpc.registry
+    kpc.registry = ds.unit_registry
+    yield assert_true, (kpc * kpc).registry is ds.unit_registry
+    yield assert_true, (kpc**2).registry is ds.unit_registry
+
 def test_registry_json():
     reg = UnitRegistry()
     json_reg = reg.to_json()
@@ -37,7 +37,10 @@ from yt.units.unit_registry import \
 from yt.utilities.exceptions import YTUnitsNotReducible
 
 import copy
+import threading
 import token
+from collections import OrderedDict
+from fractions import Fraction
 
 class InvalidUnitOperation(Exception):
     pass
@@ -56,6 +59,62 @@ global_dict = {
 
 unit_system_registry = {}
 
+# Dimensions reduced to a tuple of rational powers of the base dimensions, so
+# that dimensions can be compared without sympy.
+_dimension_vectors = {}
+
+def _dimension_powers(dimensions, powers, scale):
+    if isinstance(dimensions, Mul):
+        for dim in dimensions.args:
+            _dimension_powers(dim, powers, scale)
+    elif isinstance(dimensions, Pow):
+        _dimension_powers(dimensions.args[0], powers,
+                          scale * Fraction(str(dimensions.args[1])))
+    elif isinstance(dimensions, Symbol):
+        powers[dimensions] = powers.get(dimensions, 0) + scale
+
+def get_dimension_vector(dimensions):
+    """
+    Return the powers of each base dimension in *dimensions* as a tuple, in
+    the order of base_dimensions.  Two dimension expressions are equal
+    exactly when their dimension vectors are.
+    """
+    try:
+        return _dimension_vectors[dimensions]
+    except KeyError:
+        pass
+    powers = {}
+    _dimension_powers(sympify(dimensions), powers, Fraction(1))
+    vector = tuple(powers.pop(d, 0) for d in base_dimensions[:-1])
+    # Symbols outside of the base dimensions should not occur, but keep them
+    # distinguishable if they do.
+    vector += tuple(sorted((str(k), v) for k, v in powers.items() if v != 0))
+    _dimension_vectors[dimensions] = vector
+    return vector
+
+# The results of multiplying, dividing and exponentiating units, keyed on the
+# identity of the operands and of the registry of the result.  These are
+# kept alongside the result so that their ids cannot be reused while the
+# entry exists.  Units parsed from the same string with the same registry
+# are the same object, so repeated arithmetic on field units only builds
+# sympy expressions once; a miss still builds the sympy expression of the
+# result.
+_unit_operation_cache = OrderedDict()
+_unit_operation_cache_size = 1024
+_unit_operation_lock = threading.Lock()
+
+def _cached_unit_operation(key):
+    entry = _unit_operation_cache.get(key, None)
+    if entry is None:
+        return None
+    return entry[-1]
+
+def _store_unit_operation(key, entry):
+    with _unit_operation_lock:
+        _unit_operation_cache[key] = entry
+        while len(_unit_operation_cache) > _unit_operation_cache_size:
+            _unit_operation_cache.popitem(last=False)
+
 def auto_positive_symbol(tokens, local_dict, global_dict):
     """
     Inserts calls to ``Symbol`` for undefined variables.
@@ -162,7 +221,7 @@ class Unit(Expr):
 
     # Extra attributes
     __slots__ = ["expr", "is_atomic", "base_value", "base_offset", "dimensions",
-                 "registry", "_latex_repr"]
+                 "registry", "_latex_repr", "_dimension_vector"]
 
     def __new__(cls, unit_expr=sympy_one, base_value=None, base_offset=0.0,
                 dimensions=None, registry=None, latex_repr=None, **assumptions):
@@ -198,6 +257,9 @@ class Unit(Expr):
             if isinstance(unit_expr, bytes):
                 unit_expr = unit_expr.decode("utf-8")
 
+            # Units are only shared within a registry.  Without one, each
+            # call makes a new object, since units may have their registry
+            # set in place later on.
             if registry and unit_expr in registry.unit_objs:
                 return registry.unit_objs[unit_expr]
             else:
@@ -274,6 +336,7 @@ class Unit(Expr):
         obj.dimensions = dimensions
         obj._latex_repr = latex_repr
         obj.registry = registry
+        obj._dimension_vector = None
 
         if unit_key is not None:
             registry.unit_objs[unit_key] = obj
@@ -282,6 +345,15 @@ class Unit(Expr):
 
         return obj
 
+    @property
+    def dimension_vector(self):
+        """
+        The powers of the base dimensions of this unit, as a tuple.
+        """
+        if self._dimension_vector is None:
+            self._dimension_vector = get_dimension_vector(self.dimensions)
+        return self._dimension_vector
+
     _latex_expr = None
     @property
     def latex_repr(self):
@@ -333,6 +405,10 @@ class Unit(Expr):
             raise InvalidUnitOperation("Tried to multiply a Unit object with "
                                        "'%s' (type %s). This behavior is "
                                        "undefined." % (u, type(u)))
+        key = ("*", id(self), id(u), id(self.registry))
+        cached = _cached_unit_operation(key)
+        if cached is not None:
+            return cached
 
         base_offset = 0.0
         if self.base_offset or u.base_offset:
@@ -344,11 +420,13 @@ class Unit(Expr):
                 raise InvalidUnitOperation("Quantities with units of Fahrenheit "
                                            "and Celsius or angles cannot be multiplied.")
 
-        return Unit(self.expr * u.expr,
-                    base_value=(self.base_value * u.base_value),
-                    base_offset=base_offset,
-                    dimensions=(self.dimensions * u.dimensions),
-                    registry=self.registry)
+        ret = Unit(self.expr * u.expr,
+                   base_value=(self.base_value * u.base_value),
+                   base_offset=base_offset,
+                   dimensions=(self.dimensions * u.dimensions),
+                   registry=self.registry)
+        _store_unit_operation(key, (self, u, self.registry, ret))
+        return ret
 
     def __div__(self, u):
         """ Divide Unit by u (Unit object). """
@@ -356,6 +434,10 @@ class Unit(Expr):
             raise InvalidUnitOperation("Tried to divide a Unit object by '%s' "
                                        "(type %s). This behavior is "
                                        "undefined." % (u, type(u)))
+        key = ("/", id(self), id(u), id(self.registry))
+        cached = _cached_unit_operation(key)
+        if cached is not None:
+            return cached
 
         base_offset = 0.0
         if self.base_offset or u.base_offset:
@@ -367,16 +449,25 @@ class Unit(Expr):
                 raise InvalidUnitOperation("Quantities with units of Farhenheit "
                                            "and Celsius cannot be multiplied.")
 
-        return Unit(self.expr / u.expr,
-                    base_value=(self.base_value / u.base_value),
-                    base_offset=base_offset,
-                    dimensions=(self.dimensions / u.dimensions),
-                    registry=self.registry)
+        ret = Unit(self.expr / u.expr,
+                   base_value=(self.base_value / u.base_value),
+                   base_offset=base_offset,
+                   dimensions=(self.dimensions / u.dimensions),
+                   registry=self.registry)
+        _store_unit_operation(key, (self, u, self.registry, ret))
+        return ret
 
     __truediv__ = __div__
 
     def __pow__(self, p):
         """ Take Unit to power p (float). """
+        try:
+            key = ("**", id(self), p, id(self.registry))
+            cached = _cached_unit_operation(key)
+        except TypeError:
+            key = cached = None
+        if cached is not None:
+            return cached
         try:
             p = Rational(str(p)).limit_denominator()
         except ValueError:
@@ -384,16 +475,20 @@ class Unit(Expr):
                                        "power '%s' (type %s). Failed to cast " \
                                        "it to a float." % (p, type(p)) )
 
-        return Unit(self.expr**p, base_value=(self.base_value**p),
-                    dimensions=(self.dimensions**p),
-                    registry=self.registry)
+        ret = Unit(self.expr**p, base_value=(self.base_value**p),
+                   dimensions=(self.dimensions**p),
+                   registry=self.registry)
+        if key is not None:
+            _store_unit_operation(key, (self, self.registry, ret))
+        return ret
 
     def __eq__(self, u):
         """ Test unit equality. """
         if not isinstance(u, Unit):
             return False
-        return \
-          (self.base_value == u.base_value and self.dimensions == u.dimensions)
+        return (self.base_value == u.base_value and
+                (self.dimensions is u.dimensions or
+                 self.dimension_vector == u.dimension_vector))
 
     def __ne__(self, u):
         """ Test unit inequality. """
@@ -404,7 +499,7 @@ class Unit(Expr):
         # use 'is' comparison dimensions to avoid expensive sympy operation
         if self.dimensions is u.dimensions:
             return False
-        return self.dimensions != u.dimensions
+        return self.dimension_vector != u.dimension_vector
 
     def copy(self):
         return copy.deepcopy(self)
@@ -429,7 +524,7 @@ class Unit(Expr):
         # test first for 'is' equality to avoid expensive sympy operation
         if self.dimensions is other_unit.dimensions:
             return True
-        return (self.dimensions / other_unit.dimensions) == sympy_one
+        return self.dimension_vector == other_unit.dimension_vector
 
     @property
     def is_dimensionless(self):
@@ -69,30 +69,26 @@ def return_arr(func):
             return type(args[0])(ret, units)
     return wrapped
 
-@lru_cache(maxsize=128, typed=False)
+# Unit arithmetic is memoized by the Unit class itself, keyed on the
+# identity of the operands.
 def sqrt_unit(unit):
     return unit**0.5
 
-@lru_cache(maxsize=128, typed=False)
 def multiply_units(unit1, unit2):
     return unit1 * unit2
 
 def preserve_units(unit1, unit2):
     return unit1
 
-@lru_cache(maxsize=128, typed=False)
 def power_unit(unit, power):
     return unit**power
 
-@lru_cache(maxsize=128, typed=False)
 def square_unit(unit):
     return unit*unit
 
-@lru_cache(maxsize=128, typed=False)
 def divide_units(unit1, unit2):
     return unit1/unit2
 
-@lru_cache(maxsize=128, typed=False)
 def reciprocal_unit(unit):
     return unit**-1
 
@@ -1226,7 +1222,7 @@ class YTArray(np.ndarray):
             if unit_operator in (multiply_units, divide_units):
                 if unit.is_dimensionless and unit.base_value != 1.0:
                     if not unit1.is_dimensionless:
-                        if unit1.dimensions == unit2.dimensions:
+                        if unit1.same_dimensions_as(unit2):
                             np.multiply(out_arr.view(np.ndarray),
                                         unit.base_value, out=out_arr)
                             unit = Unit(registry=unit.registry)
@@ -846,6 +846,55 @@ class YTNotebookUploadCmd(YTCommand):
         print("  %s" % (rv['url'].replace("/go/", "/nb/")))
         print()
 
+class YTProjCacheCmd(YTCommand):
+    args = (dict(short="action", type=str, nargs="?", default="list",
+                 choices=["list", "prune", "clear"],
+                 help="list the cached projections, prune the least recently"
+                      " used ones or clear the cache"),
+            dict(longname="--max-size", action="store", type=float,
+                 dest="max_size", default=None,
+                 help="Size in MB to prune the cache down to (default: the" +
+                      " projection_cache_size_mb option)"),
+            dict(longname="--dir", action="store", type=str,
+                 dest="cache_dir", default=None,
+                 help="The cache directory (default: the" +
+                      " projection_cache_dir option)"),
+           )
+    name = "proj_cache"
+    description = \
+        """
+        Inspect and prune the on-disk projection cache
+
+        """
+
+    def __call__(self, args):
+        import time
+        from yt.utilities.projection_cache import ProjectionCache
+        cache = ProjectionCache(path = args.cache_dir)
+        if args.action == "clear":
+            removed = cache.clear()
+        elif args.action == "prune":
+            max_size = args.max_size
+            if max_size is not None:
+                max_size = int(max_size * 1024**2)
+            removed = cache.prune(max_size)
+        else:
+            removed = []
+            for entry in cache.entries():
+                print("%s  %8.1f MB  %s axis %s %s (%s, weight %s)" % (
+                    time.strftime("%Y-%m-%d %H:%M",
+                                  time.localtime(entry["used"])),
+                    entry["size"] / 1024.**2, entry.get("dataset"),
+                    entry.get("axis"), entry.get("projected"),
+                    entry.get("method"), entry.get("weight_field")))
+        if len(removed) > 0:
+            print("Removed %s projections (%0.1f MB)" % (
+                len(removed), sum(e["size"] for e in removed) / 1024.**2))
+        entries = cache.entries()
+        print("%s projections (%0.1f MB) in %s" % (
+            len(entries), sum(e["size"] for e in entries) / 1024.**2,
+            cache.path))
+
 class YTPlotCmd(YTCommand):
     args = ("width", "unit", "bn", "proj", "center", "zlim", "axis", "field",
             "weight", "skip", "cmap", "output", "grids", "time", "ds", "max",
@@ -13,6 +13,13 @@ A wrapper class for h5py file objects.
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
+import os
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
 from yt.utilities.on_demand_imports import _h5py as h5py
 
 class HDF5FileHandler(object):
@@ -44,6 +51,178 @@ class HDF5FileHandler(object):
         if self.handle is not None:
             self.handle.close()
 
+class HDF5FilePool(object):
+    """
+    A bounded pool of open, read-only h5py file handles keyed by filename.
+
+    Handles are handed out through the :meth:`open` context manager and are
+    left open when the context exits, so that the next request for the same
+    file does not have to re-open it and re-parse the HDF5 metadata.  When
+    more than *max_open_files* handles are open, the least recently used
+    handles that are not currently in use are closed.
+
+    Along with each handle the pool keeps the modification time, size and
+    inode of the file when it was opened; an idle handle whose file has
+    since changed on disk is closed and the file re-opened.  So that hits do
+    not each cost a metadata request, the file is checked again at most once
+    every *validation_interval* seconds.
+
+    Parameters
+    ----------
+    max_open_files : int
+        The maximum number of idle handles kept open.  Handles in use are
+        never closed, so the pool may temporarily grow beyond this.
+    validation_interval : float
+        The minimum time in seconds between checks of a pooled file on disk.
+        Zero checks on every request, and a negative value only when the
+        file is opened.
+    """
+    def __init__(self, max_open_files=64, validation_interval=1.0):
+        self.max_open_files = max_open_files
+        self.validation_interval = validation_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._handles = OrderedDict()
+        self._stats = {}
+        self._checked = {}
+        self._in_use = {}
+        self._discarded = set()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def __contains__(self, filename):
+        return filename in self._handles
+
+    @contextmanager
+    def open(self, filename, opener=None):
+        """
+        Yield an open h5py file for *filename*, re-using a pooled handle if
+        one exists.  *opener*, if supplied, is called with the filename to
+        create a new handle instead of ``h5py.File(filename, "r")``.
+        """
+        f = self._acquire(filename, opener)
+        try:
+            yield f
+        finally:
+            self._release(filename)
+
+    def _stat(self, filename):
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size, st.st_ino)
+
+    def _needs_validation(self, filename):
+        if self.validation_interval < 0:
+            return False
+        checked = self._checked.get(filename, None)
+        return checked is None or \
+            time.time() - checked >= self.validation_interval
+
+    def _validate(self, filename):
+        self._checked[filename] = time.time()
+        return self._stat(filename)
+
+    def _acquire(self, filename, opener):
+        with self._lock:
+            f = self._handles.pop(filename, None)
+            if f is not None and not f.id.valid:
+                # Somebody closed our handle behind our back.
+                f = None
+            elif f is not None and filename not in self._in_use and \
+              self._needs_validation(filename) and \
+              self._stats.get(filename) != self._validate(filename):
+                # The file has been replaced or rewritten since we opened it.
+                f.close()
+                f = None
+            if f is None:
+                self.misses += 1
+                if opener is None:
+                    f = h5py.File(filename, "r")
+                else:
+                    f = opener(filename)
+                self._stats[filename] = self._validate(filename)
+            else:
+                self.hits += 1
+            self._handles[filename] = f
+            self._in_use[filename] = self._in_use.get(filename, 0) + 1
+            self._discarded.discard(filename)
+            self._evict()
+            return f
+
+    def _release(self, filename):
+        with self._lock:
+            count = self._in_use.get(filename, 0) - 1
+            if count > 0:
+                self._in_use[filename] = count
+            else:
+                self._in_use.pop(filename, None)
+                if filename in self._discarded:
+                    self._discarded.remove(filename)
+                    if filename in self._handles:
+                        self._close(filename)
+            self._evict()
+
+    def _evict(self):
+        excess = len(self._handles) - max(self.max_open_files, 0)
+        if excess <= 0: return
+        for filename in list(self._handles.keys()):
+            if excess <= 0: break
+            if filename in self._in_use: continue
+            self._close(filename)
+            self.evictions += 1
+            excess -= 1
+
+    def _close(self, filename):
+        f = self._handles.pop(filename)
+        self._stats.pop(filename, None)
+        self._checked.pop(filename, None)
+        if f.id.valid:
+            f.close()
+
+    def close(self, filename):
+        """
+        Close the pooled handle for *filename*, if it is not in use.
+        """
+        with self._lock:
+            if filename in self._handles and filename not in self._in_use:
+                self._close(filename)
+
+    def discard(self, filenames):
+        """
+        Drop *filenames* from the pool.  Idle handles are closed now and
+        handles in use are closed as soon as they are released.
+        """
+        with self._lock:
+            for filename in filenames:
+                if filename not in self._handles: continue
+                if filename in self._in_use:
+                    self._discarded.add(filename)
+                else:
+                    self._close(filename)
+
+    def clear(self):
+        """
+        Close every pooled handle that is not currently in use.
+        """
+        with self._lock:
+            for filename in list(self._handles.keys()):
+                if filename not in self._in_use:
+                    self._close(filename)
+
+    def stats(self):
+        """
+        Return a dict of the hit, miss and eviction counters along with the
+        number of currently open handles.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "open_files": len(self),
+                "max_open_files": self.max_open_files}
+
 class FITSFileHandler(HDF5FileHandler):
     def __init__(self, filename):
         from yt.utilities.on_demand_imports import _astropy
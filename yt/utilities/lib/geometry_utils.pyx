@@ -306,7 +306,7 @@ cdef np.uint64_t _const2c = 0x1249249249249249
 @cython.cdivision(True)
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef inline np.uint64_t spread_bits(np.uint64_t x):
+cdef inline np.uint64_t spread_bits(np.uint64_t x) nogil:
     # This magic comes from http://stackoverflow.com/questions/1024754/how-to-compute-a-3d-morton-number-interleave-the-bits-of-3-ints
     x=(x|(x<<20))&_const20
     x=(x|(x<<10))&_const10
@@ -368,30 +368,34 @@ cdef np.int64_t position_to_morton(np.ndarray[anyfloat, ndim=1] pos_x,
     cdef np.int64_t i, j, use
     cdef np.uint64_t DD[3]
     cdef np.uint64_t FLAG = ~(<np.uint64_t>0)
+    cdef np.int64_t n = pos_x.shape[0]
     for i in range(3):
         DD[i] = <np.uint64_t> ((DRE[i] - DLE[i]) / dds[i])
-    for i in range(pos_x.shape[0]):
-        use = 1
-        p[0] = <np.float64_t> pos_x[i]
-        p[1] = <np.float64_t> pos_y[i]
-        p[2] = <np.float64_t> pos_z[i]
-        for j in range(3):
-            if p[j] < DLE[j] or p[j] > DRE[j]:
-                if filter == 1:
-                    # We only allow 20 levels, so this is inaccessible
-                    use = 0
-                    break
-                return i
-            ii[j] = <np.uint64_t> ((p[j] - DLE[j])/dds[j])
-            ii[j] = i64clip(ii[j], 0, DD[j] - 1)
-        if use == 0:
-            ind[i] = FLAG
-            continue
-        mi = 0
-        mi |= spread_bits(ii[2])<<0
-        mi |= spread_bits(ii[1])<<1
-        mi |= spread_bits(ii[0])<<2
-        ind[i] = mi
+    # The GIL is released so that several files can be indexed concurrently
+    # from a thread pool (see ParticleIndex._initialize_indices).
+    with nogil:
+        for i in range(n):
+            use = 1
+            p[0] = <np.float64_t> pos_x[i]
+            p[1] = <np.float64_t> pos_y[i]
+            p[2] = <np.float64_t> pos_z[i]
+            for j in range(3):
+                if p[j] < DLE[j] or p[j] > DRE[j]:
+                    if filter == 1:
+                        # We only allow 20 levels, so this is inaccessible
+                        use = 0
+                        break
+                    return i
+                ii[j] = <np.uint64_t> ((p[j] - DLE[j])/dds[j])
+                ii[j] = i64clip(ii[j], 0, DD[j] - 1)
+            if use == 0:
+                ind[i] = FLAG
+                continue
+            mi = 0
+            mi |= spread_bits(ii[2])<<0
+            mi |= spread_bits(ii[1])<<1
+            mi |= spread_bits(ii[0])<<2
+            ind[i] = mi
     return pos_x.shape[0]
 
 DEF ORDER_MAX=20
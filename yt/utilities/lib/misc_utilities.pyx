@@ -29,6 +29,7 @@ from libc.string cimport strcmp
 from cython.view cimport memoryview
 from cython.view cimport array as cvarray
 from cpython cimport buffer
+from cython.parallel import prange, parallel, threadid
 
 
 cdef extern from "platform_dep.h":
@@ -137,6 +138,127 @@ def new_bin_profile3d(np.ndarray[np.intp_t, ndim=1] bins_x,
         used[bin_x,bin_y,bin_z] = 1
     return
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def new_bin_profile_threaded(np.intp_t[:] bins,
+                  np.float64_t[:] wsource,
+                  np.float64_t[:,:] bsource,
+                  np.float64_t[:] wresult,
+                  np.float64_t[:,:] bresult,
+                  np.float64_t[:,:] mresult,
+                  np.float64_t[:,:] qresult,
+                  np.uint8_t[:] used,
+                  int num_threads = 1):
+    # The same update as new_bin_profile1d, over bins flattened with
+    # np.ravel_multi_index, spread over num_threads OpenMP threads.  Thread t
+    # updates only the bins whose index is t modulo num_threads, visiting the
+    # data in order, so every bin sees exactly the sequence of updates of the
+    # serial kernel and the results are bitwise identical.
+    cdef np.intp_t n, t, bin
+    cdef int fi
+    cdef np.float64_t wval, bval, oldwr
+    cdef np.intp_t nb = bins.shape[0]
+    cdef int nf = bsource.shape[1]
+    cdef np.intp_t nt = max(num_threads, 1)
+    for t in prange(nt, nogil=True, schedule="static", chunksize=1,
+                    num_threads=nt):
+        for n in range(nb):
+            bin = bins[n]
+            if bin % nt != t: continue
+            wval = wsource[n]
+            oldwr = wresult[bin]
+            wresult[bin] = oldwr + wval
+            for fi in range(nf):
+                bval = bsource[n,fi]
+                qresult[bin,fi] = qresult[bin,fi] + \
+                    (oldwr * wval * (bval - mresult[bin,fi])**2) / \
+                    (oldwr + wval)
+                bresult[bin,fi] = bresult[bin,fi] + wval*bval
+                mresult[bin,fi] = mresult[bin,fi] + \
+                    wval * (bval - mresult[bin,fi]) / wresult[bin]
+            used[bin] = 1
+    return
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def new_bin_profile_private(np.intp_t[:] bins,
+                  np.float64_t[:] wsource,
+                  np.float64_t[:,:] bsource,
+                  np.float64_t[:,:] pw,
+                  np.float64_t[:,:,:] pb,
+                  np.float64_t[:,:,:] pm,
+                  np.float64_t[:,:,:] pq,
+                  np.uint8_t[:,:] pused):
+    # The update of new_bin_profile_threaded, with each of the pw.shape[0]
+    # threads binning a contiguous slice of the data into its own
+    # accumulators, whatever bins the data falls in.  The accumulators are
+    # kept across chunks and reduced once with merge_profile_private.
+    cdef np.intp_t n, t, bin, start, end
+    cdef int fi
+    cdef np.float64_t wval, bval, oldwr
+    cdef np.intp_t nb = bins.shape[0]
+    cdef int nf = bsource.shape[1]
+    cdef np.intp_t nt = pw.shape[0]
+    for t in prange(nt, nogil=True, schedule="static", chunksize=1,
+                    num_threads=nt):
+        start = (t * nb) / nt
+        end = ((t + 1) * nb) / nt
+        for n in range(start, end):
+            bin = bins[n]
+            wval = wsource[n]
+            oldwr = pw[t,bin]
+            pw[t,bin] = oldwr + wval
+            for fi in range(nf):
+                bval = bsource[n,fi]
+                pq[t,bin,fi] = pq[t,bin,fi] + \
+                    (oldwr * wval * (bval - pm[t,bin,fi])**2) / \
+                    (oldwr + wval)
+                pb[t,bin,fi] = pb[t,bin,fi] + wval*bval
+                pm[t,bin,fi] = pm[t,bin,fi] + \
+                    wval * (bval - pm[t,bin,fi]) / pw[t,bin]
+            pused[t,bin] = 1
+    return
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def merge_profile_private(np.float64_t[:,:] pw,
+                  np.float64_t[:,:,:] pb,
+                  np.float64_t[:,:,:] pm,
+                  np.float64_t[:,:,:] pq,
+                  np.uint8_t[:,:] pused,
+                  np.float64_t[:] wresult,
+                  np.float64_t[:,:] bresult,
+                  np.float64_t[:,:] mresult,
+                  np.float64_t[:,:] qresult,
+                  np.uint8_t[:] used):
+    # Merge the accumulators of new_bin_profile_private into the results, in
+    # thread order, with the pairwise update for weighted means and
+    # variances.  This may differ from the serial results in the last bits.
+    cdef np.intp_t t, bin
+    cdef int fi
+    cdef np.float64_t w1, w2, delta
+    cdef np.intp_t nt = pw.shape[0]
+    cdef np.intp_t nbins = wresult.shape[0]
+    cdef int nf = bresult.shape[1]
+    for bin in prange(nbins, nogil=True, schedule="static", num_threads=nt):
+        for t in range(nt):
+            if pused[t,bin] == 0: continue
+            w1 = wresult[bin]
+            w2 = pw[t,bin]
+            wresult[bin] = w1 + w2
+            for fi in range(nf):
+                delta = pm[t,bin,fi] - mresult[bin,fi]
+                bresult[bin,fi] = bresult[bin,fi] + pb[t,bin,fi]
+                qresult[bin,fi] = qresult[bin,fi] + pq[t,bin,fi] + \
+                    delta * delta * w1 * w2 / (w1 + w2)
+                mresult[bin,fi] = mresult[bin,fi] + \
+                    delta * w2 / (w1 + w2)
+            used[bin] = 1
+    return
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
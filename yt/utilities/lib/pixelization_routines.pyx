@@ -22,6 +22,7 @@ from yt.utilities.exceptions import \
     YTPixelizeError, \
     YTElementTypeNotRecognized
 from libc.stdlib cimport malloc, free
+from cython.parallel import prange
 from vec3_ops cimport dot, cross, subtract
 from yt.utilities.lib.element_mappings cimport \
     ElementSampler, \
@@ -49,6 +50,117 @@ cdef extern from "pixelization_constants.h":
     np.uint8_t wedge_face_defs[MAX_NUM_FACES][2][2]
 
 
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _pixelize_cartesian_cell(np.float64_t[:,:] my_array,
+                                   np.float64_t oxsp, np.float64_t oysp,
+                                   np.float64_t dxsp, np.float64_t dysp,
+                                   np.float64_t dsp,
+                                   np.float64_t x_min, np.float64_t x_max,
+                                   np.float64_t y_min, np.float64_t y_max,
+                                   np.float64_t px_dx, np.float64_t px_dy,
+                                   np.float64_t period_x,
+                                   np.float64_t period_y,
+                                   int rows, int cols, int antialias,
+                                   int check_period, np.float64_t line_width,
+                                   int i_start, int i_end) nogil:
+    # Deposit one cell into the columns i_start <= i < i_end of my_array
+    # (the rows of the final, transposed image).
+    cdef np.float64_t ipx_dx, ipx_dy
+    cdef np.float64_t ld_x, ld_y, cx, cy
+    cdef int i, j, xi, yi
+    cdef int lc, lr, rc, rr
+    cdef np.float64_t lypx, rypx, lxpx, rxpx, overlap1, overlap2
+    cdef np.float64_t xsp, ysp
+    # Some periodicity helpers
+    cdef int xiter[2]
+    cdef int yiter[2]
+    cdef np.float64_t xiterv[2]
+    cdef np.float64_t yiterv[2]
+    ipx_dx = 1.0 / px_dx
+    ipx_dy = 1.0 / px_dy
+    xiter[0] = yiter[0] = 0
+    xiterv[0] = yiterv[0] = 0.0
+    xiter[1] = yiter[1] = 999
+    if check_period == 1:
+        if (oxsp - dxsp < x_min):
+            xiter[1] = +1
+            xiterv[1] = period_x
+        elif (oxsp + dxsp > x_max):
+            xiter[1] = -1
+            xiterv[1] = -period_x
+        if (oysp - dysp < y_min):
+            yiter[1] = +1
+            yiterv[1] = period_y
+        elif (oysp + dysp > y_max):
+            yiter[1] = -1
+            yiterv[1] = -period_y
+    overlap1 = overlap2 = 1.0
+    for xi in range(2):
+        if xiter[xi] == 999: continue
+        xsp = oxsp + xiterv[xi]
+        if (xsp + dxsp < x_min) or (xsp - dxsp > x_max): continue
+        for yi in range(2):
+            if yiter[yi] == 999: continue
+            ysp = oysp + yiterv[yi]
+            if (ysp + dysp < y_min) or (ysp - dysp > y_max): continue
+            lc = <int> fmax(((xsp-dxsp-x_min)*ipx_dx),0)
+            lr = <int> fmax(((ysp-dysp-y_min)*ipx_dy),0)
+            # NOTE: This is a different way of doing it than in the C
+            # routines.  In C, we were implicitly casting the
+            # initialization to int, but *not* the conditional, which
+            # was allowed an extra value:
+            #     for(j=lc;j<rc;j++)
+            # here, when assigning lc (double) to j (int) it got
+            # truncated, but no similar truncation was done in the
+            # comparison of j to rc (double).  So give ourselves a
+            # bonus row and bonus column here.
+            rc = <int> fmin(((xsp+dxsp-x_min)*ipx_dx + 1), rows)
+            rr = <int> fmin(((ysp+dysp-y_min)*ipx_dy + 1), cols)
+            lr = imax(lr, i_start)
+            rr = imin(rr, i_end)
+            for i in range(lr, rr):
+                lypx = px_dy * i + y_min
+                rypx = px_dy * (i+1) + y_min
+                if antialias == 1:
+                    overlap2 = ((fmin(rypx, ysp+dysp)
+                               - fmax(lypx, (ysp-dysp)))*ipx_dy)
+                if overlap2 < 0.0: continue
+                for j in range(lc, rc):
+                    lxpx = px_dx * j + x_min
+                    rxpx = px_dx * (j+1) + x_min
+                    if line_width > 0:
+                        # Here, we figure out if we're within
+                        # line_width*px_dx of the cell edge
+                        # Midpoint of x:
+                        cx = (rxpx+lxpx)*0.5
+                        ld_x = fmin(fabs(cx - (xsp+dxsp)),
+                                    fabs(cx - (xsp-dxsp)))
+                        ld_x *= ipx_dx
+                        # Midpoint of y:
+                        cy = (rypx+lypx)*0.5
+                        ld_y = fmin(fabs(cy - (ysp+dysp)),
+                                    fabs(cy - (ysp-dysp)))
+                        ld_y *= ipx_dy
+                        if ld_x <= line_width or ld_y <= line_width:
+                            my_array[j,i] = 1.0
+                    elif antialias == 1:
+                        overlap1 = ((fmin(rxpx, xsp+dxsp)
+                                   - fmax(lxpx, (xsp-dxsp)))*ipx_dx)
+                        if overlap1 < 0.0: continue
+                        # This next line is not commented out because
+                        # it's an oddity; we actually want to skip
+                        # depositing if the overlap is zero, and that's
+                        # how it used to work when we were more
+                        # conservative about the iteration indices.
+                        # This will reduce artifacts if we ever move to
+                        # compositing instead of replacing bitmaps.
+                        if overlap1 * overlap2 == 0.0: continue
+                        my_array[j,i] += (dsp * overlap1) * overlap2
+                    else:
+                        my_array[j,i] = dsp
+
 @cython.cdivision(True)
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -61,22 +173,14 @@ def pixelize_cartesian(np.ndarray[np.float64_t, ndim=1] px,
                        int antialias = 1,
                        period = None,
                        int check_period = 1,
-                       np.float64_t line_width = 0.0):
+                       np.float64_t line_width = 0.0,
+                       int num_threads = 1):
     cdef np.float64_t x_min, x_max, y_min, y_max
     cdef np.float64_t period_x = 0.0, period_y = 0.0
-    cdef np.float64_t width, height, px_dx, px_dy, ipx_dx, ipx_dy
-    cdef np.float64_t ld_x, ld_y, cx, cy
-    cdef int i, j, p, xi, yi
-    cdef int lc, lr, rc, rr
-    cdef np.float64_t lypx, rypx, lxpx, rxpx, overlap1, overlap2
-    # These are the temp vars we get from the arrays
-    cdef np.float64_t oxsp, oysp, xsp, ysp, dxsp, dysp, dsp
-    # Some periodicity helpers
-    cdef int xiter[2]
-    cdef int yiter[2]
-    cdef np.float64_t xiterv[2]
-    cdef np.float64_t yiterv[2]
+    cdef np.float64_t width, height, px_dx, px_dy
+    cdef int p, t, nt, i_start, i_end
     cdef np.ndarray[np.float64_t, ndim=2] my_array
+    cdef np.float64_t[:,:] buff
     if period is not None:
         period_x = period[0]
         period_y = period[1]
@@ -88,8 +192,6 @@ def pixelize_cartesian(np.ndarray[np.float64_t, ndim=1] px,
     height = y_max - y_min
     px_dx = width / (<np.float64_t> rows)
     px_dy = height / (<np.float64_t> cols)
-    ipx_dx = 1.0 / px_dx
-    ipx_dy = 1.0 / px_dy
     if rows == 0 or cols == 0:
         raise YTPixelizeError("Cannot scale to zero size")
     if px.shape[0] != py.shape[0] or \
@@ -98,8 +200,7 @@ def pixelize_cartesian(np.ndarray[np.float64_t, ndim=1] px,
        px.shape[0] != data.shape[0]:
         raise YTPixelizeError("Arrays are not of correct shape.")
     my_array = np.zeros((rows, cols), "float64")
-    xiter[0] = yiter[0] = 0
-    xiterv[0] = yiterv[0] = 0.0
+    buff = my_array
     # Here's a basic outline of what we're going to do here.  The xiter and
     # yiter variables govern whether or not we should check periodicity -- are
     # we both close enough to the edge that it would be important *and* are we
@@ -118,92 +219,83 @@ def pixelize_cartesian(np.ndarray[np.float64_t, ndim=1] px,
     # (lr) and then iterate up to "right column" (rc) and "uppeR row" (rr),
     # depositing into them the data value.  Overlap computes the relative
     # overlap of a data value with a pixel.
-    with nogil:
+    #
+    # With several threads, the image is split into num_threads bands of
+    # rows, and every thread goes through all of the cells in order but only
+    # deposits into its own band.  No two threads write to the same pixel,
+    # and every pixel sees the same sequence of deposits as with one thread,
+    # so the image is identical.
+    nt = imax(imin(num_threads, cols), 1)
+    if nt == 1:
+        with nogil:
+            for p in range(px.shape[0]):
+                _pixelize_cartesian_cell(buff, px[p], py[p], pdx[p], pdy[p],
+                    data[p], x_min, x_max, y_min, y_max, px_dx, px_dy,
+                    period_x, period_y, rows, cols, antialias, check_period,
+                    line_width, 0, cols)
+        return my_array
+    for t in prange(nt, nogil=True, schedule="static", chunksize=1,
+                    num_threads=nt):
+        i_start = (t * cols) / nt
+        i_end = ((t + 1) * cols) / nt
         for p in range(px.shape[0]):
-            xiter[1] = yiter[1] = 999
-            oxsp = px[p]
-            oysp = py[p]
-            dxsp = pdx[p]
-            dysp = pdy[p]
-            dsp = data[p]
-            if check_period == 1:
-                if (oxsp - dxsp < x_min):
-                    xiter[1] = +1
-                    xiterv[1] = period_x
-                elif (oxsp + dxsp > x_max):
-                    xiter[1] = -1
-                    xiterv[1] = -period_x
-                if (oysp - dysp < y_min):
-                    yiter[1] = +1
-                    yiterv[1] = period_y
-                elif (oysp + dysp > y_max):
-                    yiter[1] = -1
-                    yiterv[1] = -period_y
-            overlap1 = overlap2 = 1.0
-            for xi in range(2):
-                if xiter[xi] == 999: continue
-                xsp = oxsp + xiterv[xi]
-                if (xsp + dxsp < x_min) or (xsp - dxsp > x_max): continue
-                for yi in range(2):
-                    if yiter[yi] == 999: continue
-                    ysp = oysp + yiterv[yi]
-                    if (ysp + dysp < y_min) or (ysp - dysp > y_max): continue
-                    lc = <int> fmax(((xsp-dxsp-x_min)*ipx_dx),0)
-                    lr = <int> fmax(((ysp-dysp-y_min)*ipx_dy),0)
-                    # NOTE: This is a different way of doing it than in the C
-                    # routines.  In C, we were implicitly casting the
-                    # initialization to int, but *not* the conditional, which
-                    # was allowed an extra value:
-                    #     for(j=lc;j<rc;j++)
-                    # here, when assigning lc (double) to j (int) it got
-                    # truncated, but no similar truncation was done in the
-                    # comparison of j to rc (double).  So give ourselves a
-                    # bonus row and bonus column here.
-                    rc = <int> fmin(((xsp+dxsp-x_min)*ipx_dx + 1), rows)
-                    rr = <int> fmin(((ysp+dysp-y_min)*ipx_dy + 1), cols)
-                    for i in range(lr, rr):
-                        lypx = px_dy * i + y_min
-                        rypx = px_dy * (i+1) + y_min
-                        if antialias == 1:
-                            overlap2 = ((fmin(rypx, ysp+dysp)
-                                       - fmax(lypx, (ysp-dysp)))*ipx_dy)
-                        if overlap2 < 0.0: continue
-                        for j in range(lc, rc):
-                            lxpx = px_dx * j + x_min
-                            rxpx = px_dx * (j+1) + x_min
-                            if line_width > 0:
-                                # Here, we figure out if we're within
-                                # line_width*px_dx of the cell edge
-                                # Midpoint of x:
-                                cx = (rxpx+lxpx)*0.5
-                                ld_x = fmin(fabs(cx - (xsp+dxsp)),
-                                            fabs(cx - (xsp-dxsp)))
-                                ld_x *= ipx_dx
-                                # Midpoint of y:
-                                cy = (rypx+lypx)*0.5
-                                ld_y = fmin(fabs(cy - (ysp+dysp)),
-                                            fabs(cy - (ysp-dysp)))
-                                ld_y *= ipx_dy
-                                if ld_x <= line_width or ld_y <= line_width:
-                                    my_array[j,i] = 1.0
-                            elif antialias == 1:
-                                overlap1 = ((fmin(rxpx, xsp+dxsp)
-                                           - fmax(lxpx, (xsp-dxsp)))*ipx_dx)
-                                if overlap1 < 0.0: continue
-                                # This next line is not commented out because
-                                # it's an oddity; we actually want to skip
-                                # depositing if the overlap is zero, and that's
-                                # how it used to work when we were more
-                                # conservative about the iteration indices.
-                                # This will reduce artifacts if we ever move to
-                                # compositing instead of replacing bitmaps.
-                                if overlap1 * overlap2 == 0.0: continue
-                                my_array[j,i] += (dsp * overlap1) * overlap2
-                            else:
-                                my_array[j,i] = dsp
-                            
+            _pixelize_cartesian_cell(buff, px[p], py[p], pdx[p], pdy[p],
+                data[p], x_min, x_max, y_min, y_max, px_dx, px_dy,
+                period_x, period_y, rows, cols, antialias, check_period,
+                line_width, i_start, i_end)
     return my_array
 
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _pixelize_off_axis_cell(np.float64_t[:,:] my_array,
+                                  np.int64_t[:,:] mask,
+                                  np.float64_t xsp, np.float64_t ysp,
+                                  np.float64_t zsp,
+                                  np.float64_t pxsp, np.float64_t pysp,
+                                  np.float64_t dxsp, np.float64_t dysp,
+                                  np.float64_t dzsp, np.float64_t dsp,
+                                  np.float64_t[:] center,
+                                  np.float64_t[:,:] inv_mat,
+                                  np.float64_t x_min, np.float64_t x_max,
+                                  np.float64_t y_min, np.float64_t y_max,
+                                  np.float64_t px_dx, np.float64_t px_dy,
+                                  int rows, int cols,
+                                  int i_start, int i_end) nogil:
+    # Deposit one cell into the rows i_start <= i < i_end of my_array.
+    cdef np.float64_t ipx_dx, ipx_dy, md
+    cdef np.float64_t cxpx, cypx, cx, cy, cz
+    cdef int i, j
+    cdef int lc, lr, rc, rr
+    ipx_dx = 1.0 / px_dx
+    ipx_dy = 1.0 / px_dy
+    # Any point we want to plot is at most this far from the center
+    md = 2.0 * math.sqrt(dxsp*dxsp + dysp*dysp + dzsp*dzsp)
+    if pxsp + md < x_min or \
+       pxsp - md > x_max or \
+       pysp + md < y_min or \
+       pysp - md > y_max:
+        return
+    lc = <int> fmax(((pxsp - md - x_min)*ipx_dx),0)
+    lr = <int> fmax(((pysp - md - y_min)*ipx_dy),0)
+    rc = <int> fmin(((pxsp + md - x_min)*ipx_dx + 1), rows)
+    rr = <int> fmin(((pysp + md - y_min)*ipx_dy + 1), cols)
+    lr = imax(lr, i_start)
+    rr = imin(rr, i_end)
+    for i in range(lr, rr):
+        cypx = px_dy * (i + 0.5) + y_min
+        for j in range(lc, rc):
+            cxpx = px_dx * (j + 0.5) + x_min
+            cx = inv_mat[0,0]*cxpx + inv_mat[0,1]*cypx + center[0]
+            cy = inv_mat[1,0]*cxpx + inv_mat[1,1]*cypx + center[1]
+            cz = inv_mat[2,0]*cxpx + inv_mat[2,1]*cypx + center[2]
+            if fabs(xsp - cx) * 0.99 > dxsp or \
+               fabs(ysp - cy) * 0.99 > dysp or \
+               fabs(zsp - cz) * 0.99 > dzsp:
+                continue
+            mask[i, j] += 1
+            my_array[i, j] += dsp
+
 @cython.cdivision(True)
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -220,17 +312,15 @@ def pixelize_off_axis_cartesian(
                        np.float64_t[:,:] inv_mat,
                        np.int64_t[:] indices,
                        np.float64_t[:] data,
-                       int cols, int rows, bounds):
+                       int cols, int rows, bounds,
+                       int num_threads = 1):
     cdef np.float64_t x_min, x_max, y_min, y_max
-    cdef np.float64_t width, height, px_dx, px_dy, ipx_dx, ipx_dy, md
-    cdef int i, j, p, ip
-    cdef int lc, lr, rc, rr
-    # These are the temp vars we get from the arrays
-    cdef np.float64_t xsp, ysp, zsp, dxsp, dysp, dzsp, dsp
-    cdef np.float64_t pxsp, pysp, cxpx, cypx, cx, cy, cz
-    # Some periodicity helpers
+    cdef np.float64_t width, height, px_dx, px_dy
+    cdef int p, ip, t, nt, i_start, i_end
     cdef np.ndarray[np.float64_t, ndim=2] my_array
     cdef np.ndarray[np.int64_t, ndim=2] mask
+    cdef np.float64_t[:,:] buff
+    cdef np.int64_t[:,:] mask_buff
     x_min = bounds[0]
     x_max = bounds[1]
     y_min = bounds[2]
@@ -239,8 +329,6 @@ def pixelize_off_axis_cartesian(
     height = y_max - y_min
     px_dx = width / (<np.float64_t> rows)
     px_dy = height / (<np.float64_t> cols)
-    ipx_dx = 1.0 / px_dx
-    ipx_dy = 1.0 / px_dy
     if rows == 0 or cols == 0:
         raise YTPixelizeError("Cannot scale to zero size")
     if px.shape[0] != py.shape[0] or \
@@ -252,42 +340,30 @@ def pixelize_off_axis_cartesian(
         raise YTPixelizeError("Arrays are not of correct shape.")
     my_array = np.zeros((rows, cols), "float64")
     mask = np.zeros((rows, cols), "int64")
-    with nogil:
-        for ip in range(indices.shape[0]):
-            p = indices[ip]
-            xsp = x[p]
-            ysp = y[p]
-            zsp = z[p]
-            pxsp = px[p]
-            pysp = py[p]
-            dxsp = pdx[p]
-            dysp = pdy[p]
-            dzsp = pdz[p]
-            dsp = data[p]
-            # Any point we want to plot is at most this far from the center
-            md = 2.0 * math.sqrt(dxsp*dxsp + dysp*dysp + dzsp*dzsp)
-            if pxsp + md < x_min or \
-               pxsp - md > x_max or \
-               pysp + md < y_min or \
-               pysp - md > y_max:
-                continue
-            lc = <int> fmax(((pxsp - md - x_min)*ipx_dx),0)
-            lr = <int> fmax(((pysp - md - y_min)*ipx_dy),0)
-            rc = <int> fmin(((pxsp + md - x_min)*ipx_dx + 1), rows)
-            rr = <int> fmin(((pysp + md - y_min)*ipx_dy + 1), cols)
-            for i in range(lr, rr):
-                cypx = px_dy * (i + 0.5) + y_min
-                for j in range(lc, rc):
-                    cxpx = px_dx * (j + 0.5) + x_min
-                    cx = inv_mat[0,0]*cxpx + inv_mat[0,1]*cypx + center[0]
-                    cy = inv_mat[1,0]*cxpx + inv_mat[1,1]*cypx + center[1]
-                    cz = inv_mat[2,0]*cxpx + inv_mat[2,1]*cypx + center[2]
-                    if fabs(xsp - cx) * 0.99 > dxsp or \
-                       fabs(ysp - cy) * 0.99 > dysp or \
-                       fabs(zsp - cz) * 0.99 > dzsp:
-                        continue
-                    mask[i, j] += 1
-                    my_array[i, j] += dsp
+    buff = my_array
+    mask_buff = mask
+    # As in pixelize_cartesian, several threads each deposit all of the
+    # cells, in order, into their own band of rows.
+    nt = imax(imin(num_threads, rows), 1)
+    if nt == 1:
+        with nogil:
+            for ip in range(indices.shape[0]):
+                p = indices[ip]
+                _pixelize_off_axis_cell(buff, mask_buff, x[p], y[p], z[p],
+                    px[p], py[p], pdx[p], pdy[p], pdz[p], data[p],
+                    center, inv_mat, x_min, x_max, y_min, y_max,
+                    px_dx, px_dy, rows, cols, 0, rows)
+    else:
+        for t in prange(nt, nogil=True, schedule="static", chunksize=1,
+                        num_threads=nt):
+            i_start = (t * rows) / nt
+            i_end = ((t + 1) * rows) / nt
+            for ip in range(indices.shape[0]):
+                p = indices[ip]
+                _pixelize_off_axis_cell(buff, mask_buff, x[p], y[p], z[p],
+                    px[p], py[p], pdx[p], pdy[p], pdz[p], data[p],
+                    center, inv_mat, x_min, x_max, y_min, y_max,
+                    px_dx, px_dy, rows, cols, i_start, i_end)
     my_array /= mask
     return my_array.T
 
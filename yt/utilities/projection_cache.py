@@ -0,0 +1,231 @@
+"""
+An on-disk cache of finished projections.
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2013, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import hashlib
+import json
+import numpy as np
+import os
+import time
+
+from yt.config import ytcfg
+from yt.funcs import mylog
+from yt.units.yt_array import YTArray
+
+def _file_stat(fn):
+    if fn is None or not os.path.isfile(fn):
+        return None
+    st = os.stat(fn)
+    return (os.path.abspath(fn), st.st_size, st.st_mtime)
+
+def _field_name(field):
+    if isinstance(field, tuple):
+        return list(field)
+    return field
+
+def _from_field_name(name):
+    if isinstance(name, list):
+        return tuple(name)
+    return name
+
+class ProjectionCache(object):
+    """
+    A directory of projections, each stored in an .npz file named by a hash
+    of the dataset and of the parameters of the projection.  When the total
+    size of the files grows past max_size bytes, the least recently used
+    projections are removed.
+
+    Parameters
+    ----------
+    path : string, optional
+        The cache directory.  Defaults to the projection_cache_dir
+        configuration option.
+    max_size : int, optional
+        The size limit of the cache in bytes.  Defaults to the
+        projection_cache_size_mb configuration option.  Zero means no limit.
+    """
+    def __init__(self, path = None, max_size = None):
+        if path is None:
+            path = ytcfg.get("yt", "projection_cache_dir")
+        if max_size is None:
+            max_size = ytcfg.getint("yt", "projection_cache_size_mb") * 1024**2
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+
+    @classmethod
+    def from_config(cls):
+        """
+        Return the cache selected by the configuration, or None if the
+        projection_cache option is off.
+        """
+        if not ytcfg.getboolean("yt", "projection_cache"):
+            return None
+        return cls()
+
+    def key(self, proj, fields):
+        """
+        Return the key of the projection proj of fields.  It combines the
+        unique identifier, hash and parameter file of the dataset, the
+        fields, weight field, axis and method of the projection, the
+        hash, maximum level and field parameters of its data source and the
+        yt version.
+        """
+        import yt
+        ds = proj.ds
+        data_source = proj.data_source
+        items = (str(ds.unique_identifier), ds._hash(),
+                 _file_stat(ds.parameter_filename),
+                 sorted(fields), proj.weight_field, proj.axis,
+                 proj.method, proj._sum_only,
+                 data_source._hash, getattr(data_source, "max_level", None),
+                 sorted((k, repr(v)) for k, v in
+                        proj.field_parameters.items()),
+                 yt.__version__)
+        return hashlib.md5(repr(items).encode("utf-8")).hexdigest()
+
+    def filename(self, key):
+        return os.path.join(self.path, "%s.npz" % key)
+
+    def load(self, proj, fields):
+        """
+        Return a dict with the field data of the cached projection proj of
+        fields, or None if it is not in the cache.
+        """
+        fn = self.filename(self.key(proj, fields))
+        if not os.path.exists(fn):
+            return None
+        try:
+            with np.load(fn) as f:
+                info = json.loads(str(f["info"]))
+                arrays = [f["data_%s" % i] for i in range(len(info["fields"]))]
+        except (IOError, KeyError, ValueError) as e:
+            mylog.warning("Could not read projection cache %s: %s", fn, e)
+            return None
+        # Mark the projection as recently used.
+        try:
+            os.utime(fn, None)
+        except OSError:
+            pass
+        field_data = {}
+        for name, units, arr in zip(info["fields"], info["units"], arrays):
+            if units is not None:
+                arr = proj.ds.arr(arr, units)
+            field_data[_from_field_name(name)] = arr
+        mylog.info("Using projection from cache %s", fn)
+        return field_data
+
+    def store(self, proj, fields):
+        """
+        Write the field data of the projection proj of fields to the cache,
+        and then evict the least recently used projections if the cache is
+        too large.
+        """
+        fn = self.filename(self.key(proj, fields))
+        info = {"dataset": str(proj.ds), "axis": int(proj.axis),
+                "weight_field": _field_name(proj.weight_field),
+                "method": "sum" if proj._sum_only else proj.method,
+                "projected": [_field_name(f) for f in fields],
+                "created": time.time(), "fields": [], "units": []}
+        data = {}
+        for i, (field, arr) in enumerate(proj.field_data.items()):
+            info["fields"].append(_field_name(field))
+            if isinstance(arr, YTArray):
+                info["units"].append(str(arr.units))
+            else:
+                info["units"].append(None)
+            data["data_%s" % i] = np.asarray(arr)
+        data["info"] = np.array(json.dumps(info))
+        tmp = "%s.%s.tmp.npz" % (fn[:-4], os.getpid())
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            np.savez(tmp, **data)
+            os.rename(tmp, fn)
+        except (IOError, OSError) as e:
+            mylog.warning("Could not write projection cache %s: %s", fn, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        mylog.info("Saved projection to cache %s", fn)
+        if self.max_size > 0:
+            self.prune(keep = fn)
+
+    def entries(self):
+        """
+        Return a list of dicts describing the cached projections, least
+        recently used first.  Each has the filename, size and last access
+        time of the file along with what was projected.
+        """
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for name in os.listdir(self.path):
+            fn = os.path.join(self.path, name)
+            if not name.endswith(".npz") or name.endswith(".tmp.npz"):
+                continue
+            try:
+                st = os.stat(fn)
+            except OSError:
+                continue
+            try:
+                with np.load(fn) as f:
+                    info = json.loads(str(f["info"]))
+            except (IOError, KeyError, ValueError):
+                info = {}
+            entry = dict((k, v) for k, v in info.items()
+                         if k not in ("fields", "units"))
+            entry.update(filename = fn, size = st.st_size,
+                         used = st.st_mtime)
+            entries.append(entry)
+        entries.sort(key = lambda e: e["used"])
+        return entries
+
+    def size(self):
+        return sum(e["size"] for e in self.entries())
+
+    def prune(self, max_size = None, keep = None):
+        """
+        Remove the least recently used projections until the cache holds
+        at most max_size bytes (by default, the size limit of the cache, if
+        it has one).  The file keep is never removed.  Returns the removed
+        entries.
+        """
+        if max_size is None:
+            if self.max_size <= 0:
+                return []
+            max_size = self.max_size
+        entries = self.entries()
+        total = sum(e["size"] for e in entries)
+        removed = []
+        for entry in entries:
+            if total <= max_size:
+                break
+            if entry["filename"] == keep:
+                continue
+            try:
+                os.remove(entry["filename"])
+            except OSError:
+                continue
+            total -= entry["size"]
+            removed.append(entry)
+        if len(removed) > 0:
+            mylog.debug("Evicted %s projections from %s",
+                        len(removed), self.path)
+        return removed
+
+    def clear(self):
+        """
+        Remove every cached projection.
+        """
+        return self.prune(0)
@@ -0,0 +1,99 @@
+"""
+Tests for the base IO handler.
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2016, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+import os
+import shutil
+import tempfile
+
+from yt.testing import \
+    fake_random_ds, \
+    assert_equal, \
+    requires_module
+from yt.utilities.file_handler import HDF5FilePool
+
+def setup():
+    from yt.config import ytcfg
+    ytcfg["yt","__withintesting"] = "True"
+
+def test_concurrent_fluid_reads():
+    ds = fake_random_ds(32, nprocs=16)
+    io = ds.index.io
+    # Pretend the grids are spread across several files.
+    for g in ds.index.grids:
+        g.filename = "fake_file_%02i" % (g.id % 5)
+    for nthreads in [2, 4]:
+        io.io_threads = nthreads
+        for dobj in [ds.all_data, lambda: ds.sphere("c", 0.25)]:
+            io._thread_safe_fluid_reads = False
+            serial = dobj()["density"]
+            io._thread_safe_fluid_reads = True
+            threaded = dobj()["density"]
+            assert_equal(threaded, serial)
+    assert_equal(sorted(io.file_timings.keys()),
+                 ["fake_file_%02i" % i for i in range(5)])
+
+@requires_module("h5py")
+def test_h5_file_pool():
+    import h5py
+    tmpdir = tempfile.mkdtemp()
+    fns = [os.path.join(tmpdir, "pool_%02i.h5" % i) for i in range(4)]
+    for fn in fns:
+        with h5py.File(fn, "w") as f:
+            f.create_dataset("data", data=np.arange(10))
+    pool = HDF5FilePool(max_open_files=2)
+    for fn in fns:
+        with pool.open(fn) as f:
+            assert_equal(f["data"][:], np.arange(10))
+    assert_equal(pool.misses, 4)
+    assert_equal(len(pool), 2)
+    # The two most recently used files are still open.
+    with pool.open(fns[-1]) as f:
+        assert_equal(f["data"][:], np.arange(10))
+    assert_equal(pool.hits, 1)
+    # Handles in use are never evicted.
+    with pool.open(fns[0]) as f0:
+        for fn in fns[1:]:
+            with pool.open(fn) as f:
+                pass
+        assert f0.id.valid
+    assert_equal(len(pool), 2)
+    # Hits within the validation interval do not check the file on disk.
+    pool.validation_interval = 3600.0
+    stats = []
+    pool._stat = lambda fn: stats.append(fn) or HDF5FilePool._stat(pool, fn)
+    with pool.open(fns[0]) as f:
+        pass
+    with pool.open(fns[0]) as f:
+        pass
+    assert_equal(stats, [])
+    del pool._stat
+    # A file rewritten on disk is re-opened rather than served stale.
+    pool.validation_interval = 0.0
+    with h5py.File(fns[0], "w") as f:
+        f.create_dataset("data", data=np.arange(20))
+    misses = pool.misses
+    with pool.open(fns[0]) as f:
+        assert_equal(f["data"][:], np.arange(20))
+    assert_equal(pool.misses, misses + 1)
+    # Discarded files are closed, once released if they are in use.
+    with pool.open(fns[1]) as f1:
+        pool.discard([fns[0], fns[1]])
+        assert fns[0] not in pool
+        assert f1.id.valid
+    assert fns[1] not in pool
+    pool.clear()
+    assert_equal(len(pool), 0)
+    shutil.rmtree(tmpdir)
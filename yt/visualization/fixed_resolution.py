@@ -13,6 +13,7 @@ Fixed resolution buffer support, along with a primitive image analysis tool.
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
+from yt.config import ytcfg
 from yt.frontends.ytdata.utilities import \
     save_as_dataset
 from yt.funcs import \
@@ -103,6 +104,13 @@ class FixedResolutionBuffer(object):
         self._filters = []
         self.axis = data_source.axis
         self.periodic = periodic
+        # The unfiltered buffers, with the bounds and units they were made
+        # with, and those of an earlier buffer of the same data source whose
+        # pixels can be reused (see _reuse_pixels).  They are only kept
+        # when _keep_pixels is set, as by PlotWindow, which pans buffers.
+        self._pixelized = {}
+        self._previous = None
+        self._keep_pixels = False
 
         ds = getattr(data_source, "ds", None)
         if ds is not None:
@@ -136,9 +144,16 @@ class FixedResolutionBuffer(object):
             if hasattr(b, "in_units"):
                 b = float(b.in_units("code_length"))
             bounds.append(b)
-        buff = self.ds.coordinates.pixelize(self.data_source.axis,
-            self.data_source, item, bounds, self.buff_size,
-            int(self.antialias))
+        buff = self._get_reused_buffer(item, bounds)
+        if buff is None:
+            buff = self.ds.coordinates.pixelize(self.data_source.axis,
+                self.data_source, item, bounds, self.buff_size,
+                int(self.antialias))
+        if self._keep_pixels:
+            # The returned array may be filtered or converted to other units
+            # in place, so a copy of the buffer is kept.
+            self._pixelized[item] = (buff.copy(), bounds,
+                                     str(self.data_source[item].units))
 
         for name, (args, kwargs) in self._filters:
             buff = filter_registry[name](*args[1:], **kwargs).apply(buff)
@@ -153,6 +168,67 @@ class FixedResolutionBuffer(object):
     def __setitem__(self, item, val):
         self.data[item] = val
 
+    def _reuse_pixels(self, frb):
+        """
+        Reuse the pixels of frb, an earlier buffer of the same data source,
+        when this buffer is the same size and is offset from it by a whole
+        number of pixels, as after a pan.  Only the pixels that were not in
+        frb are then pixelized.
+        """
+        if frb is None or frb.data_source is not self.data_source or \
+           frb.antialias != self.antialias or \
+           tuple(frb.buff_size) != tuple(self.buff_size) or \
+           self.ds.geometry != "cartesian":
+            return
+        self._previous = frb._pixelized
+
+    def _get_reused_buffer(self, item, bounds):
+        if self._previous is None or item not in self._previous:
+            return None
+        obuff, obounds, ounits = self._previous.pop(item)
+        if ounits != str(self.data_source[item].units):
+            return None
+        ny, nx = obuff.shape
+        x0, x1, y0, y1 = bounds
+        dx, dy = (x1 - x0) / nx, (y1 - y0) / ny
+        # Where the buffer is wider than the domain, pixels can hold several
+        # periodic images of a cell, which strips would not reproduce.
+        DW = self.ds.domain_width.in_units("code_length").d
+        xax = self.ds.coordinates.x_axis[self.axis]
+        yax = self.ds.coordinates.y_axis[self.axis]
+        if x1 - x0 >= DW[xax] or y1 - y0 >= DW[yax]:
+            return None
+        if abs((obounds[1] - obounds[0]) - (x1 - x0)) > 1e-10 * dx * nx or \
+           abs((obounds[3] - obounds[2]) - (y1 - y0)) > 1e-10 * dy * ny:
+            return None
+        sx, sy = (x0 - obounds[0]) / dx, (y0 - obounds[2]) / dy
+        ix, iy = int(round(sx)), int(round(sy))
+        if abs(sx - ix) > 1e-6 or abs(sy - iy) > 1e-6 or \
+           abs(ix) >= nx or abs(iy) >= ny:
+            return None
+        mylog.debug("Reusing pixels of a buffer offset by (%s, %s)", ix, iy)
+        # Pixel (j, i) of this buffer is pixel (j + iy, i + ix) of the old
+        # one; the columns and rows outside [i0, i1) and [j0, j1) are new.
+        i0, i1 = max(-ix, 0), min(nx - ix, nx)
+        j0, j1 = max(-iy, 0), min(ny - iy, ny)
+        buff = np.zeros_like(obuff)
+        buff[j0:j1, i0:i1] = obuff[j0 + iy:j1 + iy, i0 + ix:i1 + ix]
+        strips = []
+        for c0, c1 in ((0, i0), (i1, nx)):
+            if c1 > c0:
+                strips.append((slice(0, ny), slice(c0, c1)))
+        for r0, r1 in ((0, j0), (j1, ny)):
+            if r1 > r0:
+                strips.append((slice(r0, r1), slice(i0, i1)))
+        for rows, cols in strips:
+            strip_bounds = [x0 + cols.start * dx, x0 + cols.stop * dx,
+                            y0 + rows.start * dy, y0 + rows.stop * dy]
+            buff[rows, cols] = self.ds.coordinates.pixelize(
+                self.data_source.axis, self.data_source, item, strip_bounds,
+                (rows.stop - rows.start, cols.stop - cols.start),
+                int(self.antialias))
+        return buff
+
     def _get_data_source_fields(self):
         exclude = self.data_source._key_fields + list(self._exclude_fields)
         fields = getattr(self.data_source, "fields", [])
@@ -543,7 +619,8 @@ class ObliqueFixedResolutionBuffer(FixedResolutionBuffer):
                                self.data_source.center, self.data_source._inv_mat, indices,
                                self.data_source[item],
                                self.buff_size[0], self.buff_size[1],
-                               bounds).transpose()
+                               bounds, ytcfg.getint("yt", "pixelize_threads")
+                               ).transpose()
         ia = ImageArray(buff, input_units=self.data_source[item].units,
                         info=self._get_info(item))
         self[item] = ia
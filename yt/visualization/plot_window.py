@@ -269,9 +269,14 @@ class PlotWindow(ImagePlotContainer):
             bounds = np.array([b.in_units('code_length') for b in bounds])
 
         # Generate the FRB
+        old_frb = self._frb
         self.frb = self._frb_generator(self.data_source, bounds,
                                        self.buff_size, self.antialias,
                                        periodic=self._periodic)
+        # After a pan, the pixels still in view are copied from the old FRB
+        if self._frb_generator is FixedResolutionBuffer:
+            self._frb._keep_pixels = True
+            self._frb._reuse_pixels(old_frb)
 
         # At this point the frb has the valid bounds, size, aliasing, etc.
         if old_fields is None:
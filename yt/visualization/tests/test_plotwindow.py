@@ -453,3 +453,37 @@ def test_frb_regen():
     slc = SlicePlot(ds, 2, 'density')
     slc.set_buff_size(1200)
     assert_equal(slc.frb['density'].shape, (1200, 1200))
+
+def test_frb_pan_reuse():
+    from yt.visualization.fixed_resolution import FixedResolutionBuffer
+    ds = fake_random_ds(32, nprocs=8)
+    prj = ProjectionPlot(ds, 2, 'density')
+    prj.set_buff_size(64)
+    prj.zoom(2)
+    prj.frb
+    for deltas in [(0.25, 0.125), (-0.5, 0.0), (0.1, -0.3)]:
+        prj.pan_rel(deltas)
+        frb = prj.frb
+        assert frb._previous is not None
+        ref = FixedResolutionBuffer(prj.data_source, frb.bounds, frb.buff_size,
+                                    frb.antialias)
+        for field in frb.keys():
+            assert_rel_equal(frb[field].copy(), ref[field].copy(), 10)
+        # Buffers made outside of a plot window do not keep their pixels
+        assert_equal(len(ref._pixelized), 0)
+
+def test_frb_pan_reuse_set_unit():
+    from yt.visualization.fixed_resolution import FixedResolutionBuffer
+    ds = fake_random_ds(32, nprocs=8)
+    prj = ProjectionPlot(ds, 2, 'density')
+    prj.set_buff_size(64)
+    prj.zoom(2)
+    prj.set_unit('density', 'Msun/pc**2')
+    for deltas in [(0.25, 0.125), (-0.5, 0.0)]:
+        prj.pan_rel(deltas)
+        frb = prj.frb
+        ref = FixedResolutionBuffer(prj.data_source, frb.bounds, frb.buff_size,
+                                    frb.antialias)
+        assert_equal(str(frb['density'].units), 'Msun/pc**2')
+        assert_rel_equal(frb['density'].copy(),
+                         ref['density'].in_units('Msun/pc**2').copy(), 10)